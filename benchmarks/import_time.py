@@ -0,0 +1,120 @@
+"""
+Measures how long importing circlevis takes, using ``python -X importtime``.
+
+Importing circlevis for lightweight helpers like ``BeatmapInfo`` should not
+pull in the visualizer's heavy dependencies (PyQt6, circleguard, slider,
+scipy). This script fails if any of them are imported by one of the
+statements in ``STATEMENTS``, or if the cumulative import time of circlevis
+exceeds ``--max-ms``.
+
+Usage::
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --max-ms 50 --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent.absolute()
+
+STATEMENTS = [
+    "import circlevis",
+    "from circlevis import BeatmapInfo",
+    "from circlevis import StatisticMode, statistic_function",
+]
+
+# top level packages which must not be imported by any of ``STATEMENTS``
+HEAVY_MODULES = ["PyQt6", "circleguard", "slider", "scipy"]
+
+
+def import_times(statement):
+    """
+    Runs ``statement`` in a fresh interpreter with ``-X importtime`` and
+    returns a dict of module name to ``(self_us, cumulative_us)``.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(REPO_ROOT)] + ([env["PYTHONPATH"]] if "PYTHONPATH" in env else [])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        # header line
+        if not self_us.strip().isdigit():
+            continue
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def measure(statement, runs):
+    cumulative = []
+    heavy = set()
+    for _ in range(runs):
+        times = import_times(statement)
+        cumulative.append(times.get("circlevis", (0, 0))[1] / 1000)
+        heavy |= {m.split(".")[0] for m in times} & set(HEAVY_MODULES)
+    cumulative.sort()
+    return {
+        "statement": statement,
+        "runs": runs,
+        "min_ms": cumulative[0],
+        "median_ms": cumulative[len(cumulative) // 2],
+        "heavy_modules": sorted(heavy),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="how many fresh interpreters to measure each statement in",
+    )
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="fail if the median cumulative import time of circlevis exceeds "
+        "this many milliseconds",
+    )
+    args = parser.parse_args()
+
+    results = [measure(statement, args.runs) for statement in STATEMENTS]
+    print(json.dumps(results, indent=4))
+
+    failed = False
+    for result in results:
+        if result["heavy_modules"]:
+            print(
+                f"{result['statement']!r} imported "
+                f"{', '.join(result['heavy_modules'])}",
+                file=sys.stderr,
+            )
+            failed = True
+        if args.max_ms is not None and result["median_ms"] > args.max_ms:
+            print(
+                f"{result['statement']!r} took {result['median_ms']:.2f}ms, "
+                f"more than the allowed {args.max_ms}ms",
+                file=sys.stderr,
+            )
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
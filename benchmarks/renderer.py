@@ -0,0 +1,256 @@
+"""
+Measures the hot paths of the renderer, headlessly, against synthetic
+beatmaps and replays.
+
+For each case in ``CASES`` (which vary the number of hitobjects, sliders,
+replays, and frames on screen), this measures:
+
+* ``process_sliders_ms`` - how long loading the beatmap's sliders takes
+* ``next_frame_ms`` - how long preparing a frame takes, per frame
+* ``paint_ms`` - how long painting a frame takes, per frame
+* ``seek_ms`` - how long seeking to a random time and painting it takes
+* ``replay_info_ms`` - how long constructing a ``ReplayInfo`` takes
+
+and prints the median of each as JSON. If a baseline exists, any measurement
+more than ``--threshold`` slower than its baseline is reported as a
+regression, and the script fails.
+
+Usage::
+
+    python benchmarks/renderer.py
+    python benchmarks/renderer.py --quick --output results.json
+    python benchmarks/renderer.py --save-baseline
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+REPO_ROOT = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+from synthetic import synthetic_beatmap, SyntheticReplay
+
+DEFAULT_BASELINE = Path(__file__).parent / "renderer_baseline.json"
+
+# (name, number of hitobjects, ratio of sliders, number of replays, frames on
+# screen)
+CASES = [
+    ("default", 500, 0.3, 1, 15),
+    ("circles_only", 500, 0, 1, 15),
+    ("sliders_only", 500, 1, 1, 15),
+    ("many_hitobjects", 2000, 0.3, 1, 15),
+    ("two_replays", 500, 0.3, 2, 15),
+    ("ten_replays", 500, 0.3, 10, 15),
+    ("long_trails", 500, 0.3, 1, 120),
+    ("ten_replays_long_trails", 500, 0.3, 10, 120),
+]
+# a subset of ``CASES`` for a quicker run
+QUICK_CASES = ["default", "sliders_only", "ten_replays", "long_trails"]
+
+# measurements which differ from their baseline by less than this many ms are
+# never regressions, no matter the relative difference. Sub-millisecond
+# timings are too noisy to compare relatively.
+NOISE_FLOOR_MS = 0.05
+
+
+def median_ms(timings):
+    return float(np.median(timings)) * 1000
+
+
+def create_renderer(beatmap, replays, frames_on_screen):
+    # imported here so the synthetic data (and QApplication) exist first
+    from circlevis.renderer import Renderer
+
+    renderer = Renderer(
+        beatmap,
+        replays,
+        events=[],
+        start_speed=1,
+        paint_info=True,
+        statistic_functions=[],
+    )
+    renderer.resize(1000, 800)
+    renderer.show()
+    renderer.thread.join()
+    renderer.trail_lod_thread.join()
+    # measure frames with every replay's judgments drawn
+    if renderer.judgment_pool is not None:
+        renderer.judgment_pool.shutdown(wait=True)
+    # our first paint (once we've been exposed) notices the sliders are loaded
+    # and stops loading
+    QApplication.processEvents()
+    if renderer.is_loading:
+        raise RuntimeError("the renderer didn't finish loading")
+    renderer.pause()
+    renderer.num_frames_changed(frames_on_screen)
+    return renderer
+
+
+def measure_case(num_hitobjects, slider_ratio, num_replays, frames, runs):
+    beatmap = synthetic_beatmap(num_hitobjects, slider_ratio)
+    replays = [SyntheticReplay(beatmap, seed=i) for i in range(num_replays)]
+    renderer = create_renderer(beatmap, replays, frames)
+    rng = np.random.default_rng(0)
+    result = {}
+
+    timings = []
+    for _ in range(max(runs // 20, 3)):
+        start = time.perf_counter()
+        renderer.process_sliders()
+        timings.append(time.perf_counter() - start)
+    result["process_sliders_ms"] = median_ms(timings)
+
+    # play through a stretch of the replay, one frame at a time
+    frame_times = renderer.playback_start + np.arange(runs) * (1000 / 60) + 5000
+    next_frame_timings = []
+    paint_timings = []
+    for frame_time in frame_times:
+        renderer.clock.time_counter = frame_time
+        start = time.perf_counter()
+        renderer.next_frame()
+        next_frame_timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        renderer.repaint()
+        paint_timings.append(time.perf_counter() - start)
+    result["next_frame_ms"] = median_ms(next_frame_timings)
+    result["paint_ms"] = median_ms(paint_timings)
+
+    timings = []
+    seek_times = rng.uniform(renderer.playback_start, renderer.playback_end, runs)
+    for seek_time in seek_times:
+        start = time.perf_counter()
+        renderer.seek_to(seek_time)
+        renderer.repaint()
+        timings.append(time.perf_counter() - start)
+    result["seek_ms"] = median_ms(timings)
+
+    from circlevis.replay_info import ReplayInfo
+
+    timings = []
+    with TemporaryDirectory() as slider_dir:
+        for _ in range(3):
+            start = time.perf_counter()
+            ReplayInfo(replays[0], slider_dir)
+            timings.append(time.perf_counter() - start)
+    result["replay_info_ms"] = median_ms(timings)
+
+    renderer.timer.stop()
+    renderer.statistic_evaluator.stop()
+    renderer.close()
+    return result
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns a description of each measurement in ``results`` which is more
+    than ``threshold`` (a fraction) slower than it is in ``baseline``.
+    """
+    regressions = []
+    for case, measurements in results.items():
+        for metric, value in measurements.items():
+            if metric not in baseline.get(case, {}):
+                continue
+            base = baseline[case][metric]
+            if value - base < NOISE_FLOOR_MS:
+                continue
+            if value > base * (1 + threshold):
+                regressions.append(
+                    f"{case}.{metric}: {value:.3f}ms, baseline {base:.3f}ms "
+                    f"({(value / base - 1):+.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=200,
+        help="how many frames (and seeks) to measure for each case",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help=f"only measure {', '.join(QUICK_CASES)}"
+    )
+    parser.add_argument(
+        "--cases", nargs="+", help="only measure these cases", metavar="CASE"
+    )
+    parser.add_argument(
+        "--output", type=Path, help="also write the results to this file"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="the results to compare against (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="fail if a measurement is more than this fraction slower than its "
+        "baseline (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="save the results as the new baseline instead of comparing to it",
+    )
+    args = parser.parse_args()
+
+    cases = CASES
+    if args.quick:
+        cases = [case for case in CASES if case[0] in QUICK_CASES]
+    if args.cases:
+        unknown = set(args.cases) - {case[0] for case in CASES}
+        if unknown:
+            parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+        cases = [case for case in CASES if case[0] in args.cases]
+
+    _app = QApplication([])
+    # whatever runs first pays for warming up qt, numpy, and our caches, so
+    # measure a small case first and throw it away
+    measure_case(100, 0.3, 1, 15, runs=20)
+    results = {}
+    for name, *parameters in cases:
+        print(f"measuring {name}...", file=sys.stderr)
+        results[name] = measure_case(*parameters, runs=args.runs)
+
+    output = json.dumps(results, indent=4)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    if args.save_baseline:
+        # keep the baselines of any cases we didn't measure this time
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=4) + "\n")
+        print(f"saved baseline to {args.baseline}", file=sys.stderr)
+        sys.exit(0)
+
+    if not baseline:
+        print(f"no baseline at {args.baseline}, not comparing", file=sys.stderr)
+        sys.exit(0)
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"regression: {regression}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Deterministic synthetic beatmaps and replays for benchmarking, so benchmarks
+don't need an api key, network access, or real replays.
+"""
+import numpy as np
+from circleguard import Replay, RatelimitWeight, Mod
+from slider import Beatmap
+
+OSU_FILE_HEADER = """osu file format v14
+
+[General]
+AudioFilename: audio.mp3
+AudioLeadIn: 0
+PreviewTime: -1
+Countdown: 0
+SampleSet: Normal
+StackLeniency: 0.7
+Mode: 0
+LetterboxInBreaks: 0
+WidescreenStoryboard: 0
+
+[Editor]
+DistanceSpacing: 1
+BeatDivisor: 4
+GridSize: 4
+TimelineZoom: 1
+
+[Metadata]
+Title:Synthetic
+TitleUnicode:Synthetic
+Artist:circlevis
+ArtistUnicode:circlevis
+Creator:circlevis
+Version:{version}
+Source:
+Tags:
+BeatmapID:0
+BeatmapSetID:-1
+
+[Difficulty]
+HPDrainRate:5
+CircleSize:4
+OverallDifficulty:8
+ApproachRate:9
+SliderMultiplier:1.4
+SliderTickRate:1
+
+[Events]
+
+[TimingPoints]
+0,300,4,2,0,100,1,0
+
+[HitObjects]
+"""
+
+# ms between consecutive hitobjects. Sliders are 70 osu!pixels long, which at
+# our slider multiplier and beat length lasts 150ms, so they never overlap
+HITOBJECT_SPACING = 300
+
+
+def synthetic_beatmap(num_hitobjects, slider_ratio, seed=0):
+    """
+    A beatmap with ``num_hitobjects`` hitobjects, ``slider_ratio`` of which are
+    sliders (and the rest circles), placed at random positions.
+    """
+    rng = np.random.default_rng(seed)
+    positions = rng.integers([32, 32], [480, 352], size=(num_hitobjects, 2))
+    is_slider = rng.random(num_hitobjects) < slider_ratio
+
+    lines = []
+    for i, ((x, y), slider) in enumerate(zip(positions, is_slider)):
+        t = 1000 + i * HITOBJECT_SPACING
+        # start a new combo every 8 hitobjects
+        new_combo = 4 if i % 8 == 0 else 0
+        if slider:
+            # a short bezier curve, bent towards the playfield's center
+            end_x = int(np.clip(x + rng.integers(-80, 80), 0, 512))
+            end_y = int(np.clip(y + rng.integers(-80, 80), 0, 384))
+            mid_x, mid_y = (x + end_x) // 2 + 20, (y + end_y) // 2 - 20
+            lines.append(
+                f"{x},{y},{t},{2 | new_combo},0,B|{mid_x}:{mid_y}|{end_x}:{end_y},"
+                "1,70"
+            )
+        else:
+            lines.append(f"{x},{y},{t},{1 | new_combo},0,0:0:0:0:")
+
+    version = f"{num_hitobjects} objects, {slider_ratio:.0%} sliders"
+    text = OSU_FILE_HEADER.format(version=version) + "\n".join(lines) + "\n"
+    return Beatmap.parse(text)
+
+
+class SyntheticReplay(Replay):
+    """
+    A replay of ``beatmap`` which moves towards each hitobject in turn (with
+    some noise) and taps it, played with polling at roughly 60 frames per
+    second.
+
+    Knows its beatmap without having to download it, so circleguard can
+    calculate its judgments and ur offline.
+    """
+
+    def __init__(self, beatmap, seed=0, mods=Mod.NM):
+        super().__init__(RatelimitWeight.NONE, False)
+        rng = np.random.default_rng(seed)
+        self._beatmap = beatmap
+
+        hitobjects = beatmap.hit_objects()
+        times = np.array([h.time.total_seconds() * 1000 for h in hitobjects])
+        positions = np.array([[h.position.x, h.position.y] for h in hitobjects])
+        # each player is a little early or late on every hitobject
+        times = times + rng.normal(0, 15, len(times))
+
+        end = times[-1] + 1000
+        t = np.cumsum(rng.integers(14, 19, int(end / 16)))
+        t = t[t < end]
+        xy = np.stack(
+            [
+                np.interp(t, times, positions[:, 0]),
+                np.interp(t, times, positions[:, 1]),
+            ],
+            axis=1,
+        )
+        xy += rng.normal(0, 1.5, xy.shape)
+        # alternate K1 and K2, holding each for ~60ms around its hitobject
+        k = np.zeros(len(t), dtype=int)
+        starts = np.searchsorted(t, times - 30)
+        ends = np.searchsorted(t, times + 30)
+        for i, (start, end) in enumerate(zip(starts, ends)):
+            k[start:end] = 5 if i % 2 == 0 else 10
+
+        self.t = t.astype(int)
+        self.xy = xy
+        self.k = k
+        # circleguard only considers replays with replay data to have data
+        self.replay_data = [None]
+        self.username = f"synthetic{seed}"
+        self.user_id = seed
+        self.replay_id = seed
+        self.mods = mods
+        self.loaded = True
+
+    def load(self, loader, cache):
+        pass
+
+    def beatmap_available(self, _library):
+        return True
+
+    map_available = beatmap_available
+
+    def beatmap(self, _library):
+        return self._beatmap
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return id(self)
@@ -1,7 +1,8 @@
+from importlib import import_module
+
 from circlevis.beatmap_info import BeatmapInfo
-from circlevis.visualizer import Visualizer, VisualizerApp
-from circlevis.classifier import ClassifierHotkey, Classifier
 from circlevis.utils import StatisticMode, statistic_function
+from circlevis.statistic_evaluator import StatisticBudget, StatisticLevel
 
 __all__ = [
     "BeatmapInfo",
@@ -10,7 +11,66 @@ __all__ = [
     # classifier
     "ClassifierHotkey",
     "Classifier",
+    "ScreeningReport",
     # statistic functions
     "StatisticMode",
     "statistic_function",
+    "StatisticBudget",
+    "StatisticLevel",
+    # analysis
+    "CursorComparison",
+    "PairSummary",
+    "CursorHeatmap",
+    "KeyPresses",
+    "SimilarityTrack",
+    "SimilarWindow",
+    # frame storage
+    "FrameStore",
+    "ReplayFrames",
+    # live replays
+    "LiveReplay",
+    "RecordedStream",
+    "read_stream",
+    # synchronized playback
+    "PlaybackGroup",
+    # profiling
+    "Tracer",
 ]
+
+# importing the visualizer pulls in PyQt6, circleguard, and slider, which
+# dominates the startup time of anything that imports circlevis. Consumers
+# which only need eg ``BeatmapInfo`` shouldn't have to pay for that, so defer
+# importing these modules until one of their attributes is first accessed.
+_LAZY_ATTRIBUTES = {
+    "Visualizer": "circlevis.visualizer",
+    "VisualizerApp": "circlevis.visualizer",
+    "ClassifierHotkey": "circlevis.classifier",
+    "Classifier": "circlevis.classifier",
+    "ScreeningReport": "circlevis.screening",
+    "CursorComparison": "circlevis.analysis",
+    "PairSummary": "circlevis.analysis",
+    "CursorHeatmap": "circlevis.analysis",
+    "KeyPresses": "circlevis.analysis",
+    "SimilarityTrack": "circlevis.analysis",
+    "SimilarWindow": "circlevis.analysis",
+    "FrameStore": "circlevis.frame_store",
+    "ReplayFrames": "circlevis.frame_store",
+    "LiveReplay": "circlevis.live",
+    "RecordedStream": "circlevis.live",
+    "read_stream": "circlevis.live",
+    "PlaybackGroup": "circlevis.playback_group",
+    "Tracer": "circlevis.trace",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+    # cache on the module so we only go through ``__getattr__`` once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,713 @@
+"""
+Vectorized computations over entire replays. The visualizer precomputes
+these when it loads, but they are also usable on their own, for analysis
+outside of the visualizer.
+"""
+from dataclasses import dataclass
+from itertools import combinations
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# the height of the playfield in osu!pixels, which hard rock flips cursor
+# positions across
+PLAYFIELD_HEIGHT = 384
+
+
+def closest_hitobjects(t, hitobject_times):
+    """
+    The index of the hitobject closest in time to each frame.
+
+    Parameters
+    ----------
+    t: ndarray[int]
+        The time of each frame, in ms.
+    hitobject_times: ndarray[int]
+        The (sorted) time of each hitobject, in ms.
+
+    Returns
+    -------
+    ndarray[int]
+        The index into ``hitobject_times`` of the hitobject closest in time to
+        each frame. Ties are broken in favor of the earlier hitobject.
+    """
+    t = np.asarray(t)
+    hitobject_times = np.asarray(hitobject_times)
+    if len(hitobject_times) == 1:
+        return np.zeros(len(t), dtype=int)
+
+    # the hitobjects on either side of each frame are our two candidates.
+    # Clamping means frames before the first hitobject (or after the last)
+    # compare the first two (or last two) hitobjects, which picks the right
+    # one anyway.
+    later = np.searchsorted(hitobject_times, t)
+    later = np.clip(later, 1, len(hitobject_times) - 1)
+    earlier = later - 1
+    earlier_closer = np.abs(t - hitobject_times[earlier]) <= np.abs(
+        hitobject_times[later] - t
+    )
+    return np.where(earlier_closer, earlier, later)
+
+
+def window_means(values, size):
+    """
+    The mean of every ``size`` long window of the rows of ``values``.
+
+    Parameters
+    ----------
+    values: ndarray[float]
+        A ``(rows, n)`` array.
+    size: int
+        How many values are in each window.
+
+    Returns
+    -------
+    ndarray[float]
+        An array of shape ``(rows, n - size + 1)``, where the ``i``th column is
+        the mean of ``values[:, i : i + size]``.
+    """
+    values = np.asarray(values, dtype=float)
+    rows, n = values.shape
+    if n < size:
+        return np.empty((rows, 0))
+    cumulative = np.zeros((rows, n + 1))
+    np.cumsum(values, axis=1, out=cumulative[:, 1:])
+    return (cumulative[:, size:] - cumulative[:, :-size]) / size
+
+
+def hitobject_distances(xy, hitobject_indices, hitobject_positions, radius):
+    """
+    The distance from each frame to the edge of a hitobject.
+
+    Parameters
+    ----------
+    xy: ndarray[float]
+        The position of each frame, as an ``(n, 2)`` array.
+    hitobject_indices: ndarray[int]
+        For each frame, the index into ``hitobject_positions`` of the hitobject
+        to measure the distance to, eg from :func:`closest_hitobjects`.
+    hitobject_positions: ndarray[float]
+        The position of each hitobject, as an ``(m, 2)`` array.
+    radius: float
+        The radius of hitcircles.
+
+    Returns
+    -------
+    ndarray[float]
+        The distance from each frame to the edge of its hitobject. Negative
+        if the frame is inside the hitobject.
+    """
+    delta = np.asarray(hitobject_positions)[hitobject_indices] - np.asarray(xy)
+    return np.hypot(delta[:, 0], delta[:, 1]) - radius
+
+
+@dataclass
+class PairSummary:
+    """
+    Summary statistics of the distance between the cursors of two replays, as
+    computed by :meth:`CursorComparison.summaries`. All distances are in
+    osu!pixels.
+    """
+
+    # indices of the two replays in the ``CursorComparison``
+    first: int
+    second: int
+    mean: float
+    median: float
+    # the ``q``th percentile distance
+    percentile: float
+    # the lowest mean (and median) distance of any window, ie how close the
+    # cursors were during the stretch of time they were closest
+    closest_window_mean: float
+    closest_window_median: float
+
+
+class CursorComparison:
+    """
+    The distance between the cursors of two or more replays over time, for
+    each pair of replays.
+
+    Every replay is resampled (with linear interpolation) onto a common time
+    grid spanning the time all of the replays overlap, so distances are always
+    measured between cursor positions at the same instant, even when the
+    replays' frames are not at the same times.
+
+    Parameters
+    ----------
+    replays: list
+        The replays to compare. Anything with ``t`` and ``xy`` attributes
+        works, eg ``Player`` or a loaded ``circleguard.Replay``. Replays are
+        compared as given, so any hard rock flipping must already be applied.
+    interval: float
+        The spacing of the time grid, in ms.
+    """
+
+    def __init__(self, replays, interval=1000 / 60):
+        self.interval = interval
+        self.num_replays = len(replays)
+        # every pair of replays, in the order of the rows of ``distances``
+        self.pairs = list(combinations(range(self.num_replays), 2))
+
+        start = max(replay.t[0] for replay in replays)
+        end = min(replay.t[-1] for replay in replays)
+        # empty if the replays don't overlap at all
+        self.times = np.arange(start, end + interval / 2, interval)
+
+        # resampled positions, of shape (num_replays, len(times), 2)
+        self.xy = np.empty((self.num_replays, len(self.times), 2))
+        for i, replay in enumerate(replays):
+            xy = np.asarray(replay.xy)
+            self.xy[i, :, 0] = np.interp(self.times, replay.t, xy[:, 0])
+            self.xy[i, :, 1] = np.interp(self.times, replay.t, xy[:, 1])
+
+        # distances between each pair of replays, of shape
+        # (len(pairs), len(times))
+        self.distances = np.empty((len(self.pairs), len(self.times)))
+        if self.pairs:
+            first, second = np.array(self.pairs).T
+            delta = self.xy[first] - self.xy[second]
+            self.distances = np.hypot(delta[..., 0], delta[..., 1])
+
+    def pair_index(self, first, second):
+        """
+        The row of ``distances`` for the replays at indices ``first`` and
+        ``second``.
+        """
+        return self.pairs.index((min(first, second), max(first, second)))
+
+    def index(self, time):
+        """
+        The index into ``times`` closest to ``time``, or ``None`` if ``time``
+        is outside of the time all of the replays overlap.
+        """
+        if len(self.times) == 0:
+            return None
+        half_interval = self.interval / 2
+        if not self.times[0] - half_interval <= time <= self.times[-1] + half_interval:
+            return None
+        index = int(round((time - self.times[0]) / self.interval))
+        return min(index, len(self.times) - 1)
+
+    def distance_at(self, pair_index, time):
+        """
+        The distance between the cursors of the given pair at ``time``, or
+        ``None`` if ``time`` is outside of the time all of the replays overlap.
+        """
+        index = self.index(time)
+        if index is None:
+            return None
+        return self.distances[pair_index, index]
+
+    def window_size(self, window):
+        """
+        How many samples of our time grid fit in ``window`` ms.
+        """
+        return max(1, int(round(window / self.interval)))
+
+    def sliding_window(self, window, statistic="mean", q=50):
+        """
+        A statistic of the distance between each pair of cursors over every
+        ``window`` ms long window of time.
+
+        Parameters
+        ----------
+        window: float
+            The length of each window, in ms.
+        statistic: {"mean", "median", "percentile"}
+            The statistic to compute over each window.
+        q: float
+            The percentile to compute, if ``statistic`` is ``"percentile"``.
+
+        Returns
+        -------
+        ndarray[float]
+            An array of shape ``(len(pairs), num_windows)``, where the ``i``th
+            window starts at ``times[i]``.
+        """
+        size = self.window_size(window)
+        num_windows = max(0, len(self.times) - size + 1)
+        if num_windows == 0:
+            return np.empty((len(self.pairs), 0))
+
+        if statistic == "mean":
+            return window_means(self.distances, size)
+
+        if statistic not in ["median", "percentile"]:
+            raise ValueError(
+                f"statistic must be one of mean, median, or percentile, not "
+                f"{statistic}"
+            )
+        q = 50 if statistic == "median" else q
+        result = np.empty((len(self.pairs), num_windows))
+        # one pair at a time, so we only ever hold one pair's worth of windows
+        # in memory
+        for i, distances in enumerate(self.distances):
+            windows = sliding_window_view(distances, size)
+            result[i] = np.percentile(windows, q, axis=1)
+        return result
+
+    def summaries(self, window=1000, q=10, sort_by="closest_window_median"):
+        """
+        Summary statistics of the distance between each pair of cursors,
+        sorted (ascending) by the ``sort_by`` attribute of ``PairSummary``. By
+        default, the pairs whose cursors were closest together for a
+        ``window`` ms stretch of time come first.
+
+        Returns
+        -------
+        list[PairSummary]
+        """
+        window_means = self.sliding_window(window, "mean")
+        window_medians = self.sliding_window(window, "median")
+
+        summaries = []
+        for i, (first, second) in enumerate(self.pairs):
+            distances = self.distances[i]
+            if len(distances) == 0:
+                nan = float("nan")
+                summaries.append(PairSummary(first, second, nan, nan, nan, nan, nan))
+                continue
+            summaries.append(
+                PairSummary(
+                    first,
+                    second,
+                    float(np.mean(distances)),
+                    float(np.median(distances)),
+                    float(np.percentile(distances, q)),
+                    float(np.min(window_means[i])),
+                    float(np.min(window_medians[i])),
+                )
+            )
+        return sorted(summaries, key=lambda summary: getattr(summary, sort_by))
+
+
+@dataclass
+class SimilarWindow:
+    """
+    A stretch of time where two replays' cursors were especially similar, as
+    found by :meth:`SimilarityTrack.most_similar`.
+    """
+
+    # in ms
+    start: float
+    end: float
+    # the mean distance between the cursors over the window, in osu!pixels
+    similarity: float
+    # whether the cursors were this similar with the second replay flipped
+    # vertically, instead of as given
+    flipped: bool
+
+
+class SimilarityTrack:
+    """
+    How similar the cursors of two replays are over the course of the replays,
+    for finding the parts of a replay which were stolen from another.
+
+    Similarity is measured the same way circleguard measures it, as the mean
+    distance (in osu!pixels) between the two cursors, so lower is more similar.
+    Here it is measured over every ``window`` ms long stretch of time, starting
+    every ``step`` ms. Both replays are resampled onto a common time grid
+    first (see ``CursorComparison``), so their cursors are compared at the same
+    instants.
+
+    A stolen replay may have had hard rock added or removed, which flips it
+    vertically, so every window is also compared with the second replay
+    flipped.
+
+    Parameters
+    ----------
+    first, second:
+        The replays to compare. Anything with ``t`` and ``xy`` attributes
+        works, eg ``Player`` or a loaded ``circleguard.Replay``.
+    window: float
+        The length of each window, in ms.
+    step: float
+        How far apart the starts of consecutive windows are, in ms.
+    interval: float
+        The spacing of the common time grid, in ms.
+    """
+
+    def __init__(self, first, second, window=2000, step=250, interval=1000 / 60):
+        self.window = window
+        self.step = step
+
+        comparison = CursorComparison([first, second], interval)
+        xy = comparison.xy
+        delta = xy[0] - xy[1]
+        distances = np.hypot(delta[:, 0], delta[:, 1])
+        # flipping the second cursor's y across the playfield
+        flipped_dy = xy[0, :, 1] - (PLAYFIELD_HEIGHT - xy[1, :, 1])
+        flipped_distances = np.hypot(delta[:, 0], flipped_dy)
+
+        size = comparison.window_size(window)
+        stride = comparison.window_size(step)
+        means = window_means([distances, flipped_distances], size)[:, ::stride]
+        # the start time of each window
+        self.times = comparison.times[: len(comparison.times) - size + 1 : stride]
+        self.similarity = means[0]
+        self.flipped_similarity = means[1]
+
+    def best(self):
+        """
+        The similarity of each window, as given or flipped, whichever is more
+        similar.
+        """
+        return np.minimum(self.similarity, self.flipped_similarity)
+
+    def most_similar(self, count=5):
+        """
+        The ``count`` most similar windows which don't overlap each other, most
+        similar first.
+
+        Returns
+        -------
+        list[SimilarWindow]
+        """
+        best = self.best()
+        windows = []
+        for i in np.argsort(best, kind="stable"):
+            if len(windows) == count:
+                break
+            start = float(self.times[i])
+            if any(abs(start - window.start) < self.window for window in windows):
+                continue
+            flipped = bool(self.flipped_similarity[i] < self.similarity[i])
+            windows.append(
+                SimilarWindow(start, start + self.window, float(best[i]), flipped)
+            )
+        return windows
+
+
+class SnapGeometry:
+    """
+    The geometry circleguard's snap detection looks at, for every frame of a
+    replay: the angle the cursor turns through at that frame, and how far it
+    moved to and from that frame.
+
+    A frame is a snap if its angle is less than some ``max_angle`` and both of
+    its distances are more than some ``min_distance``. Only the thresholds are
+    left to apply here, so snaps for new thresholds can be found in a single
+    vectorized pass, without recalculating any geometry. The results match
+    ``circleguard.snaps`` for the same thresholds.
+
+    Parameters
+    ----------
+    t: ndarray[int]
+        The time of each frame, in ms.
+    xy: ndarray[float]
+        The position of each frame, as an ``(n, 2)`` array.
+    """
+
+    def __init__(self, t, xy):
+        t = np.asarray(t)
+        xy = np.asarray(xy, dtype=float)
+        # frames with the same time as an earlier frame are (falsely) detected
+        # as snaps, so circleguard leaves them out, and so do we
+        t, unique = np.unique(t, return_index=True)
+        xy = xy[unique]
+
+        # the middle frame of every three consecutive frames (a, b, c) is
+        # where the cursor may have snapped. ``indices`` are the indices of
+        # those frames into the frames we were given.
+        self.indices = unique[1:-1]
+        self.times = t[1:-1]
+        self.positions = xy[1:-1]
+        if len(t) < 3:
+            self.angles = np.empty(0)
+            self.distances = np.empty(0)
+            return
+
+        ab = xy[1:-1] - xy[:-2]
+        bc = xy[2:] - xy[1:-1]
+        ac = xy[2:] - xy[:-2]
+        AB = np.hypot(ab[:, 0], ab[:, 1])
+        BC = np.hypot(bc[:, 0], bc[:, 1])
+        AC = np.hypot(ac[:, 0], ac[:, 1])
+        # law of cosines, the same as circleguard. The angle is undefined
+        # (nan) if the cursor didn't move to or from ``b``.
+        numerator = -(AC**2 - AB**2 - BC**2)
+        denominator = 2 * AB * BC
+        cos_beta = np.full(len(numerator), np.nan)
+        np.divide(numerator, denominator, out=cos_beta, where=denominator != 0)
+        # rounding can take ``cos_beta`` just outside of arccos' domain
+        np.clip(cos_beta, -1, 1, out=cos_beta)
+        # in degrees
+        self.angles = np.full(len(cos_beta), np.nan)
+        defined = ~np.isnan(cos_beta)
+        self.angles[defined] = np.rad2deg(np.arccos(cos_beta[defined]))
+        self.distances = np.minimum(AB, BC)
+
+    def snaps(self, max_angle, min_distance):
+        """
+        Which of our frames are snaps for the given thresholds.
+
+        Returns
+        -------
+        ndarray[bool]
+            Whether each of our (middle) frames is a snap.
+        """
+        snaps = np.zeros(len(self.angles), dtype=bool)
+        np.less(self.angles, max_angle, out=snaps, where=~np.isnan(self.angles))
+        snaps &= self.distances > min_distance
+        return snaps
+
+
+def simplify_path(xy, tolerance, keep=None):
+    """
+    Simplifies a path with the Ramer-Douglas-Peucker algorithm.
+
+    Parameters
+    ----------
+    xy: ndarray[float]
+        The points of the path, as an ``(n, 2)`` array.
+    tolerance: float
+        How far (in the units of ``xy``) any dropped point may be from the
+        simplified path.
+    keep: ndarray[bool]
+        Which points must be kept no matter what, if any (eg points where the
+        keys held change).
+
+    Returns
+    -------
+    ndarray[int]
+        The (sorted) indices of the points in the simplified path. Always
+        includes the first and last point.
+    """
+    xy = np.asarray(xy, dtype=float)
+    kept = np.zeros(len(xy), dtype=bool)
+    if len(xy) == 0:
+        return np.flatnonzero(kept)
+    kept[[0, -1]] = True
+    if keep is not None:
+        kept |= np.asarray(keep, dtype=bool)
+
+    # points we have to keep split the path into pieces, which are simplified
+    # independently. Use a stack instead of recursion so long, noisy paths
+    # can't hit the recursion limit.
+    breakpoints = np.flatnonzero(kept)
+    pieces = list(zip(breakpoints[:-1], breakpoints[1:]))
+    while pieces:
+        start, end = pieces.pop()
+        if end - start < 2:
+            continue
+        a = xy[start]
+        ab = xy[end] - a
+        ap = xy[start + 1 : end] - a
+        # distance from each point to the segment from a to b (not to the
+        # infinite line through them, since cursors often double back)
+        length_squared = ab @ ab
+        if length_squared == 0:
+            delta = ap
+        else:
+            u = np.clip(ap @ ab / length_squared, 0, 1)
+            delta = ap - np.outer(u, ab)
+        distances = np.hypot(delta[:, 0], delta[:, 1])
+        i = np.argmax(distances)
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            kept[split] = True
+            pieces.append((start, split))
+            pieces.append((split, end))
+    return np.flatnonzero(kept)
+
+
+class CursorHeatmap:
+    """
+    How many cursor frames of one or more replays fall into each cell of a grid
+    over the playfield.
+
+    Frames are binned once, up front, so the counts over any window of time
+    are a ``np.bincount`` away, and moving a window only needs to count the
+    frames which entered or left it.
+
+    Parameters
+    ----------
+    replays: list
+        The replays to count the frames of. Anything with ``t``, ``xy``, and
+        ``keydowns`` attributes works.
+    bin_size: float
+        The width and height of each cell, in osu!pixels.
+    keydowns_only: bool
+        Whether to only count frames where a key was pressed, instead of every
+        frame.
+    width, height: float
+        The size of the area to bin, in osu!pixels. Frames outside of it are
+        not counted.
+    """
+
+    def __init__(self, replays, bin_size=8, keydowns_only=False, width=512, height=384):
+        self.bin_size = bin_size
+        # (rows, columns)
+        self.shape = (int(np.ceil(height / bin_size)), int(np.ceil(width / bin_size)))
+        self.size = self.shape[0] * self.shape[1]
+
+        t = [np.empty(0)]
+        bins = [np.empty(0, dtype=int)]
+        for replay in replays:
+            xy = np.asarray(replay.xy)
+            mask = (
+                (xy[:, 0] >= 0)
+                & (xy[:, 0] < width)
+                & (xy[:, 1] >= 0)
+                & (xy[:, 1] < height)
+            )
+            if keydowns_only:
+                mask &= np.asarray(replay.keydowns) != 0
+            row = (xy[mask, 1] // bin_size).astype(int)
+            column = (xy[mask, 0] // bin_size).astype(int)
+            t.append(np.asarray(replay.t)[mask])
+            bins.append(row * self.shape[1] + column)
+
+        # the time and (flattened) cell of every counted frame, sorted by time
+        t = np.concatenate(t)
+        order = np.argsort(t, kind="stable")
+        self.t = t[order]
+        self.bins = np.concatenate(bins)[order]
+
+        # the counts over every frame, as an array of ``shape``
+        self.counts = self._count(0, len(self.t)).reshape(self.shape)
+
+        # the frames (as indices into ``t``) and counts (as an array of
+        # ``shape``) of the last window we were asked for
+        self._window = None
+        self._window_counts = None
+
+    def _count(self, start, end):
+        return np.bincount(self.bins[start:end], minlength=self.size)
+
+    def window_counts(self, start_time, end_time):
+        """
+        The counts over only the frames from ``start_time`` to ``end_time``
+        (inclusive), as an array of ``shape``.
+
+        Updated incrementally from the previous call, so calling this with a
+        window which moves a little at a time (eg as playback advances) is
+        cheap. Returns the same array as the previous call if no frames
+        entered or left the window.
+        """
+        start = np.searchsorted(self.t, start_time, "left")
+        end = np.searchsorted(self.t, end_time, "right")
+        if self._window == (start, end):
+            return self._window_counts
+
+        if (
+            self._window is None
+            or start >= self._window[1]
+            or end <= self._window[0]
+        ):
+            # no overlap with the previous window to reuse
+            counts = self._count(start, end)
+        else:
+            previous_start, previous_end = self._window
+            # copy so arrays we returned earlier stay as they were
+            counts = self._window_counts.flatten()
+            if start < previous_start:
+                counts += self._count(start, previous_start)
+            else:
+                counts -= self._count(previous_start, start)
+            if end > previous_end:
+                counts += self._count(previous_end, end)
+            else:
+                counts -= self._count(end, previous_end)
+
+        self._window = (start, end)
+        # keep the reshaped array, so repeated calls return the very same array
+        # and callers can tell nothing changed by identity
+        self._window_counts = counts.reshape(self.shape)
+        return self._window_counts
+
+
+# the keys a replay can press, as shown by the visualizer. Pressing K1 (or K2)
+# also sets the bit for M1 (or M2), so M1 and M2 only count as pressed when
+# their keyboard key isn't.
+KEYS = ["M1", "M2", "K1", "K2"]
+# bits of a frame's ``k`` value, see ``circleguard.Key``
+_M1, _M2, _K1, _K2 = 1, 2, 4, 8
+
+
+def key_states(k):
+    """
+    Which of ``KEYS`` are held in each frame.
+
+    Parameters
+    ----------
+    k: ndarray[int]
+        The keys held in each frame, as a bitmask of ``circleguard.Key``.
+
+    Returns
+    -------
+    ndarray[bool]
+        An array of shape ``(len(KEYS), len(k))``.
+    """
+    k = np.asarray(k, dtype=int)
+    return np.stack(
+        [
+            ((k & _M1) != 0) & ((k & _K1) == 0),
+            ((k & _M2) != 0) & ((k & _K2) == 0),
+            (k & _K1) != 0,
+            (k & _K2) != 0,
+        ]
+    )
+
+
+class KeyPresses:
+    """
+    Every press of each of ``KEYS`` in a replay, as intervals of time.
+
+    Presses are found with a single pass of edge detection over the keys held
+    in each frame. A press starts at the first frame its key is held in and
+    ends at the first frame it isn't (or at the last frame, if the key is
+    never released).
+
+    Parameters
+    ----------
+    t: ndarray[int]
+        The time of each frame, in ms.
+    k: ndarray[int]
+        The keys held in each frame, as a bitmask of ``circleguard.Key``.
+
+    Attributes
+    ----------
+    states: ndarray[bool]
+        Which keys are held in each frame, see :func:`key_states`.
+    starts, ends: list[ndarray[int]]
+        For each of ``KEYS``, the (sorted) start and end time of each press.
+    hold_durations: list[ndarray[int]]
+        For each of ``KEYS``, how long (in ms) each press was held for.
+    tap_rates: list[ndarray[float]]
+        For each of ``KEYS``, the instantaneous tap rate (in presses per
+        second) between each press and the next. ``nan`` where two presses
+        start at the same time.
+    """
+
+    def __init__(self, t, k):
+        t = np.asarray(t)
+        self.states = key_states(k)
+        self.starts = []
+        self.ends = []
+        self.hold_durations = []
+        self.tap_rates = []
+        for held in self.states:
+            # +1 where a press starts and -1 where one ends. Pad with unheld
+            # frames so presses at either end of the replay have both edges.
+            edges = np.diff(np.concatenate([[0], held.astype(np.int8), [0]]))
+            starts = t[np.flatnonzero(edges == 1)]
+            ends = t[np.minimum(np.flatnonzero(edges == -1), len(t) - 1)]
+            self.starts.append(starts)
+            self.ends.append(ends)
+            self.hold_durations.append(ends - starts)
+
+            intervals = np.diff(starts)
+            tap_rates = np.full(len(intervals), np.nan)
+            np.divide(1000, intervals, out=tap_rates, where=intervals > 0)
+            self.tap_rates.append(tap_rates)
+
+    def window(self, key, start_time, end_time):
+        """
+        The start and end times of the presses of the ``key``th of ``KEYS``
+        which overlap the window from ``start_time`` to ``end_time``.
+        """
+        # presses of a single key never overlap, so their ends are sorted too
+        start = np.searchsorted(self.ends[key], start_time, "left")
+        end = np.searchsorted(self.starts[key], end_time, "right")
+        return self.starts[key][start:end], self.ends[key][start:end]
@@ -9,6 +9,8 @@ from PyQt6.QtGui import QKeySequence, QShortcut
 
 from circlevis.beatmap_info import BeatmapInfo
 from circlevis.visualizer import Visualizer
+from circlevis.frame_store import FrameStore
+from circlevis.screening import Screener
 from circlevis.palette import get_dark_palette
 
 
@@ -38,23 +40,87 @@ class Classifier:
     When you've decided on a score for the replay, hit the corresponding number
     button, and have your function call ``self.next_replay`` to show the next
     replay in order to you.
+
+    Expensive heuristics for which replays aren't worth reviewing can be moved
+    out of ``should_skip``, which runs one replay at a time just before it
+    would be shown, into a pre-screening stage with ``skip_function`` and
+    ``score_function``. These are evaluated over the whole queue in a process
+    pool, and only the replays which survive are shown: in order, or highest
+    score first if there's a ``score_function``. They're called with the
+    ``ReplayFrames`` and mods of a replay rather than the replay itself, and
+    are pickled to the pool's worker processes, so they have to be defined at
+    the top level of a module, and the script creating the classifier has to be
+    guarded by ``if __name__ == "__main__":``. How screening went is available as
+    ``screening`` (a ``ScreeningReport``), and passed to ``screening_done``
+    once the queue runs out.
+
+    Parameters
+    ----------
+    replays: iterable of circleguard.Replay
+        The replays to classify.
+    cg: circleguard.Circleguard
+        The circleguard to load replays with.
+    hotkeys: list[ClassifierHotkey]
+        The hotkeys to listen for while a replay is shown.
+    skip_function: Callable[[ReplayFrames, ModCombination], bool] or None
+        Whether a replay should be skipped without being shown. Runs in a
+        worker process.
+    score_function: Callable[[ReplayFrames, ModCombination], float] or None
+        A score for each replay which isn't skipped. Replays are shown highest
+        score first instead of in order, which means the whole queue has to be
+        screened before the first replay is shown. Runs in a worker process.
+    screening_workers: int or None
+        How many worker processes to screen replays with. Defaults to the
+        number of cpus.
     """
 
-    def __init__(self, replays, cg, hotkeys):
+    def __init__(
+        self,
+        replays,
+        cg,
+        hotkeys,
+        skip_function=None,
+        score_function=None,
+        screening_workers=None,
+    ):
         self.app = QApplication([])
         self.app.setStyle("Fusion")
         self.app.setApplicationName("Circlevis")
         dark_palette = get_dark_palette()
         self.app.setPalette(dark_palette)
 
-        self._replays = iter(replays)
         self.cg = cg
         self.hotkeys = hotkeys
         self.vis = None
+        # every visualizer we show reads its frames from here instead of
+        # keeping its own copies. Frames are written to a temporary file which
+        # the os can page out, so reviewing thousands of replays doesn't keep
+        # thousands of replays' worth of frames in memory.
+        self.frame_store = FrameStore()
+
+        self.screener = None
+        self.screening = None
+        if skip_function is not None or score_function is not None:
+            self.screener = Screener(
+                replays,
+                self.load,
+                self.frame_store,
+                skip_function,
+                score_function,
+                max_workers=screening_workers,
+            )
+            self.screening = self.screener.report
+            replays = self.screener
+        self._replays = iter(replays)
 
     def start(self):
-        self.next_replay()
-        self.app.exec()
+        try:
+            self.next_replay()
+            self.app.exec()
+        finally:
+            if self.screener is not None:
+                self.screener.close()
+            self.frame_store.close()
 
     def next_replay(self):
         """
@@ -66,10 +132,14 @@ class Classifier:
         try:
             replay = next(self._replays)
         except StopIteration:
+            if self.screening is not None:
+                self.screening_done(self.screening)
             self.done()
             return
 
-        load_succeeded = self.load(replay)
+        # screened replays were already loaded before being screened, and
+        # replays which failed to load were never screened
+        load_succeeded = self.screener is not None or self.load(replay)
         bm = self.beatmap_info(replay)
 
         if not load_succeeded or self.should_skip(replay, bm):
@@ -89,7 +159,7 @@ class Classifier:
         subclasses, primarily in case subclasses want to return a subclass of
         ``Visualizer``.
         """
-        return Visualizer(bm, [replay])
+        return Visualizer(bm, [replay], frame_store=self.frame_store)
 
     def load(self, replay):
         """
@@ -116,6 +186,14 @@ class Classifier:
         """
         return False
 
+    def screening_done(self, report):
+        """
+        Called with the ``ScreeningReport`` of the pre-screening stage once
+        every replay has been screened and reviewed. Provided as a hook for
+        subclasses which want to see the report.
+        """
+        pass
+
     def done(self):
         """
         Called when the classifier has finished classifying all of its replays.
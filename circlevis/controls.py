@@ -1,9 +1,15 @@
 from PyQt6.QtWidgets import QFrame, QGridLayout, QLabel, QVBoxLayout
 from PyQt6.QtGui import QIcon
 from PyQt6.QtCore import Qt, pyqtSignal
-from circleguard import Mod, Replay
+from circleguard import Mod, Replay, KeylessCircleguard
 
 from circlevis.utils import resource_path
+from circlevis.timeline import (
+    TimelineStrip,
+    SimilarityStrip,
+    TIMELINE_HEIGHT,
+    SIMILARITY_HEIGHT,
+)
 from circlevis.widgets import (
     JumpSlider,
     PushButton,
@@ -22,16 +28,33 @@ class VisualizerControls(QFrame):
     num_frames_changed = pyqtSignal(int)
     draw_hit_error_bar_changed = pyqtSignal(bool)
     circle_size_mod_changed = pyqtSignal(str)
+    heatmap_changed = pyqtSignal(str)
+    heatmap_keydowns_only_changed = pyqtSignal(bool)
+    heatmap_bin_size_changed = pyqtSignal(int)
+    full_path_changed = pyqtSignal(bool)
+    key_timeline_changed = pyqtSignal(bool)
+    follow_live_changed = pyqtSignal(bool)
+    snap_max_angle_changed = pyqtSignal(int)
+    snap_min_distance_changed = pyqtSignal(int)
+    judgment_player_changed = pyqtSignal(int)
 
     show_info_for_replay = pyqtSignal(Replay)
 
-    def __init__(self, speed, mods, replays):
+    def __init__(self, speed, mods, replays, snaps_args={}):
         super().__init__()
         self.replays = replays
         self.time_slider = JumpSlider(Qt.Orientation.Horizontal)
         self.time_slider.setValue(0)
         self.time_slider.setFixedHeight(20)
         self.time_slider.setStyleSheet("outline: none;")
+        # an overview of the entire replay, drawn under the time slider
+        self.timeline = TimelineStrip()
+        # how similar the two replays are over time, only shown when comparing
+        # exactly two (finished) replays
+        self.similarity_strip = SimilarityStrip()
+        self.show_similarity = len(replays) == 2 and not any(
+            getattr(replay, "live", False) for replay in replays
+        )
 
         self.play_reverse_button = PushButton()
         self.play_reverse_button.setIcon(QIcon(resource_path("play_reverse.png")))
@@ -93,7 +116,8 @@ class VisualizerControls(QFrame):
         self.settings_button.setToolTip("Open settings")
         self.settings_button.clicked.connect(self.settings_button_clicked)
 
-        self.settings_popup = SettingsPopup(self, mods)
+        live = any(getattr(replay, "live", False) for replay in replays)
+        self.settings_popup = SettingsPopup(self, mods, live, snaps_args, replays)
         self.settings_popup.raw_view_changed.connect(self.raw_view_changed)
         self.settings_popup.only_color_keydowns_changed.connect(
             self.only_color_keydowns_changed
@@ -109,6 +133,23 @@ class VisualizerControls(QFrame):
         self.settings_popup.circle_size_mod_changed.connect(
             self.circle_size_mod_changed
         )
+        self.settings_popup.heatmap_changed.connect(self.heatmap_changed)
+        self.settings_popup.heatmap_keydowns_only_changed.connect(
+            self.heatmap_keydowns_only_changed
+        )
+        self.settings_popup.heatmap_bin_size_changed.connect(
+            self.heatmap_bin_size_changed
+        )
+        self.settings_popup.full_path_changed.connect(self.full_path_changed)
+        self.settings_popup.key_timeline_changed.connect(self.key_timeline_changed)
+        self.settings_popup.follow_live_changed.connect(self.follow_live_changed)
+        self.settings_popup.snap_max_angle_changed.connect(self.snap_max_angle_changed)
+        self.settings_popup.snap_min_distance_changed.connect(
+            self.snap_min_distance_changed
+        )
+        self.settings_popup.judgment_player_changed.connect(
+            self.judgment_player_changed
+        )
 
         self.speed_up_button = PushButton()
         self.speed_up_button.setIcon(QIcon(resource_path("speed_up.png")))
@@ -133,9 +174,17 @@ class VisualizerControls(QFrame):
         layout.addWidget(self.info_widget, 16, 17, 1, 1)
         layout.addWidget(self.settings_button, 16, 18, 1, 1)
         layout.addWidget(self.copy_to_clipboard_button, 16, 19, 1, 1)
+        layout.addWidget(self.timeline, 17, 8, 1, 9)
+        height = 25 + TIMELINE_HEIGHT + 2
+        if self.show_similarity:
+            layout.addWidget(self.similarity_strip, 18, 8, 1, 9)
+            height += SIMILARITY_HEIGHT + 2
+        else:
+            self.similarity_strip.hide()
         layout.setContentsMargins(5, 0, 5, 5)
+        layout.setVerticalSpacing(2)
         self.setLayout(layout)
-        self.setFixedHeight(25)
+        self.setFixedHeight(height)
 
     def set_paused_state(self, paused):
         icon = "play.png" if paused else "pause.png"
@@ -143,6 +192,10 @@ class VisualizerControls(QFrame):
 
     def info_button_clicked(self):
         replay = self.replays[0]
+        # live replays aren't circleguard replays, and there's no info to
+        # show for them until they're done anyway
+        if getattr(replay, "live", False):
+            return
         self.show_info_for_replay.emit(replay)
 
     def settings_button_clicked(self):
@@ -170,6 +223,8 @@ class VisualizerControls(QFrame):
         replay = self.info_widget.currentData()
         # reset to default entry
         self.info_widget.setCurrentIndex(0)
+        if getattr(replay, "live", False):
+            return
         self.show_info_for_replay.emit(replay)
 
 
@@ -181,8 +236,17 @@ class SettingsPopup(QFrame):
     num_frames_changed = pyqtSignal(int)
     draw_hit_error_bar_changed = pyqtSignal(bool)
     circle_size_mod_changed = pyqtSignal(str)
-
-    def __init__(self, parent, mods):
+    heatmap_changed = pyqtSignal(str)
+    heatmap_keydowns_only_changed = pyqtSignal(bool)
+    heatmap_bin_size_changed = pyqtSignal(int)
+    full_path_changed = pyqtSignal(bool)
+    key_timeline_changed = pyqtSignal(bool)
+    follow_live_changed = pyqtSignal(bool)
+    snap_max_angle_changed = pyqtSignal(int)
+    snap_min_distance_changed = pyqtSignal(int)
+    judgment_player_changed = pyqtSignal(int)
+
+    def __init__(self, parent, mods, live=False, snaps_args={}, replays=[]):
         super().__init__(parent)
         # we're technically a window, but we don't want to be shown as such to
         # the user, so hide our window features (like the top bar)
@@ -215,6 +279,62 @@ class SettingsPopup(QFrame):
         self.hit_error_bar_cb = CheckboxSetting("Draw hit error bar:", True)
         self.hit_error_bar_cb.state_changed.connect(self.draw_hit_error_bar_changed)
 
+        self.full_path_cb = CheckboxSetting("Draw full path:", False)
+        self.full_path_cb.state_changed.connect(self.full_path_changed)
+
+        self.key_timeline_cb = CheckboxSetting("Draw key timeline:", False)
+        self.key_timeline_cb.state_changed.connect(self.key_timeline_changed)
+
+        self.follow_live_cb = CheckboxSetting("Follow live:", True)
+        self.follow_live_cb.state_changed.connect(self.follow_live_changed)
+
+        self.heatmap_cmb = ComboBoxSetting(
+            "Heatmap:", "Off", ["Off", "Whole replay", "Recent"]
+        )
+        self.heatmap_cmb.value_changed.connect(self.heatmap_changed)
+
+        self.heatmap_keydowns_only_cb = CheckboxSetting(
+            "Heatmap keydowns only:", False
+        )
+        self.heatmap_keydowns_only_cb.state_changed.connect(
+            self.heatmap_keydowns_only_changed
+        )
+
+        self.heatmap_bin_size_slider = SliderSetting("Heatmap bin size:", 8, 2, 32)
+        self.heatmap_bin_size_slider.value_changed.connect(
+            self.heatmap_bin_size_changed
+        )
+
+        # the thresholds snaps are found with, the same as the arguments to
+        # ``circleguard.snaps``. Changing them finds snaps again right away.
+        max_angle = snaps_args.get("max_angle", KeylessCircleguard.DEFAULT_ANGLE)
+        self.snap_max_angle_slider = SliderSetting(
+            "Snap max angle:", int(max_angle), 1, 90
+        )
+        self.snap_max_angle_slider.value_changed.connect(self.snap_max_angle_changed)
+
+        min_distance = snaps_args.get(
+            "min_distance", KeylessCircleguard.DEFAULT_DISTANCE
+        )
+        self.snap_min_distance_slider = SliderSetting(
+            "Snap min distance:", int(min_distance), 0, 50
+        )
+        self.snap_min_distance_slider.value_changed.connect(
+            self.snap_min_distance_changed
+        )
+
+        # which replay's judgments to tint hitobjects by. Replays can share a
+        # username, so tell the renderer which replay by its index instead
+        usernames = [replay.username for replay in replays] or [""]
+        self.judgment_player_cmb = ComboBoxSetting(
+            "Judgments of:", usernames[0], usernames
+        )
+        self.judgment_player_cmb.value_changed.connect(
+            lambda _username: self.judgment_player_changed.emit(
+                self.judgment_player_cmb.combobox.currentIndex()
+            )
+        )
+
         layout = QVBoxLayout()
         layout.addWidget(self.raw_view_cb)
         layout.addWidget(self.only_color_keydowns)
@@ -223,4 +343,17 @@ class SettingsPopup(QFrame):
         layout.addWidget(self.hit_error_bar_cb)
         layout.addWidget(self.circle_size_mod_cmb)
         layout.addWidget(self.num_frames_slider)
+        layout.addWidget(self.full_path_cb)
+        layout.addWidget(self.key_timeline_cb)
+        layout.addWidget(self.heatmap_cmb)
+        layout.addWidget(self.heatmap_keydowns_only_cb)
+        layout.addWidget(self.heatmap_bin_size_slider)
+        layout.addWidget(self.snap_max_angle_slider)
+        layout.addWidget(self.snap_min_distance_slider)
+        # only relevant if there's more than one replay to choose from
+        if len(replays) > 1:
+            layout.addWidget(self.judgment_player_cmb)
+        # only relevant if some of our replays are live
+        if live:
+            layout.addWidget(self.follow_live_cb)
         self.setLayout(layout)
@@ -0,0 +1,183 @@
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+# the dtype each of a replay's arrays is stored as. This is about half the size
+# of what circleguard gives us (float64 coordinates and int64 times), and is
+# plenty precise for osu!pixels and milliseconds.
+T_DTYPE = np.dtype(np.int32)
+XY_DTYPE = np.dtype(np.float32)
+K_DTYPE = np.dtype(np.uint8)
+# the bytes a single frame takes up in the store: a time, two coordinates, a
+# key state, and a keydown state
+FRAME_SIZE = T_DTYPE.itemsize + 2 * XY_DTYPE.itemsize + 2 * K_DTYPE.itemsize
+# every replay's frames start on a multiple of this many bytes
+ALIGNMENT = 8
+
+
+class ReplayFrames:
+    """
+    The frames of a single replay in a ``FrameStore``, as read-only arrays
+    which are views of the store's file.
+
+    Instances can be pickled, in which case only the location of the frames in
+    the store is sent. Unpickling (eg in a worker process) maps the same file
+    again, so every process shares the same pages instead of each holding its
+    own copy.
+    """
+
+    def __init__(self, path, offset, num_frames):
+        self.path = path
+        self.offset = offset
+        self.num_frames = num_frames
+
+        n = num_frames
+        # the arrays are laid out one after the other: ``t``, then ``xy``,
+        # then ``k``, then ``keydowns``
+        t_offset = offset
+        xy_offset = t_offset + n * T_DTYPE.itemsize
+        k_offset = xy_offset + n * 2 * XY_DTYPE.itemsize
+        keydowns_offset = k_offset + n * K_DTYPE.itemsize
+
+        self.t = self._map(T_DTYPE, t_offset, (n,))
+        self.xy = self._map(XY_DTYPE, xy_offset, (n, 2))
+        self.k = self._map(K_DTYPE, k_offset, (n,))
+        self.keydowns = self._map(K_DTYPE, keydowns_offset, (n,))
+
+    def _map(self, dtype, offset, shape):
+        # numpy can't map zero bytes
+        if self.num_frames == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+    @property
+    def nbytes(self):
+        return self.num_frames * FRAME_SIZE
+
+    def __len__(self):
+        return self.num_frames
+
+    def __reduce__(self):
+        return (ReplayFrames, (self.path, self.offset, self.num_frames))
+
+
+class FrameStore:
+    """
+    Stores the frames of replays in a compact, memory-mapped file.
+
+    Each replay's frames are written to the file once, by ``add``, as int32
+    times, float32 coordinates, and uint8 keys. ``add`` returns a
+    ``ReplayFrames`` whose arrays are read-only views of the file, so any
+    number of visualizers - and any worker processes they're pickled to - can
+    read the same frames without copying them, and the os is free to page
+    frames which aren't being looked at out of memory.
+
+    Parameters
+    ----------
+    path: str or None
+        The file to store frames in. It is created if it doesn't exist and
+        appended to if it does. If ``None``, a temporary file is used, which is
+        deleted when the store is closed or garbage collected.
+    """
+
+    def __init__(self, path=None):
+        temporary = path is None
+        if temporary:
+            fd, path = tempfile.mkstemp(prefix="circlevis-frames-", suffix=".bin")
+            os.close(fd)
+        self.path = str(path)
+        self._file = open(self.path, "ab")
+        # where the next replay's frames will be written. Pad an existing file
+        # out to our alignment first, in case it was written by something else
+        self._end = self._file.seek(0, os.SEEK_END)
+        padding = -self._end % ALIGNMENT
+        self._file.write(b"\0" * padding)
+        self._end += padding
+        # maps ``flip_y`` to a map of ``id(replay)`` to the ``ReplayFrames`` of
+        # that replay, so adding the same replay twice doesn't write it twice.
+        # Keyed by identity, since circleguard's replays are either unhashable
+        # or compare equal to distinct replays, and entries are removed when
+        # their replay is garbage collected so the store doesn't keep every
+        # replay it has seen alive (or hand its frames to a later replay with
+        # the same id).
+        self._frames = {False: {}, True: {}}
+        self._finalizer = weakref.finalize(
+            self, FrameStore._cleanup, self._file, self.path if temporary else None
+        )
+
+    @staticmethod
+    def _cleanup(file, path):
+        file.close()
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        # windows won't let us remove a file which is still mapped
+        except OSError:
+            pass
+
+    def add(self, replay, flip_y=False):
+        """
+        Writes the frames of ``replay`` to the store, if they aren't there
+        already, and returns them as a ``ReplayFrames``.
+
+        Parameters
+        ----------
+        replay: circleguard.Replay
+            The (loaded) replay to store the frames of.
+        flip_y: bool
+            Whether to store the replay flipped vertically, as if hard rock
+            were toggled. The store is read-only once written, so this has to
+            happen here instead of on the returned frames.
+        """
+        stored = self._frames[bool(flip_y)]
+        key = id(replay)
+        if key in stored:
+            return stored[key]
+
+        xy = np.asarray(replay.xy, dtype=XY_DTYPE)
+        if flip_y:
+            xy = xy.copy()
+            xy[:, 1] = 384 - xy[:, 1]
+        arrays = [
+            np.asarray(replay.t, dtype=T_DTYPE),
+            xy,
+            np.asarray(replay.k, dtype=K_DTYPE),
+            np.asarray(replay.keydowns, dtype=K_DTYPE),
+        ]
+
+        offset = self._end
+        for array in arrays:
+            self._file.write(np.ascontiguousarray(array).tobytes())
+        size = len(arrays[0]) * FRAME_SIZE
+        padding = -size % ALIGNMENT
+        self._file.write(b"\0" * padding)
+        self._file.flush()
+        self._end = offset + size + padding
+
+        frames = ReplayFrames(self.path, offset, len(arrays[0]))
+        stored[key] = frames
+        weakref.finalize(replay, stored.pop, key, None)
+        return frames
+
+    @property
+    def nbytes(self):
+        return self._end
+
+    def close(self):
+        """
+        Closes the store, deleting its file if it was a temporary one. Frames
+        which were already returned by ``add`` stay readable for as long as
+        they're referenced.
+        """
+        for frames in self._frames.values():
+            frames.clear()
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -2,16 +2,22 @@ from tempfile import TemporaryDirectory
 from threading import Thread
 
 from PyQt6.QtWidgets import QGridLayout, QWidget, QApplication, QSplitter, QFrame
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from circleguard import Mod, KeylessCircleguard
 from slider import Library, Beatmap
 
 from circlevis.renderer import Renderer
 from circlevis.controls import VisualizerControls
 from circlevis.replay_info import ReplayInfo
+from circlevis.trace import NULL_TRACER
+from circlevis.analysis import SimilarityTrack
 
 
 class Interface(QWidget):
+    # emitted from a background thread with the ``SimilarityTrack`` of our two
+    # replays, if we're visualizing exactly two
+    similarity_calculated = pyqtSignal(object)
+
     def __init__(
         self,
         beatmap_info,
@@ -23,17 +29,30 @@ class Interface(QWidget):
         paint_info,
         statistic_functions,
         snaps_args,
+        statistic_budget=None,
+        frame_store=None,
+        tracer=None,
+        threaded_rendering=False,
+        playback_group=None,
     ):
         super().__init__()
+        self.tracer = tracer or NULL_TRACER
+        self.playback_group = playback_group
         self.speeds = speeds
         self.replays = replays
         self.library = library
-        self.snaps_args = snaps_args
+        # copy, as we change our thresholds when the user does
+        self.snaps_args = dict(snaps_args)
         self.current_replay_info = None
         # maps `circleguard.Replay` to `circlevis.ReplayInfo`, as its creation
         # is relatively expensive and users might open and close the same info
         # panel multiple times
         self.replay_info_cache = {}
+        # how similar our two replays are over time, if we're comparing
+        # exactly two. Calculated once in the background, and shared by the
+        # similarity strip and every info panel.
+        self.similarity_track = None
+        self.similar_windows = []
 
         # we calculate some statistics in the background so users aren't hit
         # with multi-second wait times when accessing replay info. Initialize
@@ -63,17 +82,14 @@ class Interface(QWidget):
             self.temp_dir = TemporaryDirectory()
             self.library = Library(self.temp_dir.name)
 
-        self.beatmap = None
-        if beatmap_info.beatmap:
-            self.beatmap = beatmap_info.beatmap
-        elif beatmap_info.path:
-            self.beatmap = Beatmap.from_path(beatmap_info.path)
-        elif beatmap_info.map_id:
-            # TODO move temporary directory creation to slider probably, since
-            # this logic is now duplicated here and in circlecore
-            self.beatmap = self.library.lookup_by_id(
-                beatmap_info.map_id, download=True, save=True
-            )
+        with self.tracer.span("resolve beatmap", "load"):
+            # members of a playback group share the beatmaps they resolve
+            if playback_group is not None:
+                self.beatmap = playback_group.beatmap(
+                    beatmap_info, lambda: self.resolve_beatmap(beatmap_info)
+                )
+            else:
+                self.beatmap = self.resolve_beatmap(beatmap_info)
 
         dt_enabled = any(Mod.DT in replay.mods for replay in replays)
         ht_enabled = any(Mod.HT in replay.mods for replay in replays)
@@ -83,13 +99,26 @@ class Interface(QWidget):
             start_speed = 0.75
 
         self.renderer = Renderer(
-            self.beatmap, replays, events, start_speed, paint_info, statistic_functions
+            self.beatmap,
+            replays,
+            events,
+            start_speed,
+            paint_info,
+            statistic_functions,
+            statistic_budget,
+            frame_store,
+            self.tracer,
+            threaded_rendering,
+            playback_group,
+            self.snaps_args,
         )
         self.renderer.update_time_signal.connect(self.update_slider)
         # if the renderer wants to pause itself (eg when the playback hits the
         # end of the replay), we kick it back to us (the `Interface`) so we can
         # also update the pause button's state.
         self.renderer.pause_signal.connect(self.toggle_pause)
+        # live replays extend our playback range as their frames arrive
+        self.renderer.playback_range_signal.connect(self.update_playback_range)
 
         # we want to give `VisualizerControls` the union of all the replay's
         # mods
@@ -97,7 +126,7 @@ class Interface(QWidget):
         for replay in replays:
             mods += replay.mods
 
-        self.controls = VisualizerControls(start_speed, mods, replays)
+        self.controls = VisualizerControls(start_speed, mods, replays, self.snaps_args)
         self.controls.pause_button.clicked.connect(self.toggle_pause)
         self.controls.play_reverse_button.clicked.connect(self.play_reverse)
         self.controls.play_normal_button.clicked.connect(self.play_normal)
@@ -110,11 +139,32 @@ class Interface(QWidget):
         self.controls.speed_up_button.clicked.connect(self.increase_speed)
         self.controls.speed_down_button.clicked.connect(self.lower_speed)
         self.controls.copy_to_clipboard_button.clicked.connect(self.copy_to_clipboard)
-        self.controls.time_slider.sliderMoved.connect(self.renderer.seek_to)
+        self.controls.time_slider.sliderMoved.connect(self.renderer.request_seek)
         self.controls.time_slider.setRange(
             self.renderer.playback_start, self.renderer.playback_end
         )
 
+        timeline = self.controls.timeline
+        timeline.set_range(self.renderer.playback_start, self.renderer.playback_end)
+        timeline.set_keydowns(self.renderer.players)
+        timeline.set_events(events)
+        # judgments are calculated in the background, show them once they're
+        # ready
+        self.renderer.judgments_ready_signal.connect(self.update_timeline_judgments)
+        timeline.set_snaps(self.renderer.snaps())
+        timeline.seek_to.connect(self.seek_to)
+
+        similarity_strip = self.controls.similarity_strip
+        similarity_strip.set_range(
+            self.renderer.playback_start, self.renderer.playback_end
+        )
+        similarity_strip.seek_to.connect(self.seek_to)
+        self.similarity_calculated.connect(self.set_similarity)
+        if self.controls.show_similarity:
+            similarity_thread = Thread(target=self.calculate_similarity)
+            similarity_thread.daemon = True
+            similarity_thread.start()
+
         self.controls.raw_view_changed.connect(self.renderer.raw_view_changed)
         self.controls.only_color_keydowns_changed.connect(
             self.renderer.only_color_keydowns_changed
@@ -130,6 +180,21 @@ class Interface(QWidget):
         self.controls.circle_size_mod_changed.connect(
             self.renderer.circle_size_mod_changed
         )
+        self.controls.full_path_changed.connect(self.renderer.full_path_changed)
+        self.controls.key_timeline_changed.connect(
+            self.renderer.key_timeline_changed
+        )
+        self.controls.heatmap_changed.connect(self.renderer.heatmap_changed)
+        self.controls.heatmap_keydowns_only_changed.connect(
+            self.renderer.heatmap_keydowns_only_changed
+        )
+        self.controls.heatmap_bin_size_changed.connect(
+            self.renderer.heatmap_bin_size_changed
+        )
+        self.controls.follow_live_changed.connect(self.renderer.follow_live_changed)
+        self.controls.snap_max_angle_changed.connect(self.snap_max_angle_changed)
+        self.controls.snap_min_distance_changed.connect(self.snap_min_distance_changed)
+        self.controls.judgment_player_changed.connect(self.judgment_player_changed)
         self.controls.show_info_for_replay.connect(self.show_info_panel)
 
         self.splitter = QSplitter()
@@ -144,25 +209,63 @@ class Interface(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         self.setLayout(layout)
 
+        if playback_group is not None:
+            playback_group.add(self)
+
+    def resolve_beatmap(self, beatmap_info):
+        if beatmap_info.beatmap:
+            return beatmap_info.beatmap
+        if beatmap_info.path:
+            return Beatmap.from_path(beatmap_info.path)
+        if beatmap_info.map_id:
+            # TODO move temporary directory creation to slider probably, since
+            # this logic is now duplicated here and in circlecore
+            return self.library.lookup_by_id(
+                beatmap_info.map_id, download=True, save=True
+            )
+        return None
+
+    def playback_members(self):
+        """
+        The interfaces which play in lockstep with us (including ourselves),
+        and so should be paused, sped up, etc. whenever we are.
+        """
+        if self.playback_group is None:
+            return [self]
+        return self.playback_group.members
+
     def play_normal(self):
         self.unpause()
-        self.renderer.play_direction = 1
+        for interface in self.playback_members():
+            interface.renderer.play_direction = 1
         self.update_speed(abs(self.renderer.clock.current_speed))
 
     def update_slider(self, value):
         self.controls.time_slider.setValue(value)
 
+    def update_playback_range(self, start, end):
+        self.controls.time_slider.setRange(start, end)
+        timeline = self.controls.timeline
+        timeline.set_range(start, end)
+        timeline.set_keydowns(self.renderer.players)
+        self.controls.similarity_strip.set_range(start, end)
+
     def change_by(self, delta):
         self.pause()
         self.renderer.seek_to(self.renderer.clock.time_counter + delta)
 
     def play_reverse(self):
         self.unpause()
-        self.renderer.play_direction = -1
+        for interface in self.playback_members():
+            interface.renderer.play_direction = -1
         self.update_speed(abs(self.renderer.clock.current_speed))
 
     def update_speed(self, speed):
-        self.renderer.clock.change_speed(speed * self.renderer.play_direction)
+        for interface in self.playback_members():
+            interface.controls.speed_label.setText(str(speed) + "x")
+            interface.renderer.clock.change_speed(
+                speed * interface.renderer.play_direction
+            )
 
     def change_frame(self, reverse):
         self.pause()
@@ -175,19 +278,20 @@ class Interface(QWidget):
             self.pause()
 
     def pause(self):
-        self.controls.set_paused_state(True)
-        self.renderer.pause()
+        for interface in self.playback_members():
+            interface.controls.set_paused_state(True)
+            interface.renderer.pause()
 
     def unpause(self):
-        self.controls.set_paused_state(False)
-        self.renderer.resume()
+        for interface in self.playback_members():
+            interface.controls.set_paused_state(False)
+            interface.renderer.resume()
 
     def lower_speed(self):
         index = self.speeds.index(abs(self.renderer.clock.current_speed))
         if index == 0:
             return
         speed = self.speeds[index - 1]
-        self.controls.speed_label.setText(str(speed) + "x")
         self.update_speed(speed)
 
     def increase_speed(self):
@@ -195,7 +299,6 @@ class Interface(QWidget):
         if index == len(self.speeds) - 1:
             return
         speed = self.speeds[index + 1]
-        self.controls.speed_label.setText(str(speed) + "x")
         self.update_speed(speed)
 
     def copy_to_clipboard(self):
@@ -225,15 +328,22 @@ class Interface(QWidget):
             ur, frametime, snaps, judgments = self.replay_statistics_precalculated[
                 replay
             ]
-            replay_info = ReplayInfo(
-                replay,
-                self.library.path,
-                ur,
-                frametime,
-                snaps,
-                judgments,
-                self.snaps_args,
-            )
+            if snaps is None:
+                snaps = self.replay_snaps(replay)
+            if judgments is None:
+                # the renderer's, if it's finished calculating them
+                judgments = self.renderer.players[self.replays.index(replay)].judgments
+            with self.tracer.span("replay info", "load"):
+                replay_info = ReplayInfo(
+                    replay,
+                    self.library.path,
+                    ur,
+                    frametime,
+                    snaps,
+                    judgments,
+                    self.snaps_args,
+                    self.similar_windows,
+                )
             replay_info.seek_to.connect(self.seek_to)
 
         # don't show two of the same info panels at once
@@ -258,6 +368,69 @@ class Interface(QWidget):
         self.pause()
         self.renderer.seek_to(time)
 
+    def judgment_player_changed(self, index):
+        self.renderer.judgment_player_changed(index)
+        self.update_timeline_judgments()
+
+    def update_timeline_judgments(self):
+        """
+        Shows the judgments of the player the renderer tints hitobjects by on
+        the timeline, if they've been calculated.
+        """
+        judgments = self.renderer.players[self.renderer.judgment_player].judgments
+        self.controls.timeline.set_judgments(judgments or [])
+
+    def replay_snaps(self, replay):
+        """
+        The snaps of ``replay`` for our current thresholds, or ``None`` if the
+        renderer couldn't find them.
+        """
+        return self.renderer.players[self.replays.index(replay)].snaps
+
+    def snap_max_angle_changed(self, max_angle):
+        self.update_snaps_args("max_angle", max_angle)
+
+    def snap_min_distance_changed(self, min_distance):
+        self.update_snaps_args("min_distance", min_distance)
+
+    def update_snaps_args(self, name, value):
+        # slider settings emit each change twice, once for their slider and
+        # once for their spinbox
+        if self.snaps_args.get(name) == value:
+            return
+        self.snaps_args[name] = value
+        self.update_snaps()
+
+    def update_snaps(self):
+        """
+        Finds snaps again for our current thresholds, and shows them
+        everywhere we show snaps. Snaps are found from geometry the renderer
+        precomputed, so this is fast enough to do on every change.
+        """
+        with self.tracer.span("snaps", "load"):
+            self.renderer.snaps_args_changed(self.snaps_args)
+        self.controls.timeline.set_snaps(self.renderer.snaps())
+        for replay, replay_info in self.replay_info_cache.items():
+            snaps = self.replay_snaps(replay)
+            if snaps is not None:
+                replay_info.set_snaps(snaps)
+
+    def calculate_similarity(self):
+        # compare our players rather than our replays, as their frames are
+        # already flipped to match each other if only one of them has hr
+        first, second = self.renderer.players
+        with self.tracer.span("similarity", "background"):
+            track = SimilarityTrack(first, second)
+        self.similarity_calculated.emit(track)
+
+    def set_similarity(self, track):
+        self.similarity_track = track
+        self.similar_windows = track.most_similar()
+        self.controls.similarity_strip.set_track(track, self.similar_windows)
+        # info panels opened before we finished don't know about them yet
+        for replay_info in self.replay_info_cache.values():
+            replay_info.add_similar_windows(self.similar_windows)
+
     def calculate_cg_statistics(self):
         cg = KeylessCircleguard()
         for replay in self.replays:
@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+
+import numpy as np
+from circleguard import Mod
+from circleguard.utils import KEY_MASK
+
+# buffers grow in multiples of this many frames
+CHUNK_SIZE = 4096
+
+log = logging.getLogger(__name__)
+
+
+class LiveReplay:
+    """
+    A replay whose frames arrive while it's being visualized, eg from a
+    tournament feed relayed over a local socket or pipe.
+
+    Pass it to a visualizer like any other replay. Frames are appended with
+    ``append`` or ``extend`` (from any thread), or read from a stream with
+    ``read_from``, and the visualizer picks them up as they arrive, extending
+    its playback range to match. Call ``finish`` once no more frames will
+    arrive.
+
+    Frames are appended into preallocated buffers, which grow by doubling
+    their capacity (in whole chunks of ``CHUNK_SIZE`` frames) when full, so
+    appending is amortized O(1). ``t``, ``xy``, ``k``, and ``keydowns`` are
+    views of the frames appended so far, and never change once taken - new
+    frames only ever go past their end.
+
+    Parameters
+    ----------
+    username: str
+        The name to show for this replay.
+    mods: circleguard.ModCombination
+        The mods this replay is played with.
+    """
+
+    # lets the visualizer tell live replays apart from finished ones
+    live = True
+
+    def __init__(self, username="Live", mods=Mod.NM):
+        self.username = username
+        self.mods = mods
+        # we don't know who is playing what, but visualizers expect these
+        self.user_id = 0
+        self.map_id = 0
+
+        self._lock = threading.Lock()
+        self._t = np.empty(CHUNK_SIZE, dtype=int)
+        self._xy = np.empty((CHUNK_SIZE, 2), dtype=float)
+        self._k = np.empty(CHUNK_SIZE, dtype=int)
+        self._keydowns = np.empty(CHUNK_SIZE, dtype=int)
+        self._num_frames = 0
+        self.finished = False
+
+    def __len__(self):
+        return self._num_frames
+
+    def _reserve(self, num_frames):
+        """
+        Grows our buffers so they can hold at least ``num_frames`` frames.
+        """
+        capacity = len(self._t)
+        if num_frames <= capacity:
+            return
+        while capacity < num_frames:
+            capacity *= 2
+        n = self._num_frames
+        for name in ["_t", "_xy", "_k", "_keydowns"]:
+            old = getattr(self, name)
+            new = np.empty((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[:n] = old[:n]
+            # views of the old buffer stay valid, they just won't see frames
+            # appended from here on, which they wouldn't have anyway
+            setattr(self, name, new)
+
+    def extend(self, t, xy, k):
+        """
+        Appends several frames at once.
+
+        Parameters
+        ----------
+        t: array-like of int
+            The time of each frame, in ms. Frames must be appended in order
+            of time.
+        xy: array-like of shape (n, 2)
+            The cursor position of each frame.
+        k: array-like of int
+            The keys held in each frame.
+        """
+        t = np.asarray(t, dtype=int)
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        k = np.asarray(k, dtype=int)
+        if not len(t) == len(xy) == len(k):
+            raise ValueError(
+                f"expected the same number of times, positions, and keys, got "
+                f"{len(t)}, {len(xy)}, and {len(k)}"
+            )
+        if len(t) == 0:
+            return
+
+        with self._lock:
+            if self.finished:
+                raise ValueError("can't append frames to a finished replay")
+            start = self._num_frames
+            previous_t = self._t[start - 1] if start > 0 else t[0]
+            if t[0] < previous_t or np.any(np.diff(t) < 0):
+                raise ValueError("frames must be appended in order of time")
+            end = start + len(t)
+            self._reserve(end)
+
+            self._t[start:end] = t
+            self._xy[start:end] = xy
+            self._k[start:end] = k
+            # keys pressed in a frame which weren't pressed in the frame
+            # before it, the same as ``circleguard.Replay.keydowns``
+            keypresses = k & KEY_MASK
+            previous = self._k[start - 1] & KEY_MASK if start > 0 else 0
+            self._keydowns[start:end] = keypresses & ~np.insert(
+                keypresses[:-1], 0, previous
+            )
+            self._num_frames = end
+
+    def append(self, t, x, y, k):
+        """
+        Appends a single frame. See ``extend``.
+        """
+        self.extend([t], [[x, y]], [k])
+
+    def finish(self):
+        """
+        Marks this replay as complete. No more frames can be appended.
+        """
+        with self._lock:
+            self.finished = True
+
+    def frames(self):
+        """
+        ``(t, xy, k, keydowns)`` for every frame appended so far, taken at the
+        same instant so they always have the same length.
+        """
+        with self._lock:
+            n = self._num_frames
+            return self._t[:n], self._xy[:n], self._k[:n], self._keydowns[:n]
+
+    @property
+    def t(self):
+        return self.frames()[0]
+
+    @property
+    def xy(self):
+        return self.frames()[1]
+
+    @property
+    def k(self):
+        return self.frames()[2]
+
+    @property
+    def keydowns(self):
+        return self.frames()[3]
+
+    def read_from(self, stream):
+        """
+        Starts reading frames from ``stream`` in a background thread, see
+        ``read_stream``. Returns the thread.
+        """
+        thread = threading.Thread(target=read_stream, args=(stream, self))
+        # don't keep the program alive just to wait for more frames
+        thread.daemon = True
+        thread.start()
+        return thread
+
+
+def read_stream(stream, replay):
+    """
+    Appends frames to ``replay`` as they're read from ``stream``, and finishes
+    ``replay`` once ``stream`` is exhausted.
+
+    ``stream`` is any iterable of lines, such as a file, a pipe,
+    ``socket.makefile()``, or a ``RecordedStream``. Each line is a frame, as
+    its time, x, y, and keys separated by whitespace, eg ``"1234 256.0 192.5
+    5"``. Blank lines are ignored, and malformed lines (or frames out of order)
+    are logged and skipped.
+
+    ``replay`` is finished even if reading from ``stream`` fails, so a
+    visualizer doesn't wait forever for frames which will never arrive.
+    """
+    try:
+        for line in stream:
+            try:
+                if isinstance(line, bytes):
+                    line = line.decode()
+                if not line.strip():
+                    continue
+                t, x, y, k = line.split()
+                replay.append(int(float(t)), float(x), float(y), int(k))
+            except ValueError as e:
+                log.warning("skipping malformed frame %r: %s", line, e)
+    finally:
+        replay.finish()
+
+
+class RecordedStream:
+    """
+    A stand-in for a live feed, which replays the frames of a finished replay
+    as lines in the format ``read_stream`` expects, at the pace they were
+    originally played at.
+
+    Useful for trying out live visualization without a real feed:
+
+    .. code-block:: python
+
+        live = LiveReplay(replay.username, replay.mods)
+        live.read_from(RecordedStream(replay))
+        VisualizerApp(beatmap_info, replays=[live]).exec()
+
+    Parameters
+    ----------
+    replay: circleguard.Replay
+        The (loaded) replay to replay the frames of.
+    speed: float
+        How fast to play the frames back. ``2`` sends frames twice as fast as
+        they were played.
+    """
+
+    def __init__(self, replay, speed=1):
+        self.t = np.asarray(replay.t)
+        self.xy = np.asarray(replay.xy)
+        self.k = np.asarray(replay.k)
+        self.speed = speed
+
+    def __iter__(self):
+        if len(self.t) == 0:
+            return
+        started_at = time.perf_counter()
+        for t, (x, y), k in zip(self.t, self.xy, self.k):
+            # when this frame would have arrived, relative to the first frame
+            due = (t - self.t[0]) / 1000 / self.speed
+            delay = due - (time.perf_counter() - started_at)
+            if delay > 0:
+                time.sleep(delay)
+            yield f"{t} {x} {y} {k}\n"
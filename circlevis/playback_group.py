@@ -0,0 +1,147 @@
+import weakref
+
+from PyQt6.QtCore import QTimer
+
+from circlevis.clock import Timer
+
+
+class PlaybackGroup:
+    """
+    Plays several visualizers in lockstep, eg to compare replays of the same
+    map in side by side windows.
+
+    Every visualizer in the group reads the time from the same clock and is
+    driven by the same timer, so they never drift apart. Pausing, seeking,
+    changing speed, or changing direction in any of them does the same in all
+    of them, and playback only pauses at the end once every member has reached
+    the end of its replays.
+
+    Members also share their most expensive loading work: a beatmap is only
+    resolved (and possibly downloaded) once, and its hitobjects and slider
+    bodies are only processed once per combination of hard rock and easy, so
+    opening ``n`` visualizers of the same map costs much less than ``n`` times
+    one visualizer.
+
+    .. code-block:: python
+
+        app = QApplication([])
+        group = PlaybackGroup()
+        for replay in replays:
+            Visualizer(beatmap_info, [replay], playback_group=group).show()
+        app.exec()
+    """
+
+    def __init__(self):
+        # the ``Interface`` of each visualizer in the group
+        self.members = []
+        # created by the first member to join, see ``clock_for``
+        self.clock = None
+        self.timer = None
+        # whether any member has finished loading and started playback
+        self.started = False
+        # maps ``(map_id, path)`` to the beatmap resolved from that info
+        self.beatmaps = {}
+        # maps ``(beatmap, use_hr, use_ez)`` to the renderer which processes
+        # (or processed) the hitobjects of that beatmap for those mods. Held
+        # weakly so closing every visualizer of a map lets its hitobjects go.
+        self.slider_loaders = weakref.WeakValueDictionary()
+
+    def clock_for(self, speed, initial_time):
+        """
+        The clock every member plays by. The first member to ask creates it,
+        at its starting speed.
+        """
+        if self.clock is None:
+            self.clock = Timer(speed, initial_time)
+            self.timer = QTimer()
+            self.timer.timeout.connect(self.next_frame_from_timer)
+            # 62 fps, the same as a renderer on its own
+            self.timer.start(int(1000 / 60))
+        # start over from whichever member starts earliest
+        self.clock.initial_time = min(self.clock.initial_time, initial_time)
+        return self.clock
+
+    def beatmap(self, beatmap_info, resolve):
+        """
+        The beatmap for ``beatmap_info``, resolving it with ``resolve`` only if
+        no other member has resolved it already.
+        """
+        if beatmap_info.beatmap:
+            return beatmap_info.beatmap
+        key = (beatmap_info.map_id, beatmap_info.path)
+        if key not in self.beatmaps:
+            self.beatmaps[key] = resolve()
+        return self.beatmaps[key]
+
+    def slider_loader(self, renderer, beatmap, use_hr, use_ez):
+        """
+        The renderer which processes the hitobjects of ``beatmap`` with the
+        given mods for the whole group. If no member has processed them yet,
+        ``renderer`` is registered as that renderer and returned.
+        """
+        key = (beatmap, use_hr, use_ez)
+        return self.slider_loaders.setdefault(key, renderer)
+
+    def add(self, interface):
+        """
+        Adds the ``Interface`` of a visualizer to the group, matching its
+        controls to the playback state of the rest of the group.
+        """
+        self.members.append(interface)
+        if len(self.members) == 1:
+            return
+        other = self.members[0]
+        interface.renderer.play_direction = other.renderer.play_direction
+        interface.controls.speed_label.setText(other.controls.speed_label.text())
+        if other.renderer.paused:
+            interface.controls.set_paused_state(True)
+            interface.renderer.pause()
+
+    def remove(self, interface):
+        """
+        Removes the ``Interface`` of a (closed) visualizer from the group.
+        """
+        if interface in self.members:
+            self.members.remove(interface)
+        if not self.members and self.timer is not None:
+            self.timer.stop()
+
+    def loaded(self):
+        """
+        Called by each member's renderer when it finishes loading. Returns
+        whether it's the first to do so, in which case it should start
+        playback over from the beginning. Members which finish later join
+        playback wherever it is instead of restarting it for everyone.
+        """
+        first = not self.started
+        self.started = True
+        return first
+
+    def playback_range(self):
+        """
+        The earliest start and latest end of every member's playback range.
+        """
+        renderers = [interface.renderer for interface in self.members]
+        if not renderers:
+            return (0, 0)
+        return (
+            min(renderer.playback_start for renderer in renderers),
+            max(renderer.playback_end for renderer in renderers),
+        )
+
+    def next_frame_from_timer(self):
+        playback_start, playback_end = self.playback_range()
+        for interface in self.members:
+            renderer = interface.renderer
+            renderer.next_frame_from_timer()
+            # paused renderers don't prepare frames on their own, so catch
+            # them up with any seeks made in other members. Outside of our
+            # playback range, ``next_frame`` would ask to pause instead, which
+            # (since we're already paused) toggles playback back on.
+            if (
+                renderer.paused
+                and not renderer.is_loading
+                and renderer.frame_time != self.clock.time_counter
+                and playback_start <= self.clock.time_counter <= playback_end
+            ):
+                renderer.next_frame()
@@ -1,14 +1,79 @@
 class Player:
-    def __init__(self, replay, pen):
+    def __init__(self, replay, pen, frames=None, flip_y=False):
         self.pen = pen
         self.username = replay.username
-        self.t = replay.t
-        # copy so we don't flip the actual replay's xy coordinates when we
-        # account for hr (not doing this causes replays to be flipped on odd
-        # runs of the visualizer and correct on even runs of the visualizer)
-        self.xy = replay.xy.copy()
-        self.k = replay.k
-        self.keydowns = replay.keydowns
+        self.mods = replay.mods
+        # whether to flip our frames vertically, so they match hr replays
+        self.flip_y = flip_y
+        # the ``LiveReplay`` our frames come from, if they're still arriving.
+        # See ``update_live_frames``.
+        self.live_replay = replay if getattr(replay, "live", False) else None
+        if frames is not None:
+            # frames from a ``FrameStore`` are read-only views which are
+            # already flipped for hr if needed, so use them as they are instead
+            # of keeping our own copies
+            self.t = frames.t
+            self.xy = frames.xy
+            self.k = frames.k
+            self.keydowns = frames.keydowns
+        elif self.live_replay is not None:
+            self.t = None
+            self.update_live_frames()
+        else:
+            self.t = replay.t
+            # copy so we don't flip the actual replay's xy coordinates when we
+            # account for hr (not doing this causes replays to be flipped on
+            # odd runs of the visualizer and correct on even runs of the
+            # visualizer)
+            self.xy = replay.xy.copy()
+            if flip_y:
+                self.xy[:, 1] = 384 - self.xy[:, 1]
+            self.k = replay.k
+            self.keydowns = replay.keydowns
         self.end_pos = 0
         self.start_pos = 0
-        self.mods = replay.mods
+        # the index of the hitobject closest in time to each frame, and the
+        # distance from each frame to the edge of that hitobject (negative if
+        # inside it). Set by the renderer if it has a beatmap.
+        self.closest_hitobject = None
+        self.closest_hitobject_distance = None
+        # simplified versions of this player's path, as a list of
+        # ``(tolerance, indices)`` sorted by tolerance, where ``indices`` are
+        # the frames kept at that tolerance (in osu!pixels). Set by the
+        # renderer once calculated.
+        self.trail_lods = None
+        # every press of each key, see ``circlevis.analysis.KeyPresses``. Set
+        # by the renderer.
+        self.key_presses = None
+        # the angles and distances snaps are found from (see
+        # ``circlevis.analysis.SnapGeometry``), our ``circleguard.Snap``s for
+        # the renderer's current thresholds (or ``None`` if they can't be
+        # found), and whether each of our frames is one of those snaps. Set by
+        # the renderer.
+        self.snap_geometry = None
+        self.snaps = None
+        self.snap_frames = None
+        # our ``circleguard.Judgment``s, and the same judgments with one entry
+        # per hitobject of the beatmap (``None`` for hitobjects which weren't
+        # judged). Set by the renderer once calculated, in the background.
+        self.judgments = None
+        self.hitobject_judgments = None
+
+    def update_live_frames(self):
+        """
+        Takes up every frame which has arrived for our ``LiveReplay`` so far.
+        Returns whether there were any new frames.
+        """
+        t, xy, k, keydowns = self.live_replay.frames()
+        if self.t is not None and len(t) == len(self.t):
+            return False
+        self.t = t
+        # our frames are views of the live replay's buffers, so only copy
+        # them if we have to flip them
+        if self.flip_y:
+            xy = xy.copy()
+            xy[:, 1] = 384 - xy[:, 1]
+        self.xy = xy
+        self.k = k
+        self.keydowns = keydowns
+        return True
@@ -1,26 +1,57 @@
-import math
+import logging
+import os
 import threading
-from datetime import timedelta
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 import numpy as np
-from scipy import interpolate
-from PyQt6.QtGui import QBrush, QPen, QColor, QPalette, QPainter, QPainterPath, QCursor
+from PyQt6.QtGui import (
+    QBrush,
+    QPen,
+    QColor,
+    QPalette,
+    QPainter,
+    QPainterPath,
+    QCursor,
+    QImage,
+    QPolygonF,
+)
 from PyQt6.QtWidgets import QFrame
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QPointF, QRectF, QRect
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QPointF, QRectF, QRect, QEvent
 from slider.beatmap import Circle, Slider, Spinner
 from circleguard import (
     Mod,
-    Key,
     hitradius,
     hitwindows,
     JudgmentType,
     KeylessCircleguard,
 )
+from circleguard.investigations import Snap
 
 from circlevis.clock import Timer
 from circlevis.player import Player
+from circlevis.text import TextCache
 from circlevis.utils import StatisticMode
+from circlevis.analysis import (
+    closest_hitobjects,
+    hitobject_distances,
+    simplify_path,
+    CursorComparison,
+    CursorHeatmap,
+    KeyPresses,
+    SnapGeometry,
+    KEYS,
+)
+from circlevis.trace import NULL_TRACER, traced
+from circlevis.statistic_evaluator import (
+    StatisticEvaluator,
+    StatisticBudget,
+    StatisticLevel,
+)
+
+log = logging.getLogger(__name__)
 
 WIDTH_LINE = 1
 WIDTH_LINE_RAW_VIEW = 2
@@ -28,10 +59,15 @@ WIDTH_CROSS = 2
 WIDTH_CIRCLE_BORDER = 6
 LENGTH_CROSS = 6
 
+# These pens and brushes are templates and are never modified. Anything that
+# needs a pen of a particular width should get it from a ``RenderStyle``
+# instead, which copies these.
 PEN_WHITE = QPen(QColor(200, 200, 200))
 PEN_GRAY = QPen(QColor(75, 75, 75))
 PEN_GREY_INACTIVE = QPen(QColor(133, 125, 125))
 PEN_HIGHLIGHT = QPen(QColor(230, 212, 92))
+# the same as the snap markers on the timeline
+PEN_SNAP = QPen(QColor(230, 110, 200))
 PEN_BLANK = QPen(QColor(0, 0, 0, 0))
 # for missed hitobjs
 PEN_RED_TINT = QPen(QColor(200, 150, 150))
@@ -77,6 +113,12 @@ ERROR_BAR_HIT_THRESHOLD = 4000
 # width of each hit marker in pixels
 ERROR_BAR_HIT_WIDTH = 2
 ERROR_BAR_HIT_HEIGHT = 8
+# how far apart the centers of stacked error bars are, when showing the error
+# bars of several replays at once
+ERROR_BAR_STACK_SPACING = ERROR_BAR_HIT_HEIGHT * 2 + 4
+# how wide the marker at the left of a stacked error bar, in the color of its
+# replay, is
+ERROR_BAR_MARKER_WIDTH = 6
 
 # radius of judgment indicator circles for 50s, 100s, 300s, misses
 JUDGMENT_INDICATOR_RADIUS = 6
@@ -87,16 +129,107 @@ JUDGMENT_INDICATOR_THRESHOLD = 1000
 
 SLIDER_TICKRATE = 50
 
+# once no scrubbing seek has been requested for this many ms, scrubbing is
+# considered settled and the frame is redrawn in full detail
+SCRUB_SETTLE_TIME = 150
+
+# how often (in ms) we take up frames which have arrived for live replays.
+# Taking them up means recalculating everything derived from their frames, so
+# don't do it every frame.
+LIVE_UPDATE_INTERVAL = 100
+# when following a live replay, how far (in ms) behind its newest frame we
+# play, so we don't run into the end of the frames we have before the next
+# ones are taken up
+LIVE_FOLLOW_DELAY = 300
+# how far (in ms) playback may drift from ``LIVE_FOLLOW_DELAY`` behind the
+# newest frame before we jump back to it
+LIVE_FOLLOW_TOLERANCE = 200
+
+# the tolerances (in osu!pixels) we simplify each player's path to ahead of
+# time, so long trails and fast playback don't have to draw every frame
+TRAIL_LOD_TOLERANCES = [0.5, 1, 2, 4]
+# how far (in screen pixels) a simplified trail may stray from the real path
+# at normal speed, with a trail of at most ``TRAIL_LOD_LENGTH`` frames. Faster
+# playback and longer trails scale this up proportionally.
+TRAIL_LOD_SCREEN_TOLERANCE = 0.5
+TRAIL_LOD_LENGTH = 50
+
+# how often (in ms of replay time) the full path canvas saves a copy of
+# itself, so seeking backwards only has to redraw the path since the last
+# checkpoint
+FULL_PATH_CHECKPOINT_INTERVAL = 30000
+FULL_PATH_OPACITY = 0.35
+
+# the key timeline shows presses from this many ms before the current time to
+# this many ms after it
+KEY_TIMELINE_PAST = 1500
+KEY_TIMELINE_FUTURE = 500
+# in pixels
+KEY_TIMELINE_WIDTH = 200
+KEY_TIMELINE_ROW_HEIGHT = 4
+KEY_TIMELINE_ROW_SPACING = 1
+# between the rows of two players
+KEY_TIMELINE_PLAYER_SPACING = 4
+
+# how many ms before the current time the "Recent" heatmap covers
+HEATMAP_WINDOW = 5000
+# how many heatmaps (for different settings or enabled players) we keep
+# around, so switching back and forth between a few doesn't recalculate them
+HEATMAP_CACHE_SIZE = 4
+# once the heatmap bin size hasn't changed for this many ms, it's considered
+# settled and the heatmap for it is calculated. Dragging the bin size slider
+# would otherwise calculate a heatmap for every size it passes over.
+HEATMAP_BIN_SIZE_SETTLE_TIME = 200
+HEATMAP_OPACITY = 0.6
+# the colors of the heatmap, from empty cells to the fullest cell
+HEATMAP_COLORS = [
+    QColor(0, 0, 0, 0),
+    QColor(80, 20, 140, 140),
+    QColor(220, 60, 60, 200),
+    QColor(250, 220, 80, 240),
+]
+
 
 class Renderer(QFrame):
     update_time_signal = pyqtSignal(int)
     pause_signal = pyqtSignal()
     loaded_signal = pyqtSignal()
+    # emitted from a background thread with the key, ``CursorHeatmap``, and
+    # image of a heatmap once it has been calculated
+    heatmap_ready_signal = pyqtSignal(object, object, object)
+    # emitted with our new playback start and end when frames of a live
+    # replay arrive
+    playback_range_signal = pyqtSignal(int, int)
+    # emitted from our render worker's thread once it has drawn a frame
+    frame_rendered_signal = pyqtSignal()
+    # emitted from our judgment pool's threads once a player's judgments have
+    # been calculated
+    judgments_ready_signal = pyqtSignal()
 
     def __init__(
-        self, beatmap, replays, events, start_speed, paint_info, statistic_functions
+        self,
+        beatmap,
+        replays,
+        events,
+        start_speed,
+        paint_info,
+        statistic_functions,
+        statistic_budget=None,
+        frame_store=None,
+        tracer=None,
+        threaded_rendering=False,
+        playback_group=None,
+        snaps_args=None,
     ):
         super().__init__()
+        # the ``PlaybackGroup`` we play in lockstep with, if any
+        self.playback_group = playback_group
+        # records spans of what we spend our time on, see ``circlevis.trace``
+        self.tracer = tracer or NULL_TRACER
+        # draws our frames on a background thread, if ``threaded_rendering``
+        # is set. Created once we're otherwise ready to draw, at the end of
+        # ``__init__``.
+        self.render_worker = None
         self.setMinimumSize(
             GAMEPLAY_WIDTH + GAMEPLAY_PADDING_WIDTH * 2,
             GAMEPLAY_HEIGHT + GAMEPLAY_PADDING_HEIGHT * 2,
@@ -108,6 +241,14 @@ class Renderer(QFrame):
         self.should_paint_info = paint_info
         # functions to display info for in the visualizer
         self.statistic_functions = statistic_functions
+        # times our statistic functions and throttles any which are too slow
+        self.statistic_evaluator = StatisticEvaluator(
+            statistic_budget or StatisticBudget(), self.tracer
+        )
+        # the text of each line of statistics to draw in the current frame.
+        # Updated by ``update_statistic_lines`` once per frame, so our
+        # evaluator's budget counts frames rather than draws
+        self.statistic_lines = ()
         # whether we should paint the frametime graph
         self.paint_frametime = False
         self.painter = QPainter()
@@ -115,10 +256,22 @@ class Renderer(QFrame):
         self.x_offset = 0
         self.y_offset = 0
         # a map of QRect to Player, where the rectangle is the location of the
-        # player's info on the screen. Updated every frame (even though it's
-        # currently static except for the width, it may differ from frame to
-        # frame in the future)
+        # player's info on the screen. Only updated (in ``update_info_layout``)
+        # when our players or size change, since it's otherwise static.
         self.player_info_positions = {}
+        # the part of each player's info text which doesn't change from frame
+        # to frame
+        self.player_info_labels = {}
+        # laid out text for ``paint_info``. Created in ``update_info_layout``
+        self.text_cache = None
+        # whether ``update_info_layout`` needs to be called before we next
+        # paint our info
+        self.info_layout_dirty = True
+        # the time which our players' positions and the visible hitobjects
+        # were last computed for in ``next_frame``. Every draw call in a frame
+        # uses this time (via a ``FrameSnapshot``) instead of asking the clock
+        # again, so everything in a frame is drawn at the same instant.
+        self.frame_time = None
         # players that have been disabled by the users and we don't want to
         # draw cursor movements for
         self.disabled_players = []
@@ -139,15 +292,32 @@ class Renderer(QFrame):
         # or something
         self.hitobjs_to_draw_judgment_indicators_for = []
 
+        # the pens and brushes we draw with. Rebuilt whenever our scale or a
+        # setting which affects them changes, in ``update_render_style``
+        self.render_style = None
+
         self.use_hr = any(Mod.HR in replay.mods for replay in replays)
         self.use_ez = any(Mod.EZ in replay.mods for replay in replays)
         if beatmap:
-            self.hit_objects = beatmap.hit_objects(
-                hard_rock=self.use_hr, easy=self.use_ez
-            )
-            self.playback_end = self.get_hit_endtime(self.hit_objects[-1])
+            # the renderer which processes our hitobjects and sliders. Only
+            # ever someone else if they're in our playback group and are
+            # playing the same beatmap with the same mods, in which case we
+            # share their hitobjects instead of processing our own.
+            self.slider_loader = self
+            if playback_group is not None:
+                self.slider_loader = playback_group.slider_loader(
+                    self, beatmap, self.use_hr, self.use_ez
+                )
 
-            self.calculate_beatmap_stats(self.use_hr, self.use_ez)
+            with self.tracer.span("hitobjects", "load"):
+                if self.slider_loader is self:
+                    self.hit_objects = beatmap.hit_objects(
+                        hard_rock=self.use_hr, easy=self.use_ez
+                    )
+                else:
+                    self.hit_objects = self.slider_loader.hit_objects
+                self.playback_end = self.get_hit_endtime(self.hit_objects[-1])
+                self.calculate_beatmap_stats(self.use_hr, self.use_ez)
 
             # loading stuff
             self.is_loading = True
@@ -155,8 +325,11 @@ class Renderer(QFrame):
             # not fully accurate, but good enough
             self.num_sliders = self.num_hitobjects
             self.sliders_current = 0
-            self.thread = threading.Thread(target=self.process_sliders)
-            self.thread.start()
+            if self.slider_loader is self:
+                self.thread = threading.Thread(target=self.process_sliders)
+                self.thread.start()
+            else:
+                self.thread = self.slider_loader.thread
             self.has_beatmap = True
         else:
             self.playback_end = 0
@@ -166,6 +339,15 @@ class Renderer(QFrame):
         # if this is nonnull, when we finish loading sliders we will seek to
         # this position. Set in ``seek_to`` if it is called when we're loading
         self.seek_to_when_loaded = None
+        # the latest seek requested while scrubbing (see ``request_seek``),
+        # applied on our next tick. Only the latest request matters, so a burst
+        # of requests in between two frames costs a single seek.
+        self.pending_seek = None
+        # whether the user is scrubbing through the replay, in which case we
+        # draw frames in less detail so we can keep up
+        self.scrubbing = False
+        # ``time.perf_counter_ns`` of the last scrubbing seek request
+        self.last_scrub_request = None
         # whether the previous frame was a loading frame or not, used to
         # determine when we came out of a loading state
         self.previously_loading = False
@@ -175,36 +357,129 @@ class Renderer(QFrame):
         self.players = []
         for i, replay in enumerate(replays):
             color = QColor().fromHslF(i / self.num_replays, 0.75, 0.5)
-            player = Player(replay=replay, pen=QPen(color))
+            # if our hitobjs are hard_rock versions, flip any player *without*
+            # hr so they match other hr players.
+            flip_y = self.use_hr and Mod.HardRock not in replay.mods
+            frames = None
+            # live replays are still growing, so they can't be stored yet
+            if frame_store is not None and not getattr(replay, "live", False):
+                frames = frame_store.add(replay, flip_y=flip_y)
+            player = Player(
+                replay=replay, pen=QPen(color), frames=frames, flip_y=flip_y
+            )
             self.players.append(player)
 
-        self.playback_start = 0
-        if self.num_replays > 0:
-            self.playback_start = min(min(player.t) for player in self.players)
-            self.playback_end = max(max(player.t) for player in self.players)
+        # whether any of our replays are ``LiveReplay``s, whose frames arrive
+        # while we're playing. See ``update_live_players``.
+        self.live = any(player.live_replay is not None for player in self.players)
+        # whether to keep playback just behind the newest live frame
+        self.follow_live = True
+        # ``time.perf_counter_ns`` of when we last took up new live frames
+        self.last_live_update = time.perf_counter_ns()
 
-        # always start at 0, unless our playback_start is negative (meaning we
-        # have negative frames)
-        self.playback_start = min(self.playback_start, 0)
+        self.playback_start = 0
+        self.update_playback_range()
 
-        # if our hitobjs are hard_rock versions, flip any player *without* hr
-        # so they match other hr players.
-        if self.use_hr:
-            for player in self.players:
-                if Mod.HardRock not in player.mods:
-                    for d in player.xy:
-                        d[1] = 384 - d[1]
+        if self.has_beatmap:
+            self.hitobject_times = np.array(
+                [self.get_hit_time(hitobj) for hitobj in self.hit_objects]
+            )
+            self.hitobject_positions = np.array(
+                [[hitobj.position.x, hitobj.position.y] for hitobj in self.hit_objects]
+            )
+            self.hitobject_is_spinner = np.array(
+                [isinstance(hitobj, Spinner) for hitobj in self.hit_objects]
+            )
+        # the thresholds we find snaps with, the same as the arguments to
+        # ``circleguard.snaps``. Can be changed while we're open, see
+        # ``snaps_args_changed``.
+        self.snaps_args = {
+            "max_angle": KeylessCircleguard.DEFAULT_ANGLE,
+            "min_distance": KeylessCircleguard.DEFAULT_DISTANCE,
+            "only_on_hitobjs": True,
+            **(snaps_args or {}),
+        }
+        self.cursor_comparison = None
+        self.update_player_analysis(self.players)
+        self.draw_key_timeline = False
+
+        # every distinct frame time of our enabled players, sorted, so
+        # stepping to the next or previous frame is an index increment instead
+        # of a search through every player. Rebuilt in
+        # ``update_frame_timeline`` whenever players are enabled or disabled.
+        self.frame_timeline = None
+        # the index into ``frame_timeline`` we last stepped to
+        self.frame_timeline_index = None
+        self.update_frame_timeline()
+
+        # maps ``(function, player)`` to the per-frame results of that
+        # ``StatisticMode.VECTORIZED`` function for that player, or to the
+        # exception it raised. Filled in the background, so an entry is missing
+        # until it has been calculated.
+        self.statistic_arrays = {}
+        self.statistic_thread = threading.Thread(
+            target=self.calculate_statistic_arrays
+        )
+        # allow users to quit before we're done calculating
+        self.statistic_thread.daemon = True
+        self.statistic_thread.start()
+
+        # incremented whenever our trail lods are recalculated, so a thread
+        # calculating them for settings which have since changed doesn't
+        # overwrite the newer ones
+        self.trail_lods_generation = 0
+        self.trail_lod_thread = None
+        self.update_trail_lods()
+
+        # cursor density heatmap, drawn under everything else. One of "Off",
+        # "Whole replay", or "Recent" (the last ``HEATMAP_WINDOW`` ms).
+        self.heatmap_mode = "Off"
+        self.heatmap_keydowns_only = False
+        self.heatmap_bin_size = 8
+        # the latest bin size requested which hasn't settled yet (see
+        # ``HEATMAP_BIN_SIZE_SETTLE_TIME``), and ``time.perf_counter_ns`` of
+        # when it was requested
+        self.pending_heatmap_bin_size = None
+        self.last_heatmap_bin_size_request = None
+        # maps ``heatmap_key()`` to the ``CursorHeatmap`` for those settings
+        # and the image of its counts over every frame, for the
+        # ``HEATMAP_CACHE_SIZE`` most recently drawn heatmaps. Both are
+        # calculated in the background, so an entry is missing until it's
+        # ready.
+        self.heatmaps = OrderedDict()
+        # keys which are being calculated right now. Only touched on the gui
+        # thread.
+        self.heatmaps_calculating = set()
+        # keys whose heatmaps are out of date (because more live frames have
+        # arrived) and should be recalculated, but can be drawn until then
+        self.heatmaps_stale = set()
+        # the last image drawn for a window of a heatmap, and the counts it
+        # was drawn from, so we only redraw it when the counts change
+        self.heatmap_window_image = None
+        self.heatmap_window_counts = None
+        self.heatmap_ready_signal.connect(self.heatmap_ready)
+
+        # whether to draw each player's entire path up to the current time
+        # (faintly, under everything but the heatmap), in addition to their
+        # usual trail
+        self.full_path = False
+        self.path_canvas = PathCanvas()
 
         # clock stuff
-        self.clock = Timer(start_speed, self.playback_start)
+        if playback_group is not None:
+            self.clock = playback_group.clock_for(start_speed, self.playback_start)
+        else:
+            self.clock = Timer(start_speed, self.playback_start)
         self.paused = False
         self.play_direction = 1
 
         # render stuff
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.next_frame_from_timer)
-        # 62 fps (1000ms / 60frames but the result can only be a integer)
-        self.timer.start(int(1000 / 60))
+        # in a playback group, the group's timer drives every member instead
+        if playback_group is None:
+            # 62 fps (1000ms / 60frames but the result can only be a integer)
+            self.timer.start(int(1000 / 60))
 
         # black background
         pal = QPalette()
@@ -234,29 +509,30 @@ class Renderer(QFrame):
         # currently
         self.should_draw_judgment_indicators = False
 
+        # the index into ``self.players`` of the player whose judgments we
+        # tint hitobjects (and draw judgment indicators) by
+        self.judgment_player = 0
+        # the players we calculate judgments for, whose error bars we stack
+        # from the bottom of the playfield up, in this order
+        self.judged_players = []
+        self.judgment_pool = None
+        if self.has_beatmap:
+            # maps the time of each hitobject to its index. This will work
+            # fine for ranked maps (no two hitobjs can be placed at the same
+            # time) but may break for aspire, loved, or crazy graveyarded maps.
+            self.hitobject_indices = {
+                t: i for i, t in enumerate(self.hitobject_times.tolist())
+            }
+            self.calculate_judgments(replays)
+        self.judgments_ready_signal.connect(self.update)
+
+        self.update_render_style()
         self.next_frame()
 
-        self.hitobj_to_judgments = {}
-        cg = KeylessCircleguard()
-        self.can_access_judgments = self.num_replays == 1 and cg.map_available(
-            replays[0]
-        )
-        if self.can_access_judgments:
-            r = replays[0]
-
-            self.judgments = cg.judgments(r, beatmap=self.beatmap)
-            # associate each hitobject with a judgment. Only hitobjs which are
-            # spinners won't be associated in this mapping (since core doesn't
-            # generate a judgment for them yet)
-            for judgment in self.judgments:
-                # use the hitobj time as our key. This will work fine for ranked
-                # maps (no two hitobjs can be placed at the same time) but may
-                # break for aspire, loved, or crazy graveyarded maps. Needs
-                # testing.
-                # A way around this is to simply store the slider hitobj in
-                # circlecore's hitobjs, or convert core to using slider's
-                # hitobjs again (or make them subclasses, or some such)
-                self.hitobj_to_judgments[judgment.hitobject.t] = judgment
+        if threaded_rendering:
+            self.render_worker = RenderWorker(self)
+            self.frame_rendered_signal.connect(self.frame_rendered)
+            self.render_worker.start()
 
     def resizeEvent(self, event):
         width = event.size().width() - GAMEPLAY_PADDING_WIDTH * 2
@@ -271,6 +547,25 @@ class Renderer(QFrame):
             self.scale = y_scale
             self.y_offset = 0
             self.x_offset = (width - GAMEPLAY_WIDTH * y_scale) / 2
+        self.update_render_style()
+        self.info_layout_dirty = True
+        # our render worker needs to draw a frame at the new size
+        self.update()
+
+    def changeEvent(self, event):
+        if event.type() is QEvent.Type.FontChange:
+            self.info_layout_dirty = True
+        super().changeEvent(event)
+
+    def update_render_style(self):
+        # we don't have a hitcircle radius if we don't have a beatmap, but we
+        # also won't draw any hitobjects in that case
+        hitcircle_radius = (
+            self.beatmap_stats.hitcircle_radius if self.has_beatmap else 0
+        )
+        self.render_style = RenderStyle(
+            self.scale, self.raw_view, hitcircle_radius, self.players
+        )
 
     def _x(self, position):
         return self.x_offset + GAMEPLAY_PADDING_WIDTH + self.scaled_number(position)
@@ -290,7 +585,32 @@ class Renderer(QFrame):
         This is to allow the back/forward buttons to advance frame by frame
         while still paused (as they connect directly to next and previous
         frame), while still pausing the automatic timer advancement.
+
+        Also applies any seek requested by scrubbing since the last tick, and
+        takes up any frames which have arrived for live replays.
         """
+        if self.live:
+            self.update_live_players()
+        if self.pending_seek is not None:
+            position = self.pending_seek
+            self.pending_seek = None
+            self.seek_to(position)
+        elif self.scrubbing:
+            elapsed = (time.perf_counter_ns() - self.last_scrub_request) / 10**6
+            if elapsed > SCRUB_SETTLE_TIME:
+                self.scrubbing = False
+                # redraw the frame we settled on in full detail
+                self.update_statistic_lines()
+                self.update()
+        if self.pending_heatmap_bin_size is not None:
+            elapsed = (
+                time.perf_counter_ns() - self.last_heatmap_bin_size_request
+            ) / 10**6
+            if elapsed > HEATMAP_BIN_SIZE_SETTLE_TIME:
+                self.heatmap_bin_size = self.pending_heatmap_bin_size
+                self.pending_heatmap_bin_size = None
+                self.update()
+
         if self.paused:
             # ignore our paused state if we're still loading sliders, or else if
             # we pause before the sliders are done loading we'll deadlock
@@ -309,15 +629,26 @@ class Renderer(QFrame):
             self.loaded_signal.emit()
             self.previously_loading = False
 
+        if self.follow_live and self.waiting_for_live_frames():
+            target = max(self.playback_end - LIVE_FOLLOW_DELAY, self.playback_start)
+            if abs(self.clock.get_time() - target) > LIVE_FOLLOW_TOLERANCE:
+                self.clock.time_counter = target
+
         self.next_frame()
 
-    def next_frame(self, stepping_backwards=False):
+    @traced("next frame", "frame")
+    def next_frame(self, stepping_backwards=False, incremental=False):
         """
         Prepares the next frame.
 
         If we have just set our current time to be less than what it was the
         previous time next_frame was called, pass stepping_backwards=True so
         the correct frame can be chosen when searching the frame list.
+
+        If the current time is only a few frames away from the time of the
+        previous frame (eg when stepping frame by frame), pass
+        incremental=True to walk each player's position from where it was
+        instead of searching for it from scratch.
         """
         # just update the frame if currently loading
         if self.is_loading:
@@ -325,9 +656,20 @@ class Renderer(QFrame):
             self.update()
             return
         current_time = self.clock.get_time()
+        # if we've caught up to the newest frame of a live replay, wait there
+        # for more frames to arrive instead of pausing
+        if current_time > self.playback_end and self.waiting_for_live_frames():
+            current_time = self.playback_end
+            self.clock.time_counter = current_time
         # if we're at the end of the track or are at the beginning of the track
-        # (and thus are reversing), pause and dont update
-        if current_time > self.playback_end or current_time < self.playback_start:
+        # (and thus are reversing), pause and dont update. In a playback group,
+        # keep going (showing our last frame) until every member is done.
+        playback_start, playback_end = self.playback_start, self.playback_end
+        if self.playback_group is not None:
+            group_start, group_end = self.playback_group.playback_range()
+            playback_start = min(playback_start, group_start)
+            playback_end = max(playback_end, group_end)
+        if current_time > playback_end or current_time < playback_start:
             self.pause_signal.emit()
             return
 
@@ -337,12 +679,15 @@ class Renderer(QFrame):
         # stepping backwards we need to prefer the left side instead.
         side = "left" if stepping_backwards else "right"
         for player in self.players:
-            player.end_pos = np.searchsorted(player.t, current_time, side)
-            # for some reason side=right and side=left differ by 1 even when
-            # the array has no duplicates, so only account for that in the
-            # right side case
-            if side == "right":
-                player.end_pos -= 1
+            if incremental:
+                player.end_pos = self.walk_end_pos(player, current_time, side)
+            else:
+                player.end_pos = np.searchsorted(player.t, current_time, side)
+                # for some reason side=right and side=left differ by 1 even
+                # when the array has no duplicates, so only account for that
+                # in the right side case
+                if side == "right":
+                    player.end_pos -= 1
 
             player.start_pos = 0
             if player.end_pos >= self.num_frames_on_screen:
@@ -353,17 +698,42 @@ class Renderer(QFrame):
                 player.end_pos = len(player.xy) - 1
 
         if self.has_beatmap:
-            self.get_hitobjects()
+            self.get_hitobjects(current_time)
+        self.frame_time = current_time
+        self.update_statistic_lines()
         self.update_time_signal.emit(int(current_time))
         self.update()
 
-    def get_hitobjects(self):
+    def walk_end_pos(self, player, current_time, side):
+        """
+        The ``end_pos`` ``next_frame`` would search for, found by walking from
+        the player's current ``end_pos`` instead. Only a frame or two away
+        when stepping frame by frame, which is much cheaper than a search.
+        """
+        t = player.t
+        end_pos = player.end_pos
+        if side == "right":
+            # the last frame at or before the current time
+            while end_pos + 1 < len(t) and t[end_pos + 1] <= current_time:
+                end_pos += 1
+            while end_pos >= 0 and t[end_pos] > current_time:
+                end_pos -= 1
+        else:
+            # the first frame at or after the current time
+            end_pos = max(end_pos, 0)
+            while end_pos > 0 and t[end_pos - 1] >= current_time:
+                end_pos -= 1
+            while end_pos < len(t) and t[end_pos] < current_time:
+                end_pos += 1
+        return end_pos
+
+    def get_hitobjects(self, current_time):
         # get currently visible hitobjects
-        current_time = self.clock.get_time()
         found_all = False
         # TODO optimize this by tracking our current hitobj index, this iterates
         # through half the hitobjects of the map on average (O(1) best case and
         # O(n) worst case) which can't be good for performance
+        stats = self.beatmap_stats
         index = 0
         self.hitobjs_to_draw = []
         self.hitobjs_to_draw_hits_for = []
@@ -372,14 +742,14 @@ class Renderer(QFrame):
             current_hitobj = self.hit_objects[index]
             hit_t = current_hitobj.time.total_seconds() * 1000
             if isinstance(current_hitobj, (Slider, Spinner)):
-                hit_end = self.get_hit_endtime(current_hitobj) + self.fade_in
+                hit_end = self.get_hit_endtime(current_hitobj) + stats.fade_in
             else:
-                hit_end = hit_t + self.hitwindow_50 + self.fade_in
+                hit_end = hit_t + stats.hitwindow_50 + stats.fade_in
             if hit_t > current_time - JUDGMENT_INDICATOR_THRESHOLD:
                 self.hitobjs_to_draw_judgment_indicators_for.append(current_hitobj)
             if hit_t > current_time - ERROR_BAR_HIT_THRESHOLD:
                 self.hitobjs_to_draw_hits_for.append(current_hitobj)
-            if hit_t - self.preempt < current_time < hit_end:
+            if hit_t - stats.preempt < current_time < hit_end:
                 self.hitobjs_to_draw.append(current_hitobj)
 
             elif hit_t > current_time:
@@ -388,15 +758,18 @@ class Renderer(QFrame):
                 found_all = True
             index += 1
 
+    @traced("paint", "paint")
     def paintEvent(self, _event):
         """
         Called whenever self.update() is called
         """
+        # the frame has already been drawn by our render worker, all that's
+        # left is to show it
+        if self.render_worker is not None and not self.is_loading:
+            self.paint_rendered_frame()
+            return
         self.painter.begin(self)
-        self.painter.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
-        self.painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
         self.painter.setPen(PEN_WHITE)
-        _pen = self.painter.pen()
         # loading screen
         if self.is_loading:
             if self.thread.is_alive():
@@ -405,115 +778,403 @@ class Renderer(QFrame):
                 return
             else:
                 self.is_loading = False
-                self.clock.reset()
+                # only the first member of a playback group to finish loading
+                # starts playback over, so later members don't restart it for
+                # everyone
+                if self.playback_group is None or self.playback_group.loaded():
+                    self.clock.reset()
                 self.painter.end()
                 return
+        self.paint_frame(self.snapshot())
+        self.painter.end()
+
+    def paint_frame(self, frame):
+        """
+        Draws ``frame`` with ``self.painter``, which must already be active.
+
+        Only reads the state of the frame from ``frame`` (and draws onto its
+        ``path_canvas``, which only ever the thread painting it touches), so
+        that it can be called from our render worker's thread while the gui
+        thread moves on to the next frame.
+        """
+        self.painter.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
+        # antialiasing is expensive, and not worth it for frames which will be
+        # replaced a moment later while scrubbing
+        self.painter.setRenderHint(QPainter.RenderHint.Antialiasing, not frame.preview)
+        self.painter.setPen(PEN_WHITE)
+        _pen = self.painter.pen()
+        tracer = self.tracer
+        # heatmap
+        if frame.heatmap is not None:
+            with tracer.span("heatmap", "paint"):
+                self.paint_heatmap(frame)
+        # full paths
+        if frame.path_canvas is not None:
+            with tracer.span("full path", "paint"):
+                self.paint_full_path(frame)
         # beatmap
-        if self.has_beatmap:
-            self.paint_beatmap()
+        if frame.beatmap_stats is not None:
+            with tracer.span("beatmap", "paint"):
+                self.paint_beatmap(frame)
         # cursors
-        for player in self.players:
-            self.paint_cursor(player)
+        with tracer.span("cursors", "paint"):
+            for player_frame in frame.players:
+                self.paint_cursor(frame, player_frame)
         # other info
         self.painter.setPen(_pen)
-        self.paint_border()
-        if self.should_paint_info:
-            self.paint_info()
-        if self.paint_frametime:
+        self.paint_border(frame)
+        if frame.paint_info:
+            with tracer.span("info", "paint"):
+                self.paint_info(frame)
+        if frame.draw_key_timeline and frame.players:
+            with tracer.span("key timeline", "paint"):
+                self.paint_key_timeline(frame)
+        if frame.paint_frametime:
             self.paint_frametime_graph()
-        self.painter.end()
 
-    def paint_border(self):
-        PEN_WHITE.setWidth(self.scaled_number(1))
-        self.painter.setPen(PEN_WHITE)
+    def paint_rendered_frame(self):
+        """
+        Shows the latest frame our render worker finished drawing.
+        """
+        image = self.render_worker.latest_image()
+        if image is None:
+            return
+        painter = QPainter(self)
+        painter.drawImage(0, 0, image)
+        painter.end()
+
+    def update(self):
+        """
+        Schedules a redraw of the current frame.
+
+        When rendering in the background, the current frame is sent to our
+        render worker instead, and we only repaint (to show the drawn frame)
+        once it's done.
+        """
+        # we draw our loading screen ourselves, it's cheap. ``snapshot`` does
+        # everything else that has to happen on the gui thread
+        if self.render_worker is None or self.is_loading:
+            super().update()
+            return
+        self.render_worker.request(self.snapshot(), self.devicePixelRatioF())
+
+    def frame_rendered(self):
+        super().update()
+
+    def snapshot(self):
+        """
+        Captures everything needed to draw the current frame in an immutable
+        ``FrameSnapshot``: our settings, each player's frames and analysis,
+        the heatmap image, our info layout, and the text of our statistics
+        (as of the last ``update_statistic_lines``). May be called any number
+        of times per frame.
+
+        Must be called on the gui thread. Whatever draws the snapshot (which
+        may be our render worker's thread) reads nothing else of ours, so the
+        gui thread is free to change any of it in the meantime.
+        """
+        # if we haven't prepared a frame yet (eg we were paused while loading),
+        # fall back to the clock
+        frame_time = self.frame_time
+        if frame_time is None:
+            frame_time = self.clock.get_time()
+        # lay out our info here, on the gui thread, since laying out text needs
+        # our font and the gui thread reads the layout to handle clicks
+        if self.should_paint_info and self.info_layout_dirty:
+            self.update_info_layout()
+
+        players = tuple(
+            PlayerFrame(
+                player=player,
+                start_pos=player.start_pos,
+                end_pos=player.end_pos,
+                disabled=self.player_disabled(player),
+                # live players' arrays (and everything we derive from them)
+                # are replaced as frames arrive, so take them as they are now
+                t=player.t,
+                xy=player.xy,
+                k=player.k,
+                keydowns=player.keydowns,
+                snap_frames=player.snap_frames,
+                trail_lods=player.trail_lods,
+                key_presses=player.key_presses,
+                hitobject_judgments=player.hitobject_judgments,
+            )
+            for player in self.players
+        )
+        player_frames = dict(zip(self.players, players))
+        judgment_player = None
+        if self.players:
+            judgment_player = players[self.judgment_player]
+
+        cursor_distance = None
+        hitobject_distance = None
+        if self.should_paint_info and self.num_replays > 0:
+            if self.num_replays == 2 and self.cursor_comparison is not None:
+                # we may only have data from one cursor at the moment
+                cursor_distance = self.cursor_comparison.distance_at(0, frame_time)
+            player = self.players[0]
+            if (
+                self.num_replays == 1
+                and self.has_beatmap
+                and len(player.t)
+                and player.closest_hitobject_distance is not None
+            ):
+                hitobject_distance = player.closest_hitobject_distance[
+                    player.end_pos
+                ]
+
+        path_canvas = self.path_canvas if self.full_path else None
+        return FrameSnapshot(
+            time=frame_time,
+            preview=self.scrubbing,
+            trail_tolerance=self.trail_tolerance(),
+            style=self.render_style,
+            width=self.width(),
+            height=self.height(),
+            scale=self.scale,
+            x_offset=self.x_offset,
+            y_offset=self.y_offset,
+            players=players,
+            hitobjs_to_draw=tuple(self.hitobjs_to_draw),
+            hitobjs_to_draw_hits_for=tuple(self.hitobjs_to_draw_hits_for),
+            hitobjs_to_draw_judgment_indicators_for=tuple(
+                self.hitobjs_to_draw_judgment_indicators_for
+            ),
+            beatmap_stats=self.beatmap_stats if self.has_beatmap else None,
+            judged_players=tuple(player_frames[p] for p in self.judged_players),
+            judgment_player=judgment_player,
+            raw_view=self.raw_view,
+            only_color_keydowns=self.only_color_keydowns,
+            num_frames_on_screen=self.num_frames_on_screen,
+            events=frozenset(self.events),
+            draw_hitobjects=self.draw_hitobjects,
+            draw_approach_circles=self.draw_approach_circles,
+            draw_hit_error_bar=self.should_draw_hit_error_bar,
+            draw_judgment_indicators=self.should_draw_judgment_indicators,
+            draw_key_timeline=self.draw_key_timeline,
+            paint_frametime=self.paint_frametime,
+            heatmap=self.heatmap_snapshot(frame_time),
+            path_canvas=path_canvas,
+            paint_info=self.should_paint_info,
+            text_cache=self.text_cache,
+            player_info_labels=self.player_info_labels,
+            cursor_distance=cursor_distance,
+            hitobject_distance=hitobject_distance,
+            statistic_lines=self.statistic_lines,
+        )
+
+    def paint_border(self, frame):
+        self.painter.setPen(frame.style.border)
         self.painter.setOpacity(0.25)
         self.painter.drawRect(
             QRectF(
-                self.scaled_point(0, 0),
-                self.scaled_point(GAMEPLAY_WIDTH, GAMEPLAY_HEIGHT),
+                frame.scaled_point(0, 0),
+                frame.scaled_point(GAMEPLAY_WIDTH, GAMEPLAY_HEIGHT),
             )
         )
 
-    def paint_cursor(self, player):
+    def paint_cursor(self, frame, player_frame):
         """
         Draws a cursor.
 
         Arguments:
-            Player player: player to draw the cursor of.
+            FrameSnapshot frame: the frame to draw the cursor in.
+            PlayerFrame player_frame: the player to draw the cursor of, and
+                which of their frames are visible.
         """
         # don't draw anything if the player is disabled
-        if player in self.disabled_players:
+        if player_frame.disabled:
             return
-        alpha_step = 1 / self.num_frames_on_screen
-        pen = player.pen
-        width = WIDTH_LINE_RAW_VIEW if self.raw_view else WIDTH_LINE
-        pen.setWidth(self.scaled_number(width))
-        PEN_HIGHLIGHT.setWidth(self.scaled_number(width))
+        player = player_frame.player
+        start_pos = player_frame.start_pos
+        end_pos = player_frame.end_pos
+        # pull these out of the frame once, we index into them for every
+        # visible frame below
+        t = player_frame.t
+        xy = player_frame.xy
+        k = player_frame.k
+        keydowns = player_frame.keydowns
+        snap_frames = player_frame.snap_frames
+        events = frame.events
+        num_frames = len(xy)
+
+        style = frame.style
+
+        alpha_step = 1 / frame.num_frames_on_screen
+        pen = style.player_line_pens[player]
         self.painter.setPen(pen)
-        highlighted_pen = False
-        for i in range(player.start_pos, player.end_pos):
-            # don't draw a cursor at the very last frame, this is already taken
-            # care of by the `i - 1` iteration, since we do `i + 1` inside this
-            # loop
-            if i == len(player.xy) - 1:
-                continue
-            highlight = player.t[i] in self.events or player.t[i + 1] in self.events
-            if highlight and not highlighted_pen:
-                self.painter.setPen(PEN_HIGHLIGHT)
-                highlighted_pen = True
-            elif not highlight and highlighted_pen:
-                self.painter.setPen(pen)
-                highlighted_pen = False
+        current_pen = pen
+        # usually every frame from start_pos to end_pos, but we may skip frames
+        # which wouldn't be visible anyway with long trails or fast playback
+        indices = trail_indices(
+            player_frame.trail_lods, start_pos, end_pos, frame.trail_tolerance
+        )
+        for i, j in zip(indices, indices[1:]):
+            # events take precedence over snaps
+            line_pen = pen
+            if t[i] in events or t[j] in events:
+                line_pen = style.line_highlight
+            elif snap_frames[i] or snap_frames[j]:
+                line_pen = style.line_snap
+            if line_pen is not current_pen:
+                self.painter.setPen(line_pen)
+                current_pen = line_pen
             grey_out = False
             # only grey out lines if we're in raw view (crosses are greyed out
             # instead in the normal view)
-            if self.raw_view:
+            if frame.raw_view:
                 # grey out if we don't have a keypress at the start
-                if not bool(player.k[i]):
+                if not bool(k[i]):
                     grey_out = True
                 # grey out if we're only coloring keydowns and this is not a
                 # keydown
-                if self.only_color_keydowns and not bool(player.keydowns[i]):
+                if frame.only_color_keydowns and not bool(keydowns[i]):
                     grey_out = True
             self.draw_line(
-                (i - player.start_pos) * alpha_step,
-                player.xy[i],
-                player.xy[i + 1],
+                frame,
+                (i - start_pos) * alpha_step,
+                xy[i],
+                xy[j],
                 grey_out=grey_out,
             )
-        pen.setWidth(self.scaled_number(WIDTH_CROSS))
-        self.painter.setPen(pen)
-        for i in range(player.start_pos, player.end_pos + 1):
+        # crosses double the number of things we draw for each frame, so leave
+        # them out of previews
+        if frame.preview:
+            return
+        self.painter.setPen(style.player_cross_pens[player])
+        for i in indices:
             # avoid out of bounds error on the last frame, might be unecessary
             # but would prefer caution
-            if i >= len(player.xy):
+            if i >= num_frames:
                 continue
-            alpha = (i - player.start_pos) * alpha_step
-            xy = player.xy[i]
-            k = player.k[i]
-            t = player.t[i]
-            highlight = t in self.events
+            alpha = (i - start_pos) * alpha_step
+            highlight = t[i] in events
             # grey out only if no keys are held by default
-            grey_out = not bool(k)
+            grey_out = not bool(k[i])
             # but override if we're only coloring keydowns and this is not a
             # keydown
-            if self.only_color_keydowns and not bool(player.keydowns[i]):
+            if frame.only_color_keydowns and not bool(keydowns[i]):
                 grey_out = True
-            self.draw_cross(alpha, xy, grey_out=grey_out, highlight=highlight)
+            snap = bool(snap_frames[i])
+            self.draw_cross(
+                frame, alpha, xy[i], grey_out=grey_out, highlight=highlight, snap=snap
+            )
         # reset alpha
         self.painter.setOpacity(1)
 
-    def paint_beatmap(self):
+    def paint_heatmap(self, frame):
+        image, width, height = frame.heatmap
+        self.painter.setOpacity(HEATMAP_OPACITY)
+        self.painter.drawImage(
+            QRectF(frame.scaled_point(0, 0), frame.scaled_point(width, height)),
+            image,
+        )
+        self.painter.setOpacity(1)
+
+    def heatmap_snapshot(self, frame_time):
+        """
+        The heatmap to draw in a frame at ``frame_time``, as ``(image, width,
+        height)`` (the width and height in osu!pixels), or ``None`` if there's
+        no heatmap to draw. Starts calculating the heatmap for our current
+        settings if it isn't ready.
+        """
+        if self.heatmap_mode == "Off":
+            return None
+        key = self.heatmap_key()
+        if key not in self.heatmaps or key in self.heatmaps_stale:
+            self.calculate_heatmap(key)
+        if key not in self.heatmaps:
+            return None
+        self.heatmaps.move_to_end(key)
+        heatmap, image = self.heatmaps[key]
+
+        if self.heatmap_mode != "Whole replay":
+            counts = heatmap.window_counts(frame_time - HEATMAP_WINDOW, frame_time)
+            if counts is not self.heatmap_window_counts:
+                self.heatmap_window_counts = counts
+                self.heatmap_window_image = heatmap_image(counts)
+            image = self.heatmap_window_image
+
+        # cells span the entire playfield, the last row and column might hang
+        # over its edge a little
+        rows, columns = heatmap.shape
+        return (image, columns * heatmap.bin_size, rows * heatmap.bin_size)
+
+    def paint_full_path(self, frame):
+        canvas = frame.path_canvas
+        canvas.update(frame, frame.width, frame.height)
+        self.painter.setOpacity(FULL_PATH_OPACITY)
+        self.painter.drawImage(0, 0, canvas.image)
+        self.painter.setOpacity(1)
+
+    def paint_key_timeline(self, frame):
+        """
+        Draws when each key of each player was held around the current time,
+        in the bottom left corner. Each key of each player is a row, and time
+        flows from right to left, with the current time marked by a line.
+        """
+        start_time = frame.time - KEY_TIMELINE_PAST
+        end_time = frame.time + KEY_TIMELINE_FUTURE
+        ms_per_pixel = (KEY_TIMELINE_PAST + KEY_TIMELINE_FUTURE) / KEY_TIMELINE_WIDTH
+        player_height = (
+            len(KEYS) * (KEY_TIMELINE_ROW_HEIGHT + KEY_TIMELINE_ROW_SPACING)
+            + KEY_TIMELINE_PLAYER_SPACING
+        )
+        x = 5
+        y = frame.height - 5 - player_height * len(frame.players)
+
+        self.painter.setPen(PEN_BLANK)
+        for player_frame in frame.players:
+            player = player_frame.player
+            opacity = 0.4 if player_frame.disabled else 1
+            self.painter.setBrush(frame.style.player_brushes[player])
+            for key in range(len(KEYS)):
+                # a faint lane for each row, so rows without presses still
+                # show up
+                self.painter.setOpacity(0.15 * opacity)
+                self.painter.drawRect(
+                    QRectF(x, y, KEY_TIMELINE_WIDTH, KEY_TIMELINE_ROW_HEIGHT)
+                )
+                self.painter.setOpacity(opacity)
+                starts, ends = player_frame.key_presses.window(
+                    key, start_time, end_time
+                )
+                for start, end in zip(starts, ends):
+                    left = (max(start, start_time) - start_time) / ms_per_pixel
+                    right = (min(end, end_time) - start_time) / ms_per_pixel
+                    self.painter.drawRect(
+                        QRectF(
+                            x + left,
+                            y,
+                            max(right - left, 1),
+                            KEY_TIMELINE_ROW_HEIGHT,
+                        )
+                    )
+                y += KEY_TIMELINE_ROW_HEIGHT + KEY_TIMELINE_ROW_SPACING
+            y += KEY_TIMELINE_PLAYER_SPACING
+
+        # the current time
+        self.painter.setOpacity(1)
+        self.painter.setPen(frame.style.info_text)
+        now = x + KEY_TIMELINE_PAST / ms_per_pixel
+        top = frame.height - 5 - player_height * len(frame.players)
+        self.painter.drawLine(QPointF(now, top), QPointF(now, y))
+        self.painter.setBrush(BRUSH_BLANK)
+
+    def paint_beatmap(self, frame):
         # draw playfield judgment indicators (yellow/green/blue circles under
         # hitobjs) before drawing hitobjs so they don't cover hitobjs
         # (though to be honest it doesn't make much of a difference either way)
 
-        if self.should_draw_judgment_indicators and self.can_access_judgments:
-            for hitobj in self.hitobjs_to_draw_hits_for:
+        if frame.draw_judgment_indicators:
+            for hitobj in frame.hitobjs_to_draw_hits_for:
                 if isinstance(hitobj, Spinner):
                     continue
 
-                judgment = self.hitobj_to_judgments[self.get_hit_time(hitobj)]
+                judgment = self.judgment_of(frame, hitobj)
+                if judgment is None:
+                    continue
 
                 if judgment.type is JudgmentType.Miss:
                     # misses don't have an intrinsic event time, so just use
@@ -523,54 +1184,95 @@ class Renderer(QFrame):
                     t = judgment.time
 
                 # don't draw hits that haven't happened yet
-                if t <= self.clock.get_time():
-                    self.draw_judgment_indicator(hitobj, judgment)
+                if t <= frame.time:
+                    self.draw_judgment_indicator(frame, hitobj, judgment)
             self.painter.setBrush(BRUSH_BLANK)
 
-        for hitobj in self.hitobjs_to_draw[::-1]:
-            self.draw_hitobject(hitobj)
-
-        # only draw hit error bars if there's only one replay
-        if self.should_draw_hit_error_bar and self.can_access_judgments:
-            self.draw_hit_error_bar()
-
-            for hitobj in self.hitobjs_to_draw_hits_for:
-                # core doesn't calculate judgmnets for spinners yet, TODO
-                # implement this when core does
-                if isinstance(hitobj, Spinner):
+        for hitobj in frame.hitobjs_to_draw[::-1]:
+            self.draw_hitobject(frame, hitobj)
+
+        if frame.draw_hit_error_bar:
+            # one error bar for each judged player, stacked from the bottom up
+            stacked = len(frame.judged_players) > 1
+            for row, player_frame in enumerate(frame.judged_players):
+                y = GAMEPLAY_HEIGHT - ERROR_BAR_HIT_HEIGHT
+                y -= row * ERROR_BAR_STACK_SPACING
+                marker = player_frame.player if stacked else None
+                self.draw_hit_error_bar(frame, y, marker)
+                if player_frame.disabled:
                     continue
 
-                judgment = self.hitobj_to_judgments[self.get_hit_time(hitobj)]
-                # don't draw any judgment bars for misses
-                if judgment.type is JudgmentType.Miss:
-                    continue
-                # don't draw hits that haven't happened yet
-                if judgment.t <= self.clock.get_time():
-                    self.draw_hit(hitobj, judgment)
+                for hitobj in frame.hitobjs_to_draw_hits_for:
+                    # core doesn't calculate judgmnets for spinners yet, TODO
+                    # implement this when core does
+                    if isinstance(hitobj, Spinner):
+                        continue
+
+                    judgment = self.judgment_of(frame, hitobj, player_frame)
+                    # don't draw any judgment bars for misses, or for
+                    # judgments we haven't calculated yet
+                    if judgment is None or judgment.type is JudgmentType.Miss:
+                        continue
+                    # don't draw hits that haven't happened yet
+                    if judgment.t <= frame.time:
+                        self.draw_hit(frame, hitobj, judgment, y)
+
+    def update_info_layout(self):
+        """
+        Lays out the parts of our info text which don't change from frame to
+        frame, and where each player's info is on screen (so users can click
+        on it to disable that player).
+        """
+        self.text_cache = TextCache(self.font())
+        # the widest coordinates we expect to draw after a player's label
+        coordinates_width = 2 * self.text_cache.number_width(
+            "-000.00"
+        ) + self.text_cache.text_width(", ")
 
-    def paint_info(self):
+        self.player_info_labels = {}
+        self.player_info_positions = {}
+        y = 15
+        for player in self.players:
+            y += 13
+            label = f"{player.username} {player.mods.short_name()}: "
+            self.player_info_labels[player] = label
+            # not sure why we need to do ``y - 9`` instead of 9 here, our text
+            # is perfectly happy to be drawn at ``y`` but we need to pass
+            # ``y - 9`` to our ``drawRect`` calls...maybe 9 was a manually
+            # determined number that causes the text to align with the drawn
+            # boxes?
+            # Our rect starts at 5 but the text starts at 57, so we need to
+            # increase the width by the difference to account. And
+            # unfortunately the rects overlap if we don't shrink the height by
+            # 3; would like to figure out why but this works for now.
+            width = self.text_cache.text_width(label) + coordinates_width
+            info_pos = Rect(5, y - 9, int(width) + 57 - 5, self.text_cache.height - 3)
+            self.player_info_positions[info_pos] = player
+
+        self.info_layout_dirty = False
+
+    def paint_info(self, frame):
         """
         Draws various info about the replays in the upper left corner.
         """
+        text_cache = frame.text_cache
+
         # our current y coordinate for drawing info. Modified throughout this
         # function
         y = 15
 
-        PEN_WHITE.setWidth(1)
-        self.painter.setPen(PEN_WHITE)
+        style = frame.style
+        self.painter.setPen(style.info_text)
         self.painter.setOpacity(1)
-        ms = round(self.clock.get_time())
+        ms = round(frame.time)
         text = f"{ms}"
-        self.painter.drawText(5, y, text)
-        # we don't use a monospaced font, so our ms text may vary by as much as
-        # 10 pixels in width (possibly more, haven't checked rigorously). If
-        # we just drew our minute:seconds text directly after it, the position
-        # of that text would constantly flicker left and right, since the ms
-        # text (and thus its width) changes every single frame. To fix this,
-        # only increment widths in multiples of 10. (This will not fix the issue
-        # if the text width happens to hover exactly around a multiple of 10,
-        # but there's not much to be done in that case).
-        text_width = self.painter.boundingRect(5, y, 0, 0, 0, text).width()
+        text_cache.draw_number(self.painter, 5, y, text)
+        # every digit is drawn with the same width, but our ms text still
+        # gains a digit every so often. If we just drew our minute:seconds
+        # text directly after it, the position of that text would jump when
+        # that happens (and when the sign changes). To soften this, only
+        # increment widths in multiples of 10.
+        text_width = text_cache.number_width(text)
         if text_width < 50:
             x = 50
         elif text_width < 60:
@@ -598,83 +1300,53 @@ class Renderer(QFrame):
             minutes = abs(minutes)
             seconds = abs(seconds)
 
-        self.painter.drawText(5 + 4 + x, y, f"ms ({sign}{minutes:01}:{seconds:02})")
+        x = text_cache.draw_text(self.painter, 5 + 4 + x, y, "ms (")
+        x = text_cache.draw_number(self.painter, x, y, f"{sign}{minutes:01}:{seconds:02}")
+        text_cache.draw_text(self.painter, x, y, ")")
 
-        self.player_info_positions = {}
         if self.num_replays > 0:
-            for player in self.players:
+            for player_frame in frame.players:
+                player = player_frame.player
+                end_pos = player_frame.end_pos
 
                 def _set_opacity(opacity):
-                    if player in self.disabled_players:
+                    if player_frame.disabled:
                         opacity /= 2.4
                     self.painter.setOpacity(opacity)
 
                 y += 13
+                if len(player_frame.t) == 0:
+                    continue
                 pen = player.pen
                 self.painter.setPen(PEN_BLANK)
-                self.painter.setBrush(QBrush(pen.color()))
-                keys = Key(int(player.k[player.end_pos]))
-                _set_opacity(1 if Key.M1 in keys and Key.K1 not in keys else 0.3)
-                self.painter.drawRect(5, y - 9, 10, 10)
-                _set_opacity(1 if Key.M2 in keys and Key.K2 not in keys else 0.3)
-                self.painter.drawRect(18, y - 9, 10, 10)
-                _set_opacity(1 if Key.K1 | Key.M1 in keys else 0.3)
-                self.painter.drawRect(31, y - 9, 10, 10)
-                _set_opacity(1 if Key.K2 | Key.M2 in keys else 0.3)
-                self.painter.drawRect(44, y - 9, 10, 10)
+                self.painter.setBrush(style.player_brushes[player])
+                # one box for each of M1, M2, K1, and K2
+                states = player_frame.key_presses.states[:, end_pos]
+                for i, held in enumerate(states):
+                    _set_opacity(1 if held else 0.3)
+                    self.painter.drawRect(5 + 13 * i, y - 9, 10, 10)
                 _set_opacity(1)
                 self.painter.setPen(pen)
-                info_text = (
-                    f"{player.username} {player.mods.short_name()}: "
-                    f"{player.xy[player.end_pos][0]:.2f}, "
-                    f"{player.xy[player.end_pos][1]:.2f}"
-                )
-                self.painter.drawText(57, y, info_text)
-                # not sure why we need to do ``y - 9`` instead of 9 here,
-                # our ``drawText`` call is perfectly happy to accept ``y`` but
-                # we need to pass ``y - 9`` to our ``drawRect`` calls...maybe 9
-                # was a manually determined number that causes the text to align
-                # with the drawn boxes?
-                info_pos = self.painter.boundingRect(5, y - 9, 0, 0, 0, info_text)
-                info_pos = Rect(
-                    info_pos.x(), info_pos.y(), info_pos.width(), info_pos.height()
+                xy = player_frame.xy[end_pos]
+                x = text_cache.draw_text(
+                    self.painter, 57, y, frame.player_info_labels[player]
                 )
-                # unfortunately the rects overlap if we don't make this manual
-                # adjustment; would like to figure out why but this works for
-                # now.
-                info_pos.height -= 3
-                # our bounding rect starts at 5 but the text starts at 57, so
-                # we need to increase the width by the difference to account
-                info_pos.width += 57 - 5
-                self.player_info_positions[info_pos] = player
+                x = text_cache.draw_number(self.painter, x, y, f"{xy[0]:.2f}")
+                x = text_cache.draw_text(self.painter, x, y, ", ")
+                text_cache.draw_number(self.painter, x, y, f"{xy[1]:.2f}")
 
             self.painter.setOpacity(1)
-            self.painter.setPen(PEN_WHITE)
-            if self.num_replays == 2:
-                try:
-                    y += 13
-                    p1 = self.players[0]
-                    p2 = self.players[1]
-                    distance = math.sqrt(
-                        ((p1.xy[p1.end_pos][0] - p2.xy[p2.end_pos][0]) ** 2)
-                        + ((p1.xy[p1.end_pos][1] - p2.xy[p2.end_pos][1]) ** 2)
-                    )
-                    self.painter.drawText(5, y, f"{int(distance)}px apart")
-                except IndexError:
-                    # we may only have data from one cursor at the moment
-                    pass
-
-            if self.num_replays == 1 and self.has_beatmap:
+            self.painter.setPen(style.info_text)
+            if frame.cursor_distance is not None:
                 y += 13
-                player = self.players[0]
-                current_t = timedelta(milliseconds=int(self.clock.get_time()))
-                closest_hitobj = self.beatmap.closest_hitobject(current_t)
-                if self.use_hr:
-                    closest_hitobj = closest_hitobj.hard_rock
-                distance = self.distance_between(
-                    player.xy[player.end_pos], closest_hitobj
+                x = text_cache.draw_number(
+                    self.painter, 5, y, f"{int(frame.cursor_distance)}"
                 )
+                text_cache.draw_text(self.painter, x, y, "px apart")
 
+            if frame.hitobject_distance is not None:
+                y += 13
+                distance = frame.hitobject_distance
                 # show "x px inside hitobj" instead of a negative distance
                 inside = False
                 if distance < 0:
@@ -682,40 +1354,319 @@ class Renderer(QFrame):
                     distance = abs(distance)
 
                 inside_from = "inside" if inside else "from"
-                text = f"{distance:0.2f}px {inside_from} closest hitobj"
-                self.painter.drawText(5, y, text)
-
-            for function in self.statistic_functions:
-                # assume mode is EACH (once per player) if not specified
-                mode = getattr(
-                    function, "__circlevis_statistic_mode", StatisticMode.EACH
+                x = text_cache.draw_number(self.painter, 5, y, f"{distance:0.2f}")
+                text_cache.draw_text(
+                    self.painter, x, y, f"px {inside_from} closest hitobj"
                 )
 
-                if mode is StatisticMode.EACH:
-                    for player in self.players:
-                        y += 13
-                        # dont draw statistics for disabled players
-                        # TODO probably should grew out text instead of removing
-                        # completely
-                        if player in self.disabled_players:
-                            continue
+            for text in frame.statistic_lines:
+                y += 13
+                # lines without text keep their place, so each player's
+                # statistics stay on the same line
+                if text is not None:
+                    self.painter.drawText(5, y, text)
+
+    def update_statistic_lines(self):
+        """
+        Evaluates our statistic functions for the current frame, and stores
+        the text of each line of statistics to draw in ``statistic_lines``.
+        Lines which should be left blank are ``None``.
+
+        Called once per frame (not per draw, which may happen several times a
+        frame), so our evaluator's budget windows and throttled intervals
+        count frames. Statistic functions are evaluated here, on the gui
+        thread, rather than while drawing, since they're called with our
+        (live) players.
+        """
+        if not self.should_paint_info or self.num_replays == 0:
+            self.statistic_lines = ()
+            return
+        # statistic functions can be arbitrarily expensive, so don't evaluate
+        # them for previews
+        preview = self.scrubbing
+        lines = []
+        for function in self.statistic_functions:
+            # assume mode is EACH (once per player) if not specified
+            mode = getattr(function, "__circlevis_statistic_mode", StatisticMode.EACH)
+
+            if mode is StatisticMode.EACH:
+                for player in self.players:
+                    # dont draw statistics for disabled players
+                    # TODO probably should grew out text instead of removing
+                    # completely
+                    if self.player_disabled(player) or preview:
+                        lines.append(None)
+                        continue
+
+                    i = player.end_pos
+                    result = self.statistic_evaluator.evaluate(
+                        function, player, player, i
+                    )
+                    lines.append(self.statistic_text(function, result))
 
+            if mode is StatisticMode.ONCE:
+                if preview:
+                    lines.append(None)
+                    continue
+                indices = [player.end_pos for player in self.players]
+                result = self.statistic_evaluator.evaluate(
+                    function, None, self.players, indices
+                )
+                lines.append(self.statistic_text(function, result))
+
+            if mode is StatisticMode.VECTORIZED:
+                for player in self.players:
+                    if self.player_disabled(player):
+                        lines.append(None)
+                        continue
+                    result = self.statistic_arrays.get((function, player))
+                    if result is not None and not isinstance(result, Exception):
                         i = player.end_pos
-                        result = function(player, i)
-                        self.painter.drawText(5, y, str(result))
+                        # live players may have more frames than we've
+                        # calculated results for so far
+                        result = result[i] if i < len(result) else None
+                    lines.append(self.statistic_text(function, result))
+
+        self.statistic_evaluator.end_frame()
+        self.statistic_lines = tuple(lines)
+
+    def player_disabled(self, player):
+        # live players have nothing to draw until their first frame arrives
+        return player in self.disabled_players or len(player.t) == 0
+
+    def statistic_text(self, function, result):
+        if result is None:
+            # still calculating in the background
+            text = "..."
+        elif isinstance(result, Exception):
+            text = f"error: {result!r}"
+        else:
+            text = str(result)
 
-                if mode is StatisticMode.ONCE:
-                    y += 13
-                    indices = [player.end_pos for player in self.players]
-                    result = function(self.players, indices)
-                    self.painter.drawText(5, y, str(result))
+        if self.statistic_evaluator.budget.show_timings:
+            timing = self.statistic_evaluator.timing(function)
+            level = ""
+            if timing.level is not StatisticLevel.EVERY_FRAME:
+                level = f", {timing.level.name.lower()}"
+            text += f" ({timing.mean:.2f}ms{level})"
+        return text
 
-    def draw_line(self, alpha, start, end, grey_out=False):
+    def statistic_timings(self):
+        """
+        A dict of each of our statistic functions to a ``StatisticTiming``
+        with rolling information about how long it has taken to run.
+        """
+        return dict(self.statistic_evaluator.timings)
+
+    @traced("trail lods", "background")
+    def update_trail_lods(self):
+        """
+        Starts recalculating each player's simplified paths in the background.
+        Their exact paths are drawn until it's done.
+        """
+        for player in self.players:
+            player.trail_lods = None
+        self.trail_lods_generation += 1
+        self.trail_lod_thread = threading.Thread(
+            target=self.calculate_trail_lods, args=(self.trail_lods_generation,)
+        )
+        self.trail_lod_thread.daemon = True
+        self.trail_lod_thread.start()
+
+    def calculate_trail_lods(self, generation):
+        """
+        Simplifies each player's path to each of ``TRAIL_LOD_TOLERANCES``.
+        Intended to be run in a background thread.
+        """
+        events = np.array(self.events)
+        for player in self.players:
+            # live players' paths are still growing, so any simplification
+            # would be out of date as soon as it was done
+            if player.live_replay is not None:
+                continue
+            # frames where the keys held change, and frames with an event,
+            # are drawn differently from their neighbors, so always keep them
+            k = np.asarray(player.k)
+            keep = np.isin(player.t, events)
+            changes = np.flatnonzero(k[1:] != k[:-1])
+            keep[changes] = True
+            keep[changes + 1] = True
+            # as are snaps, which highlight the lines to both of their
+            # neighbors
+            snaps = np.flatnonzero(player.snap_frames)
+            keep[snaps] = True
+            keep[np.maximum(snaps - 1, 0)] = True
+            keep[np.minimum(snaps + 1, len(keep) - 1)] = True
+
+            trail_lods = []
+            for tolerance in TRAIL_LOD_TOLERANCES:
+                indices = simplify_path(player.xy, tolerance, keep)
+                trail_lods.append((tolerance, indices))
+            # our settings changed while we were calculating, and a newer
+            # thread is calculating lods for them
+            if generation != self.trail_lods_generation:
+                return
+            player.trail_lods = trail_lods
+
+    def trail_tolerance(self):
+        """
+        How far (in osu!pixels) cursor trails may stray from the real path
+        this frame, or ``None`` if every frame must be drawn.
+        """
+        # raw view and frame stepping are for looking at exact frames
+        if self.paused or self.raw_view:
+            return None
+        tolerance = (
+            TRAIL_LOD_SCREEN_TOLERANCE
+            * abs(self.clock.current_speed)
+            * max(1, self.num_frames_on_screen / TRAIL_LOD_LENGTH)
+        )
+        return tolerance / self.scale
+
+    def heatmap_key(self):
+        """
+        Identifies the heatmap for our current settings and enabled players.
+        """
+        players = frozenset(p for p in self.players if p not in self.disabled_players)
+        return (players, self.heatmap_bin_size, self.heatmap_keydowns_only)
+
+    def calculate_heatmap(self, key):
+        """
+        Starts calculating the heatmap for ``key`` in the background, if it
+        isn't already being calculated.
+        """
+        if key in self.heatmaps_calculating:
+            return
+        self.heatmaps_calculating.add(key)
+        self.heatmaps_stale.discard(key)
+
+        def calculate():
+            players, bin_size, keydowns_only = key
+            with self.tracer.span("heatmap", "background"):
+                heatmap = CursorHeatmap(
+                    players,
+                    bin_size,
+                    keydowns_only,
+                    width=GAMEPLAY_WIDTH,
+                    height=GAMEPLAY_HEIGHT,
+                )
+                image = heatmap_image(heatmap.counts)
+            self.heatmap_ready_signal.emit(key, heatmap, image)
+
+        thread = threading.Thread(target=calculate)
+        thread.daemon = True
+        thread.start()
+
+    def heatmap_ready(self, key, heatmap, image):
+        self.heatmaps_calculating.discard(key)
+        self.heatmaps[key] = (heatmap, image)
+        self.heatmaps.move_to_end(key)
+        while len(self.heatmaps) > HEATMAP_CACHE_SIZE:
+            old_key, _ = self.heatmaps.popitem(last=False)
+            self.heatmaps_stale.discard(old_key)
+        self.update()
+
+    @traced("statistic arrays", "background")
+    def calculate_statistic_arrays(self, players=None):
+        """
+        Calculates the results of our ``StatisticMode.VECTORIZED`` functions
+        for each of ``players`` (or each of our players, if ``None``).
+        Intended to be run in a background thread.
+        """
+        players = self.players if players is None else players
+        for function in self.statistic_functions:
+            mode = getattr(function, "__circlevis_statistic_mode", StatisticMode.EACH)
+            if mode is not StatisticMode.VECTORIZED:
+                continue
+            for player in players:
+                try:
+                    result, _ = self.statistic_evaluator.time(function, player)
+                    result = np.asarray(result)
+                    if result.ndim == 0 or len(result) != len(player.t):
+                        raise ValueError(
+                            f"expected {len(player.t)} values (one per frame), "
+                            f"got {result.size}"
+                        )
+                except Exception as e:
+                    result = e
+                self.statistic_arrays[(function, player)] = result
+
+    def calculate_judgments(self, replays):
+        """
+        Starts calculating the judgments of every player which can be judged,
+        in parallel, in a pool of background threads. Each player's judgments
+        are set as they're ready, and ``judgments_ready_signal`` is emitted.
+        """
+        cg = KeylessCircleguard()
+        for player, replay in zip(self.players, replays):
+            # live replays aren't done being played, so they can't be judged
+            if player.live_replay is None and cg.map_available(replay):
+                self.judged_players.append(player)
+        if not self.judged_players:
+            return
+
+        def judge(player, replay):
+            # circleguard's library can only be closed by the thread which
+            # opened it, so each thread needs its own circleguard
+            cg = KeylessCircleguard()
+            with self.tracer.span("judgments", "background"):
+                judgments = cg.judgments(replay, beatmap=self.beatmap)
+                hitobject_judgments = self.align_judgments(judgments)
+            player.judgments = judgments
+            player.hitobject_judgments = hitobject_judgments
+            self.judgments_ready_signal.emit()
+
+        num_workers = min(len(self.judged_players), os.cpu_count() or 1)
+        self.judgment_pool = ThreadPoolExecutor(
+            num_workers, thread_name_prefix="judgments"
+        )
+        for player, replay in zip(self.players, replays):
+            if player in self.judged_players:
+                self.judgment_pool.submit(judge, player, replay)
+
+    def align_judgments(self, judgments):
+        """
+        ``judgments`` as a list with one entry per hitobject, in the same order
+        as ``self.hit_objects``: the judgment of that hitobject, or ``None`` if
+        it wasn't judged (circleguard doesn't judge spinners).
+        """
+        hitobject_judgments = [None] * self.num_hitobjects
+        if not judgments:
+            return hitobject_judgments
+        times = [judgment.hitobject.t for judgment in judgments]
+        indices = closest_hitobjects(times, self.hitobject_times)
+        for judgment, i in zip(judgments, indices.tolist()):
+            hitobject_judgments[i] = judgment
+        return hitobject_judgments
+
+    def stop_judgments(self):
+        """
+        Cancels any judgments which haven't started being calculated yet.
+        """
+        if self.judgment_pool is not None:
+            self.judgment_pool.shutdown(wait=False, cancel_futures=True)
+
+    def judgment_of(self, frame, hitobj, player_frame=None):
+        """
+        The judgment of ``hitobj`` for ``player_frame`` (or the player we tint
+        hitobjects by) as of ``frame``, or ``None`` if there isn't one (yet).
+        """
+        if player_frame is None:
+            player_frame = frame.judgment_player
+            if player_frame is None:
+                return None
+        judgments = player_frame.hitobject_judgments
+        if judgments is None:
+            return None
+        return judgments[self.hitobject_indices[self.get_hit_time(hitobj)]]
+
+    def draw_line(self, frame, alpha, start, end, grey_out=False):
         """
         Draws a line at the given alpha level from the start point to the end
         point.
 
         Arguments:
+            FrameSnapshot frame: The frame to draw the line in.
             Float alpha: The alpha level (from 0.0 to 1.0) to set the line to.
             List start: The X&Y position of the start of the line.
             List end: The X&Y position of the end of the line.
@@ -723,41 +1674,44 @@ class Renderer(QFrame):
         """
         if grey_out:
             prev_pen = self.painter.pen()
-            PEN_GREY_INACTIVE.setWidth(self.scaled_number(WIDTH_LINE_RAW_VIEW))
-            self.painter.setPen(PEN_GREY_INACTIVE)
+            self.painter.setPen(frame.style.line_grey)
 
         self.painter.setOpacity(alpha)
         self.painter.drawLine(
-            self.scaled_point(start[0], start[1]), self.scaled_point(end[0], end[1])
+            frame.scaled_point(start[0], start[1]), frame.scaled_point(end[0], end[1])
         )
 
-        if self.raw_view and grey_out:
+        if frame.raw_view and grey_out:
             self.painter.setPen(prev_pen)
 
-    def draw_cross(self, alpha, point, grey_out, highlight):
+    def draw_cross(self, frame, alpha, point, grey_out, highlight, snap=False):
         """
         Draws a cross.
 
         Args:
+           FrameSnapshot frame: The frame to draw the cross in.
            Float alpha: The alpha level from 0.0-1.0 to set the cross to.
            List point: The X and Y position of the cross.
            Boolean grey_out: Whether to grey out the cross or not.
            Boolean highlight: Whether to highlight the cross or not. This takes
                precedence over ``grey_out`` if both are set.
+           Boolean snap: Whether to highlight the cross as a snap or not. This
+               takes precedence over ``grey_out``, but not ``highlight``.
         """
         # crosses can clutter the screen sometimes, don't draw them if raw view
         # is on
-        if self.raw_view:
+        if frame.raw_view:
             return
         prev_pen = None
         if highlight:
             prev_pen = self.painter.pen()
-            PEN_HIGHLIGHT.setWidth(self.scaled_number(WIDTH_CROSS))
-            self.painter.setPen(PEN_HIGHLIGHT)
+            self.painter.setPen(frame.style.cross_highlight)
+        elif snap:
+            prev_pen = self.painter.pen()
+            self.painter.setPen(frame.style.cross_snap)
         elif grey_out:
             prev_pen = self.painter.pen()
-            PEN_GREY_INACTIVE.setWidth(self.scaled_number(WIDTH_CROSS))
-            self.painter.setPen(PEN_GREY_INACTIVE)
+            self.painter.setPen(frame.style.cross_grey)
         half_width = LENGTH_CROSS / 2
         x = point[0]
         y = point[1]
@@ -766,261 +1720,229 @@ class Renderer(QFrame):
         y1 = y + half_width
         y2 = y - half_width
 
-        self.draw_line(alpha, [x1, y1], [x2, y2])
-        self.draw_line(alpha, [x2, y1], [x1, y2])
-        if grey_out or highlight:
+        self.draw_line(frame, alpha, [x1, y1], [x2, y2])
+        self.draw_line(frame, alpha, [x2, y1], [x1, y2])
+        if prev_pen is not None:
             self.painter.setPen(prev_pen)
 
-    def draw_hitobject(self, hitobj):
+    def draw_hitobject(self, frame, hitobj):
         """
         Calls the corresponding function to draw ``hitobj``.
         """
-        if not self.draw_hitobjects:
+        if not frame.draw_hitobjects:
             return
         if isinstance(hitobj, Circle):
-            self.draw_hitcircle(hitobj)
-            self.draw_approachcircle(hitobj)
+            self.draw_hitcircle(frame, hitobj)
+            self.draw_approachcircle(frame, hitobj)
         if isinstance(hitobj, Slider):
-            self.draw_slider(hitobj)
+            self.draw_slider(frame, hitobj)
         if isinstance(hitobj, Spinner):
-            self.draw_spinner(hitobj)
+            self.draw_spinner(frame, hitobj)
 
-    def draw_hitcircle(self, hitobj):
+    def draw_hitcircle(self, frame, hitobj):
         """
         Draws a circle hitobject.
         """
-        current_time = self.clock.get_time()
-        fade_out = max(
-            0, ((current_time - self.get_hit_time(hitobj)) / self.hitwindow_50)
-        )
-        opacity = min(
-            1,
-            (
-                (current_time - (self.get_hit_time(hitobj) - self.preempt))
-                / self.fade_in
-            ),
-        )
+        stats = frame.beatmap_stats
+        current_time = frame.time
+        hit_time = self.get_hit_time(hitobj)
+        fade_out = max(0, ((current_time - hit_time) / stats.hitwindow_50))
+        opacity = min(1, ((current_time - (hit_time - stats.preempt)) / stats.fade_in))
         opacity = max(0, min(1, opacity - fade_out))
         p = hitobj.position
 
         # the pen width grows outwards and inwards equally (preferring outwards
         # if the width is odd I think), so we need to tell it to start drawing
         # half of the pen's width away from the radius for the final circle to
-        # have radius `self.hitcircle_radius`.
-        r = self.scaled_number(self.hitcircle_radius - WIDTH_CIRCLE_BORDER / 2)
+        # have radius `stats.hitcircle_radius`.
+        r = frame.scaled_number(stats.hitcircle_radius - WIDTH_CIRCLE_BORDER / 2)
 
         # normal white hitobj
-        pen = PEN_WHITE
+        pen = frame.style.hitcircle
         brush = BRUSH_GRAY
 
-        if self.can_access_judgments:
-            judgment = self.hitobj_to_judgments[self.get_hit_time(hitobj)]
-            if judgment.type is JudgmentType.Miss:
-                # hitobj was missed, tint red
-                pen = PEN_RED_TINT
-                brush = BRUSH_GRAY_RED_TINT
+        judgment = self.judgment_of(frame, hitobj)
+        if judgment is not None and judgment.type is JudgmentType.Miss:
+            # hitobj was missed, tint red
+            pen = frame.style.hitcircle_missed
+            brush = BRUSH_GRAY_RED_TINT
 
-        pen.setWidth(self.scaled_number(WIDTH_CIRCLE_BORDER))
         self.painter.setPen(pen)
         self.painter.setOpacity(opacity)
         self.painter.setBrush(brush)
 
-        self.painter.drawEllipse(self.scaled_point(p.x, p.y), r, r)
+        self.painter.drawEllipse(frame.scaled_point(p.x, p.y), r, r)
         self.painter.setBrush(BRUSH_BLANK)
 
-    def draw_spinner(self, hitobj):
+    def draw_spinner(self, frame, hitobj):
         """
         Draws a spinner hitobject.
         """
-        current_time = self.clock.get_time()
-        if self.get_hit_endtime(hitobj) - current_time < 0:
+        stats = frame.beatmap_stats
+        current_time = frame.time
+        hit_time = self.get_hit_time(hitobj)
+        hit_endtime = self.get_hit_endtime(hitobj)
+        if hit_endtime - current_time < 0:
             return
         radius = GAMEPLAY_HEIGHT / 2
-        fade_out = max(
-            0, ((current_time - self.get_hit_endtime(hitobj)) / self.hitwindow_50)
-        )
-        opacity = min(
-            1,
-            (
-                (current_time - (self.get_hit_time(hitobj) - self.preempt))
-                / self.fade_in
-            ),
-        )
+        fade_out = max(0, ((current_time - hit_endtime) / stats.hitwindow_50))
+        opacity = min(1, ((current_time - (hit_time - stats.preempt)) / stats.fade_in))
         opacity = max(0, min(1, opacity - fade_out))
-        scale = min(
-            1,
-            (self.get_hit_endtime(hitobj) - current_time)
-            / (self.get_hit_endtime(hitobj) - self.get_hit_time(hitobj)),
-        )
+        scale = min(1, (hit_endtime - current_time) / (hit_endtime - hit_time))
         radius = radius * scale
 
-        PEN_WHITE.setWidth(self.scaled_number(WIDTH_CIRCLE_BORDER / 2))
-        self.painter.setPen(PEN_WHITE)
+        self.painter.setPen(frame.style.approach_circle)
         self.painter.setOpacity(opacity)
         self.painter.drawEllipse(
-            self.scaled_point(GAMEPLAY_WIDTH / 2, GAMEPLAY_HEIGHT / 2),
-            self.scaled_number(radius),
-            self.scaled_number(radius),
+            frame.scaled_point(GAMEPLAY_WIDTH / 2, GAMEPLAY_HEIGHT / 2),
+            frame.scaled_number(radius),
+            frame.scaled_number(radius),
         )
 
-    def draw_approachcircle(self, hitobj):
+    def draw_approachcircle(self, frame, hitobj):
         """
         Draws the approach circle of a circle hitobject.
         """
-        if not self.draw_approach_circles:
+        if not frame.draw_approach_circles:
             return
-        current_time = self.clock.get_time()
-        if self.get_hit_time(hitobj) - current_time < 0:
+        stats = frame.beatmap_stats
+        current_time = frame.time
+        hit_time = self.get_hit_time(hitobj)
+        if hit_time - current_time < 0:
             return
-        opacity = min(
-            1,
-            (
-                (current_time - (self.get_hit_time(hitobj) - self.preempt))
-                / self.fade_in
-            ),
-        )
+        opacity = min(1, ((current_time - (hit_time - stats.preempt)) / stats.fade_in))
         opacity = max(0, min(1, opacity))
-        scale = max(
-            1, ((self.get_hit_time(hitobj) - current_time) / self.preempt) * 3 + 1
-        )
+        scale = max(1, ((hit_time - current_time) / stats.preempt) * 3 + 1)
         p = hitobj.position
-        r = self.scaled_number(self.hitcircle_radius * scale)
+        r = frame.scaled_number(stats.hitcircle_radius * scale)
 
-        pen = PEN_WHITE
+        pen = frame.style.approach_circle
 
-        if self.can_access_judgments:
-            judgment = self.hitobj_to_judgments[self.get_hit_time(hitobj)]
-            if judgment.type is JudgmentType.Miss:
-                # hitobj was missed, tint red
-                pen = PEN_RED_TINT
+        judgment = self.judgment_of(frame, hitobj)
+        if judgment is not None and judgment.type is JudgmentType.Miss:
+            # hitobj was missed, tint red
+            pen = frame.style.approach_circle_missed
 
-        pen.setWidth(self.scaled_number(WIDTH_CIRCLE_BORDER / 2))
         self.painter.setPen(pen)
         self.painter.setOpacity(opacity)
-        self.painter.drawEllipse(self.scaled_point(p.x, p.y), r, r)
+        self.painter.drawEllipse(frame.scaled_point(p.x, p.y), r, r)
 
-    def draw_slider(self, hitobj):
+    def draw_slider(self, frame, hitobj):
         """
         Draws sliderbody, hitcircle, approachcircle if needed
         """
-        self.draw_sliderbody(hitobj)
-        self.draw_hitcircle(hitobj)
-        self.draw_approachcircle(hitobj)
+        self.draw_sliderbody(frame, hitobj)
+        self.draw_hitcircle(frame, hitobj)
+        self.draw_approachcircle(frame, hitobj)
 
-    def draw_sliderbody(self, hitobj):
+    def draw_sliderbody(self, frame, hitobj):
         """
         Draws the sliderbody of a slider using a QpainterPath.
         """
 
-        current_time = self.clock.get_time()
+        stats = frame.beatmap_stats
+        current_time = frame.time
         fade_out = max(
-            0, ((current_time - self.get_hit_endtime(hitobj)) / self.hitwindow_50)
+            0, ((current_time - self.get_hit_endtime(hitobj)) / stats.hitwindow_50)
         )
         opacity = min(
             1,
             (
-                (current_time - (self.get_hit_time(hitobj) - self.preempt))
-                / self.fade_in
+                (current_time - (self.get_hit_time(hitobj) - stats.preempt))
+                / stats.fade_in
             ),
         )
         opacity = max(0, min(1, opacity - fade_out)) * 0.75
         p = hitobj.position
 
-        PEN_GRAY.setWidth(self.scaled_number(self.hitcircle_radius * 2))
-        PEN_GRAY.setCapStyle(Qt.PenCapStyle.RoundCap)
-        PEN_GRAY.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
-        self.painter.setPen(PEN_GRAY)
+        self.painter.setPen(frame.style.sliderbody)
         self.painter.setOpacity(opacity)
 
         sliderbody = QPainterPath()
-        sliderbody.moveTo(self.scaled_point(p.x, p.y))
+        sliderbody.moveTo(frame.scaled_point(p.x, p.y))
         for i in hitobj.slider_body:
-            sliderbody.lineTo(self.scaled_point(i.x, i.y))
+            sliderbody.lineTo(frame.scaled_point(i.x, i.y))
         self.painter.drawPath(sliderbody)
 
-    def draw_hit_error_bar(self):
+    def draw_hit_error_bar(self, frame, y, player=None):
+        """
+        Draws an (empty) error bar centered vertically on ``y``. If ``player``
+        is passed, marks the bar as theirs with a marker in their color.
+        """
         mid_x = GAMEPLAY_WIDTH / 2
-        y = GAMEPLAY_HEIGHT - ERROR_BAR_HIT_HEIGHT
 
         # draw the center white bar
-        self.painter.setPen(PEN_WHITE)
-        pen = self.painter.pen()
-        pen.setWidth(ERROR_BAR_HIT_WIDTH)
-        self.painter.setPen(pen)
+        self.painter.setPen(frame.style.error_bar_center)
         self.draw_line(
-            1, [mid_x, y - ERROR_BAR_HIT_HEIGHT], [mid_x, y + ERROR_BAR_HIT_HEIGHT]
+            frame,
+            1,
+            [mid_x, y - ERROR_BAR_HIT_HEIGHT],
+            [mid_x, y + ERROR_BAR_HIT_HEIGHT],
         )
 
         # draw the three error zones as slightly transparent
         self.painter.setOpacity(0.65)
         self.painter.setPen(PEN_BLANK)
 
-        hw300 = self.hitwindow_300 * self.error_bar_width_factor
-        hw100 = self.hitwindow_100 * self.error_bar_width_factor
-        hw50 = self.hitwindow_50 * self.error_bar_width_factor
+        stats = frame.beatmap_stats
+        hw300 = stats.hitwindow_300 * stats.error_bar_width_factor
+        hw100 = stats.hitwindow_100 * stats.error_bar_width_factor
+        hw50 = stats.hitwindow_50 * stats.error_bar_width_factor
 
         self.painter.setBrush(BRUSH_BLUE)
-        p1 = self.scaled_point(mid_x - hw300, y - ERROR_BAR_HEIGHT)
-        p2 = self.scaled_point(mid_x + hw300, y + ERROR_BAR_HEIGHT)
+        p1 = frame.scaled_point(mid_x - hw300, y - ERROR_BAR_HEIGHT)
+        p2 = frame.scaled_point(mid_x + hw300, y + ERROR_BAR_HEIGHT)
         self.painter.drawRect(QRectF(p1, p2))
 
         # draw two rects to avoid overlapping with hitwindow_300 in the center
         self.painter.setBrush(BRUSH_GREEN)
-        p1 = self.scaled_point(mid_x - hw100, y - ERROR_BAR_HEIGHT)
-        p2 = self.scaled_point(mid_x - hw300, y + ERROR_BAR_HEIGHT)
+        p1 = frame.scaled_point(mid_x - hw100, y - ERROR_BAR_HEIGHT)
+        p2 = frame.scaled_point(mid_x - hw300, y + ERROR_BAR_HEIGHT)
         self.painter.drawRect(QRectF(p1, p2))
-        p1 = self.scaled_point(mid_x + hw300, y - ERROR_BAR_HEIGHT)
-        p2 = self.scaled_point(mid_x + hw100, y + ERROR_BAR_HEIGHT)
+        p1 = frame.scaled_point(mid_x + hw300, y - ERROR_BAR_HEIGHT)
+        p2 = frame.scaled_point(mid_x + hw100, y + ERROR_BAR_HEIGHT)
         self.painter.drawRect(QRectF(p1, p2))
 
         self.painter.setBrush(BRUSH_YELLOW)
-        p1 = self.scaled_point(mid_x - hw50, y - ERROR_BAR_HEIGHT)
-        p2 = self.scaled_point(mid_x - hw100, y + ERROR_BAR_HEIGHT)
+        p1 = frame.scaled_point(mid_x - hw50, y - ERROR_BAR_HEIGHT)
+        p2 = frame.scaled_point(mid_x - hw100, y + ERROR_BAR_HEIGHT)
         self.painter.drawRect(QRectF(p1, p2))
-        p1 = self.scaled_point(mid_x + hw100, y - ERROR_BAR_HEIGHT)
-        p2 = self.scaled_point(mid_x + hw50, y + ERROR_BAR_HEIGHT)
+        p1 = frame.scaled_point(mid_x + hw100, y - ERROR_BAR_HEIGHT)
+        p2 = frame.scaled_point(mid_x + hw50, y + ERROR_BAR_HEIGHT)
         self.painter.drawRect(QRectF(p1, p2))
 
+        if player is not None:
+            self.painter.setOpacity(1)
+            self.painter.setBrush(frame.style.player_brushes[player])
+            left = mid_x - hw50 - 2 - ERROR_BAR_MARKER_WIDTH
+            p1 = frame.scaled_point(left, y - ERROR_BAR_HEIGHT)
+            p2 = frame.scaled_point(
+                left + ERROR_BAR_MARKER_WIDTH, y + ERROR_BAR_HEIGHT
+            )
+            self.painter.drawRect(QRectF(p1, p2))
+
         self.painter.setBrush(BRUSH_BLANK)
         self.painter.setOpacity(1)
 
-    def draw_hit(self, hitobj, hit):
-        # TODO: avoid duplication in these constants between this and
-        # `draw_hit_error_bar` - maybe just extract to globals?
+    def draw_hit(self, frame, hitobj, hit, y):
         mid_x = GAMEPLAY_WIDTH / 2
-        y = GAMEPLAY_HEIGHT - ERROR_BAR_HIT_HEIGHT
-
-        if hit.type is JudgmentType.Hit300:
-            pen = PEN_BLUE
-        elif hit.type is JudgmentType.Hit100:
-            pen = PEN_GREEN
-        elif hit.type is JudgmentType.Hit50:
-            pen = PEN_YELLOW
-
-        self.painter.setPen(pen)
-        pen = self.painter.pen()
-        pen.setWidth(ERROR_BAR_HIT_WIDTH)
-        self.painter.setPen(pen)
 
-        current_time = self.clock.get_time()
+        self.painter.setPen(frame.style.error_bar_hits[hit.type])
 
         # positive is a late hit, negative is an early hit
-        error = (hit.t - self.get_hit_time(hitobj)) * self.error_bar_width_factor
+        error = hit.t - self.get_hit_time(hitobj)
+        error *= frame.beatmap_stats.error_bar_width_factor
         start = [mid_x + error, y - ERROR_BAR_HIT_HEIGHT]
         end = [mid_x + error, y + ERROR_BAR_HIT_HEIGHT]
 
-        time_passed = current_time - hit.t
-        # how long in ms to display hits for before they disappear
-        time_passed = min(time_passed, ERROR_BAR_HIT_THRESHOLD)
+        time_passed = frame.time - hit.t
         # draw most recent hits as more visible (higher alpha) and old hits
-        # as less visible (lower alpha)
-        x_interp = [0, ERROR_BAR_HIT_THRESHOLD]
-        y_interp = [1, 0]
-        f = interpolate.interp1d(x_interp, y_interp)
-        alpha = f(time_passed)
-        self.draw_line(alpha, start, end)
-
-    def draw_judgment_indicator(self, hitobj, judgment):
+        # as less visible (lower alpha), fading out linearly over
+        # ``ERROR_BAR_HIT_THRESHOLD`` ms
+        alpha = fade_out_alpha(time_passed, ERROR_BAR_HIT_THRESHOLD)
+        self.draw_line(frame, alpha, start, end)
+
+    def draw_judgment_indicator(self, frame, hitobj, judgment):
         if judgment.type is JudgmentType.Hit300:
             # don't draw anything for 300s
             return
@@ -1038,20 +1960,14 @@ class Renderer(QFrame):
         self.painter.setPen(PEN_BLANK)
         self.painter.setBrush(brush)
 
-        current_time = self.clock.get_time()
-
-        time_passed = current_time - judgment_t
-        time_passed = min(time_passed, JUDGMENT_INDICATOR_THRESHOLD)
-        x_interp = [0, JUDGMENT_INDICATOR_THRESHOLD]
-        y_interp = [1, 0]
-        f = interpolate.interp1d(x_interp, y_interp)
-        alpha = f(time_passed)
+        time_passed = frame.time - judgment_t
+        alpha = fade_out_alpha(time_passed, JUDGMENT_INDICATOR_THRESHOLD)
 
         self.painter.setOpacity(alpha)
 
         p = hitobj.position
-        r = self.scaled_number(JUDGMENT_INDICATOR_RADIUS)
-        self.painter.drawEllipse(self.scaled_point(p.x, p.y), r, r)
+        r = frame.scaled_number(JUDGMENT_INDICATOR_RADIUS)
+        self.painter.drawEllipse(frame.scaled_point(p.x, p.y), r, r)
 
     def draw_progressbar(self, percentage):
         loading_bg = QPainterPath()
@@ -1080,9 +1996,11 @@ class Renderer(QFrame):
         x = self.width() / 2 - 75
         y = self.height() / 2 - 10
         self.painter.drawText(int(x), int(y), "Calculating Sliders, please wait...")
-        progress = int((self.sliders_current / self.num_sliders) * 100)
+        sliders_current = self.slider_loader.sliders_current
+        progress = int((sliders_current / self.num_sliders) * 100)
         self.draw_progressbar(progress)
 
+    @traced("sliders", "load")
     def process_sliders(self):
         for i, hitobj in enumerate(self.hit_objects):
             self.sliders_current = i
@@ -1106,39 +2024,204 @@ class Renderer(QFrame):
                 steps = min(steps, 100)
                 hitobj.slider_body = [hitobj.curve(i / steps) for i in range(steps + 1)]
 
+    def update_playback_range(self):
+        """
+        Sets our playback range to span the frames of every player.
+        """
+        players = [player for player in self.players if len(player.t) > 0]
+        # if we only have a beatmap (or no live frames have arrived yet), keep
+        # the range we got from the beatmap
+        if players:
+            self.playback_start = int(min(np.min(p.t) for p in players))
+            self.playback_end = int(max(np.max(p.t) for p in players))
+        # always start at 0, unless our playback_start is negative (meaning we
+        # have negative frames)
+        self.playback_start = min(self.playback_start, 0)
+
+    @traced("player analysis", "load")
+    def update_player_analysis(self, players):
+        """
+        Precomputes everything we look up per frame while drawing for
+        ``players``. Must be called again whenever their frames change.
+        """
+        for player in players:
+            # which hitobject is closest in time to each frame, and how far
+            # the cursor is from it
+            if self.has_beatmap:
+                player.closest_hitobject = closest_hitobjects(
+                    player.t, self.hitobject_times
+                )
+            # the intervals each key was held for, for the key timeline and
+            # the key boxes in our info
+            player.key_presses = KeyPresses(player.t, player.k)
+            # the angles and distances snaps are found from, so finding snaps
+            # for new thresholds doesn't have to recalculate them
+            player.snap_geometry = SnapGeometry(player.t, player.xy)
+        if self.has_beatmap:
+            self.update_hitobject_distances()
+        self.update_snaps(players)
+
+        # when comparing two replays, we show how far apart their cursors are.
+        # Precompute this on a common time grid so we compare positions at the
+        # same time, even if the replays' frames aren't at the same times.
+        if self.num_replays == 2 and all(len(p.t) > 0 for p in self.players):
+            self.cursor_comparison = CursorComparison(self.players)
+
+    def update_snaps(self, players=None):
+        """
+        Finds the snaps of ``players`` (or all of our players) for our current
+        ``snaps_args``, from their precomputed ``SnapGeometry``.
+        """
+        max_angle = self.snaps_args["max_angle"]
+        min_distance = self.snaps_args["min_distance"]
+        only_on_hitobjs = self.snaps_args["only_on_hitobjs"]
+        for player in self.players if players is None else players:
+            geometry = player.snap_geometry
+            # whether each of the player's frames is a snap, for highlighting
+            # their trail
+            player.snap_frames = np.zeros(len(player.t), dtype=bool)
+            # snaps on hitobjects need a beatmap to be found
+            if only_on_hitobjs and not self.has_beatmap:
+                player.snaps = None
+                continue
+            snaps = geometry.snaps(max_angle, min_distance)
+            if only_on_hitobjs:
+                snaps[snaps] = self.on_hitobject(player, geometry.indices[snaps])
+            player.snap_frames[geometry.indices[snaps]] = True
+            player.snaps = [
+                Snap(t, angle, distance)
+                for t, angle, distance in zip(
+                    geometry.times[snaps],
+                    geometry.angles[snaps],
+                    geometry.distances[snaps],
+                )
+            ]
+
+    def on_hitobject(self, player, indices):
+        """
+        Whether each of the frames ``indices`` of ``player`` was on a
+        hitobject, the same way ``circleguard.snaps`` decides it: inside the
+        hitobject closest in time to the frame, within its 50 hitwindow, and
+        not a spinner.
+
+        Uses the cs and od of the player's own mods (like circleguard), instead
+        of whichever mods our hitobjects are currently drawn with.
+        """
+        hitobjects = player.closest_hitobject[indices]
+        hard_rock = Mod.HR in player.mods
+        easy = Mod.EZ in player.mods
+        radius = hitradius(self.beatmap.cs(hard_rock=hard_rock, easy=easy))
+        hitwindow_50 = hitwindows(self.beatmap.od(hard_rock=hard_rock, easy=easy))[0]
+        distances = hitobject_distances(
+            player.xy[indices], hitobjects, self.hitobject_positions, radius
+        )
+        offsets = np.abs(player.t[indices] - self.hitobject_times[hitobjects])
+        return (
+            (distances <= 0)
+            & (offsets < hitwindow_50)
+            & ~self.hitobject_is_spinner[hitobjects]
+        )
+
+    def snaps(self):
+        """
+        The snaps of every player we could find snaps for.
+        """
+        snaps = []
+        for player in self.players:
+            snaps.extend(player.snaps or [])
+        return snaps
+
+    def update_live_players(self):
+        """
+        Takes up any frames which have arrived for our live players since we
+        last checked, at most once every ``LIVE_UPDATE_INTERVAL`` ms.
+        """
+        now = time.perf_counter_ns()
+        if (now - self.last_live_update) / 10**6 < LIVE_UPDATE_INTERVAL:
+            return
+        self.last_live_update = now
+
+        players = [
+            player
+            for player in self.players
+            if player.live_replay is not None and player.update_live_frames()
+        ]
+        if not players:
+            return
+
+        self.update_player_analysis(players)
+        self.update_playback_range()
+        self.update_frame_timeline()
+        # anything calculated in the background from these players' frames is
+        # out of date now. Keep drawing the old results until the new ones
+        # are ready.
+        for player in players:
+            player.trail_lods = None
+        self.heatmaps_stale.update(self.heatmaps)
+        if not self.statistic_thread.is_alive():
+            self.statistic_thread = threading.Thread(
+                target=self.calculate_statistic_arrays, args=(players,)
+            )
+            self.statistic_thread.daemon = True
+            self.statistic_thread.start()
+        self.playback_range_signal.emit(self.playback_start, self.playback_end)
+
+    def waiting_for_live_frames(self):
+        """
+        Whether any of our live players may still receive frames.
+        """
+        return any(
+            player.live_replay is not None and not player.live_replay.finished
+            for player in self.players
+        )
+
+    @traced("frame timeline", "load")
+    def update_frame_timeline(self):
+        """
+        Rebuilds ``frame_timeline`` from the frames of our enabled players. If
+        every player is disabled, steps through the frames of all of them
+        instead.
+        """
+        players = [p for p in self.players if p not in self.disabled_players]
+        players = players or self.players
+        # if we're only visualizing a beatmap and there's no replays, there's
+        # nothing to step through
+        if not players:
+            self.frame_timeline = np.array([])
+        else:
+            self.frame_timeline = np.unique(np.concatenate([p.t for p in players]))
+        self.frame_timeline_index = None
+
     def search_nearest_frame(self, reverse=False):
         """
         Args
             Boolean reverse: whether to search backwards or forwards through
                 time
         """
+        timeline = self.frame_timeline
+        if len(timeline) == 0:
+            return
+        current_time = self.clock.get_time()
+        index = self.frame_timeline_index
+        # if we've played or seeked since we last stepped, find our place in
+        # the timeline again. Otherwise, we're still on the frame we last
+        # stepped to.
+        if index is None or timeline[index] != current_time:
+            # the last frame at or before the current time
+            index = np.searchsorted(timeline, current_time, "right") - 1
+
         if not reverse:
-            next_frames = []
-            for player in self.players:
-                pos = player.end_pos + 1
-                # stay at the end of the replay, avoid index error
-                if pos == len(player.xy):
-                    pos -= 1
-                next_frames.append(player.t[pos])
-            # if we're only visualizing a beatmap and there's no replays, and
-            # someone tries to advance or retreat frames, min() / max() will
-            # crash because next_frames is empty, so avoid this.
-            if not next_frames:
-                return
-            self.seek_to(min(next_frames))
-        else:
-            prev_frames = []
-            for player in self.players:
-                pos = player.end_pos - 1
-                # stay at the beginning of the replay, don't wrap around to end
-                if pos == -1:
-                    pos += 1
-                prev_frames.append(player.t[pos])
-            if not prev_frames:
-                return
-            self.seek_to(max(prev_frames), seeking_backwards=True)
+            index += 1
+        elif index >= 0 and timeline[index] == current_time:
+            index -= 1
+        # stay at the beginning or end of the timeline, don't wrap around
+        index = min(max(index, 0), len(timeline) - 1)
 
-    def seek_to(self, position, seeking_backwards=False):
+        self.frame_timeline_index = index
+        self.seek_to(timeline[index], seeking_backwards=reverse, incremental=True)
+
+    @traced("seek", "frame")
+    def seek_to(self, position, seeking_backwards=False, incremental=False):
         """
         Seeks to position if the change is bigger than ± 10.
         Also calls next_frame() so the correct frame is displayed.
@@ -1147,14 +2230,36 @@ class Renderer(QFrame):
             Integer position: position to seek to in ms
             Boolean seeking_backwards: Whether we're seeking to a time before
                 our current time.
+            Boolean incremental: Whether position is close enough to our
+                current time that players' positions should be walked to
+                instead of searched for. See ``next_frame``.
         """
+        # an explicit seek supersedes any seek requested while scrubbing
+        self.pending_seek = None
         self.clock.time_counter = position
         # if we want to seek somewhere while we're loading sliders, we store
         # that position so we can seek to it when loaded
         if self.is_loading:
             self.seek_to_when_loaded = position
         if self.paused:
-            self.next_frame(stepping_backwards=seeking_backwards)
+            self.next_frame(
+                stepping_backwards=seeking_backwards, incremental=incremental
+            )
+
+    def request_seek(self, position):
+        """
+        Like ``seek_to``, but for the rapid-fire seeks of the user scrubbing
+        through the replay (eg by dragging the time slider or scrolling).
+        Requests are coalesced into at most one seek per frame, always to the
+        latest requested position, and frames are drawn in less detail until
+        scrubbing settles.
+
+        Args:
+            Integer position: position to seek to in ms
+        """
+        self.pending_seek = position
+        self.scrubbing = True
+        self.last_scrub_request = time.perf_counter_ns()
 
     def wheelEvent(self, event):
         # from the qt docs on pixelDelta: "This value is provided on platforms
@@ -1173,7 +2278,12 @@ class Renderer(QFrame):
         else:
             delta = max(event.angleDelta().x(), event.angleDelta().y(), key=abs)
 
-        self.seek_to(self.clock.time_counter + delta)
+        # build on any seek we haven't applied yet, so scrolling quickly
+        # doesn't drop deltas
+        position = self.pending_seek
+        if position is None:
+            position = self.clock.time_counter
+        self.request_seek(position + delta)
 
     def mouseMoveEvent(self, event):
         any_inside = False
@@ -1196,6 +2306,8 @@ class Renderer(QFrame):
                     self.disabled_players.remove(player)
                 else:
                     self.disabled_players.append(player)
+                self.update_frame_timeline()
+                self.update_statistic_lines()
                 self.update()
         return super().mousePressEvent(event)
 
@@ -1229,17 +2341,19 @@ class Renderer(QFrame):
     def toggle_frametime(self):
         self.paint_frametime = not self.paint_frametime
 
-    def distance_between(self, point, hitobject):
+    def update_hitobject_distances(self):
         """
-        The shortest distance between the given point and hitobject.
+        Calculates the distance from each frame of each player to the edge of
+        the hitobject closest in time to that frame. Must be recalculated
+        whenever our hitcircle radius changes.
         """
-        # TODO use numpy for these calculations
-        x1 = point[0]
-        y1 = point[1]
-        x2 = hitobject.position.x
-        y2 = hitobject.position.y
-        r = self.hitcircle_radius
-        return math.sqrt((((x2 - x1) ** 2) + (y2 - y1) ** 2)) - r
+        for player in self.players:
+            player.closest_hitobject_distance = hitobject_distances(
+                player.xy,
+                player.closest_hitobject,
+                self.hitobject_positions,
+                self.beatmap_stats.hitcircle_radius,
+            )
 
     def calculate_beatmap_stats(self, use_hr, use_ez):
         ar = self.beatmap.ar(hard_rock=use_hr, easy=use_ez)
@@ -1248,25 +2362,29 @@ class Renderer(QFrame):
 
         # see https://osu.ppy.sh/help/wiki/Beatmapping/Approach_rate
         if ar <= 5:
-            self.preempt = 1200 + 600 * (5 - ar) / 5
-            self.fade_in = 800 + 400 * (5 - ar) / 5
+            preempt = 1200 + 600 * (5 - ar) / 5
+            fade_in = 800 + 400 * (5 - ar) / 5
         else:
-            self.preempt = 1200 - 750 * (ar - 5) / 5
-            self.fade_in = 800 - 500 * (ar - 5) / 5
+            preempt = 1200 - 750 * (ar - 5) / 5
+            fade_in = 800 - 500 * (ar - 5) / 5
 
         (hitwindow_50, hitwindow_100, hitwindow_300) = hitwindows(od)
-        self.hitwindow_50 = hitwindow_50
-        self.hitwindow_100 = hitwindow_100
-        self.hitwindow_300 = hitwindow_300
-
-        # how much to scale our error bar by from its 'standard' size, where
-        # each ms of error is a pixel.
-        self.error_bar_width_factor = ERROR_BAR_WIDTH / (hitwindow_50 * 2)
-
-        self.hitcircle_radius = hitradius(cs)
+        self.beatmap_stats = BeatmapStats(
+            preempt=preempt,
+            fade_in=fade_in,
+            hitwindow_50=hitwindow_50,
+            hitwindow_100=hitwindow_100,
+            hitwindow_300=hitwindow_300,
+            # how much to scale our error bar by from its 'standard' size,
+            # where each ms of error is a pixel.
+            error_bar_width_factor=ERROR_BAR_WIDTH / (hitwindow_50 * 2),
+            hitcircle_radius=hitradius(cs),
+        )
 
     def raw_view_changed(self, new_state):
         self.raw_view = new_state
+        # our cursor lines are thicker in raw view
+        self.update_render_style()
         # redraw everything for the new raw view
         self.update()
 
@@ -1290,6 +2408,33 @@ class Renderer(QFrame):
         self.should_draw_hit_error_bar = new_value
         self.update()
 
+    def key_timeline_changed(self, new_value):
+        self.draw_key_timeline = new_value
+        self.update()
+
+    def full_path_changed(self, new_value):
+        self.full_path = new_value
+        if not new_value:
+            # free the canvas and its checkpoints
+            self.path_canvas = PathCanvas()
+        self.update()
+
+    def heatmap_changed(self, new_value):
+        self.heatmap_mode = new_value
+        self.update()
+
+    def heatmap_keydowns_only_changed(self, new_value):
+        self.heatmap_keydowns_only = new_value
+        self.update()
+
+    def heatmap_bin_size_changed(self, new_value):
+        # applied in ``next_frame_from_timer`` once it settles
+        self.pending_heatmap_bin_size = new_value
+        self.last_heatmap_bin_size_request = time.perf_counter_ns()
+
+    def follow_live_changed(self, new_value):
+        self.follow_live = new_value
+
     def circle_size_mod_changed(self, new_value):
         if not self.has_beatmap:
             # cs doesn't matter to us if we don't have a beatmap (and we don't
@@ -1298,8 +2443,343 @@ class Renderer(QFrame):
         use_hr = new_value == "HR"
         use_ez = new_value == "EZ"
         self.calculate_beatmap_stats(use_hr, use_ez)
+        # our sliderbodies are as wide as our hitcircles, and our distances to
+        # hitobjects are measured from their edges
+        self.update_render_style()
+        self.update_hitobject_distances()
         self.update()
 
+    def judgment_player_changed(self, index):
+        self.judgment_player = index
+        self.update()
+
+    def snaps_args_changed(self, snaps_args):
+        self.snaps_args.update(snaps_args)
+        self.update_snaps()
+        # our simplified paths have to keep the new snaps
+        self.update_trail_lods()
+        self.update()
+
+
+class RenderStyle:
+    """
+    The pens and brushes a ``Renderer`` draws with, preconfigured for a
+    particular scale and set of settings.
+
+    A ``RenderStyle`` is never modified after it is created. Renderers build a
+    new one whenever their scale or a relevant setting changes, so multiple
+    renderers can draw at different sizes without fighting over shared pens.
+    """
+
+    def __init__(self, scale, raw_view, hitcircle_radius, players):
+        def pen(template, width):
+            pen = QPen(template)
+            pen.setWidth(width)
+            return pen
+
+        def scaled(n):
+            return int(n * scale)
+
+        line_width = scaled(WIDTH_LINE_RAW_VIEW if raw_view else WIDTH_LINE)
+
+        self.border = pen(PEN_WHITE, scaled(1))
+        self.info_text = pen(PEN_WHITE, 1)
+
+        self.line_highlight = pen(PEN_HIGHLIGHT, line_width)
+        self.line_grey = pen(PEN_GREY_INACTIVE, scaled(WIDTH_LINE_RAW_VIEW))
+        self.cross_highlight = pen(PEN_HIGHLIGHT, scaled(WIDTH_CROSS))
+        self.line_snap = pen(PEN_SNAP, line_width)
+        self.cross_snap = pen(PEN_SNAP, scaled(WIDTH_CROSS))
+        self.cross_grey = pen(PEN_GREY_INACTIVE, scaled(WIDTH_CROSS))
+
+        self.hitcircle = pen(PEN_WHITE, scaled(WIDTH_CIRCLE_BORDER))
+        self.hitcircle_missed = pen(PEN_RED_TINT, scaled(WIDTH_CIRCLE_BORDER))
+        # also used for spinners
+        self.approach_circle = pen(PEN_WHITE, scaled(WIDTH_CIRCLE_BORDER / 2))
+        self.approach_circle_missed = pen(
+            PEN_RED_TINT, scaled(WIDTH_CIRCLE_BORDER / 2)
+        )
+        self.sliderbody = pen(PEN_GRAY, scaled(hitcircle_radius * 2))
+        self.sliderbody.setCapStyle(Qt.PenCapStyle.RoundCap)
+        self.sliderbody.setJoinStyle(Qt.PenJoinStyle.RoundJoin)
+
+        self.error_bar_center = pen(PEN_WHITE, ERROR_BAR_HIT_WIDTH)
+        self.error_bar_hits = {
+            JudgmentType.Hit300: pen(PEN_BLUE, ERROR_BAR_HIT_WIDTH),
+            JudgmentType.Hit100: pen(PEN_GREEN, ERROR_BAR_HIT_WIDTH),
+            JudgmentType.Hit50: pen(PEN_YELLOW, ERROR_BAR_HIT_WIDTH),
+        }
+
+        self.player_line_pens = {}
+        self.player_cross_pens = {}
+        self.player_brushes = {}
+        for player in players:
+            self.player_line_pens[player] = pen(player.pen, line_width)
+            self.player_cross_pens[player] = pen(player.pen, scaled(WIDTH_CROSS))
+            self.player_brushes[player] = QBrush(player.pen.color())
+
+
+class PathCanvas:
+    """
+    The entire path of each player up to the current time, drawn onto a
+    persistent image.
+
+    Each frame, only the segments which are new since the previous frame are
+    drawn onto the image. Seeking backwards restores the latest checkpoint
+    (a copy of the image saved every ``FULL_PATH_CHECKPOINT_INTERVAL`` ms)
+    before the new time and draws forward from there. Anything which changes
+    where or how paths are drawn (resizing, a new ``RenderStyle``, or
+    disabling a player) starts the canvas over.
+    """
+
+    def __init__(self):
+        self.image = None
+        # identifies the geometry and style the image was drawn with
+        self.key = None
+        # maps each player to the index of the last frame of theirs we've
+        # drawn up to
+        self.drawn_to = {}
+        # maps ``n`` to the ``(drawn_to, image)`` saved once we had drawn up
+        # to ``n * FULL_PATH_CHECKPOINT_INTERVAL`` ms
+        self.checkpoints = {}
+
+    def reset(self, width, height):
+        self.image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+        self.image.fill(Qt.GlobalColor.transparent)
+        self.drawn_to = {}
+        self.checkpoints = {}
+
+    def restore(self, frame):
+        """
+        Restores the latest checkpoint which doesn't go past any player's
+        position in ``frame``, or starts from scratch if there is none.
+        """
+        ends = {pf.player: pf.end_pos for pf in frame.players}
+        for n in sorted(self.checkpoints, reverse=True):
+            drawn_to, image = self.checkpoints[n]
+            if all(drawn_to[player] <= ends[player] for player in drawn_to):
+                self.drawn_to = dict(drawn_to)
+                self.image = image.copy()
+                return
+        self.image.fill(Qt.GlobalColor.transparent)
+        self.drawn_to = {}
+
+    def update(self, frame, width, height):
+        """
+        Brings the image up to date with ``frame``.
+        """
+        disabled = frozenset(pf.player for pf in frame.players if pf.disabled)
+        key = (width, height, frame.style, frame.x_offset, frame.y_offset, disabled)
+        if key != self.key:
+            self.key = key
+            self.reset(width, height)
+
+        if any(
+            pf.end_pos < self.drawn_to.get(pf.player, 0) for pf in frame.players
+        ):
+            self.restore(frame)
+
+        painter = QPainter(self.image)
+        # without antialiasing, drawing over a pixel twice gives the same
+        # result as drawing it once, so the path looks the same no matter how
+        # it was split up between frames (or restored from a checkpoint)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        for player_frame in frame.players:
+            if player_frame.disabled:
+                continue
+            player = player_frame.player
+            start = self.drawn_to.get(player, 0)
+            end = player_frame.end_pos
+            if end <= start:
+                continue
+            points = [
+                frame.scaled_point(x, y) for x, y in player_frame.xy[start : end + 1]
+            ]
+            painter.setPen(frame.style.player_line_pens[player])
+            painter.drawPolyline(QPolygonF(points))
+            self.drawn_to[player] = end
+        painter.end()
+
+        n = int(frame.time // FULL_PATH_CHECKPOINT_INTERVAL)
+        if n > 0 and n not in self.checkpoints:
+            self.checkpoints[n] = (dict(self.drawn_to), self.image.copy())
+
+
+class RenderWorker:
+    """
+    Draws a renderer's frames on a background thread, so that drawing a heavy
+    frame doesn't block the gui thread.
+
+    The gui thread sends the worker a ``FrameSnapshot`` of each frame to draw
+    with ``request``. The worker draws the latest one it was sent (any it
+    didn't get to in time are skipped) into the back of two images, swaps the
+    back and front images, and emits the renderer's
+    ``frame_rendered_signal``. All the gui thread then has to do is paint the
+    front image, which takes the same time no matter how much is in the frame.
+    """
+
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.condition = threading.Condition()
+        # the latest ``(frame, device_pixel_ratio)`` requested which we
+        # haven't started drawing yet. Only the latest request matters.
+        self.pending = None
+        self.stopped = False
+        # the image we draw into, and the latest image we finished drawing
+        self.back_image = None
+        self.front_image = None
+        self.thread = threading.Thread(target=self.run)
+        # allow users to quit while we're drawing a frame
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def request(self, frame, device_pixel_ratio):
+        """
+        Asks for ``frame`` to be drawn, in place of any frame which was
+        requested but hasn't been drawn yet.
+        """
+        with self.condition:
+            self.pending = (frame, device_pixel_ratio)
+            self.condition.notify()
+
+    def latest_image(self):
+        """
+        The latest frame we finished drawing, or ``None`` if we haven't
+        finished one yet.
+        """
+        with self.condition:
+            if self.front_image is None:
+                return None
+            # a shallow copy, which shares the image's pixels until one of
+            # them is written to. If we start drawing into this image again
+            # while the gui thread is still painting it, our painter detaches
+            # from this copy instead of drawing over it.
+            return QImage(self.front_image)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                frame, device_pixel_ratio = self.pending
+                self.pending = None
+            try:
+                drawn = self.draw(frame, device_pixel_ratio)
+            except Exception:
+                # keep the last good frame on screen and carry on with the
+                # next one, instead of dying and freezing the view
+                log.exception("error drawing the frame at %sms", frame.time)
+                continue
+            if not drawn:
+                continue
+            with self.condition:
+                self.back_image, self.front_image = self.front_image, self.back_image
+            self.renderer.frame_rendered_signal.emit()
+
+    def draw(self, frame, device_pixel_ratio):
+        """
+        Draws ``frame`` into our back image. Returns whether there was anything
+        to draw.
+        """
+        width = int(frame.width * device_pixel_ratio)
+        height = int(frame.height * device_pixel_ratio)
+        # we haven't been laid out yet
+        if width == 0 or height == 0:
+            return False
+        image = self.back_image
+        if (
+            image is None
+            or image.width() != width
+            or image.height() != height
+            or image.devicePixelRatio() != device_pixel_ratio
+        ):
+            image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+            image.setDevicePixelRatio(device_pixel_ratio)
+            self.back_image = image
+        # the widget's black background, which we paint over entirely
+        image.fill(Qt.GlobalColor.black)
+
+        renderer = self.renderer
+        with renderer.tracer.span("render", "paint"):
+            renderer.painter.begin(image)
+            try:
+                renderer.paint_frame(frame)
+            finally:
+                # a painter left active would make every later ``begin`` fail
+                renderer.painter.end()
+        return True
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+
+
+def heatmap_image(counts):
+    """
+    Colors a 2d array of counts with ``HEATMAP_COLORS``, one pixel per cell.
+    Colors are scaled logarithmically, so a few very full cells don't wash out
+    everything else.
+    """
+    counts = np.asarray(counts)
+    intensity = np.log1p(counts)
+    max_intensity = intensity.max(initial=0)
+    if max_intensity > 0:
+        intensity /= max_intensity
+
+    stops = np.linspace(0, 1, len(HEATMAP_COLORS))
+    channels = []
+    for channel in ["alpha", "red", "green", "blue"]:
+        values = [getattr(color, channel)() for color in HEATMAP_COLORS]
+        channels.append(np.interp(intensity, stops, values))
+    a, r, g, b = (np.round(channel).astype(np.uint32) for channel in channels)
+    pixels = np.ascontiguousarray((a << 24) | (r << 16) | (g << 8) | b)
+
+    rows, columns = counts.shape
+    image = QImage(
+        pixels.data, columns, rows, columns * 4, QImage.Format.Format_ARGB32
+    )
+    # ``image`` doesn't own ``pixels``' memory, so copy it before ``pixels``
+    # goes away
+    return image.copy()
+
+
+def trail_indices(trail_lods, start_pos, end_pos, tolerance):
+    """
+    The indices of the frames to draw in a trail from ``start_pos`` to
+    ``end_pos`` (inclusive). Every frame, unless ``tolerance`` allows drawing
+    one of a player's simplified paths (``trail_lods``) instead.
+    """
+    exact = range(start_pos, end_pos + 1)
+    if tolerance is None or trail_lods is None or end_pos <= start_pos:
+        return exact
+    # the most simplified path within our tolerance
+    indices = None
+    for lod_tolerance, lod_indices in trail_lods:
+        if lod_tolerance > tolerance:
+            break
+        indices = lod_indices
+    if indices is None:
+        return exact
+    start = np.searchsorted(indices, start_pos, "right")
+    end = np.searchsorted(indices, end_pos, "left")
+    # always start and end at the exact frames, so the trail ends where the
+    # cursor actually is
+    return [start_pos, *indices[start:end], end_pos]
+
+
+def fade_out_alpha(time_passed, duration):
+    """
+    The alpha of something which started fully opaque and fades out linearly
+    to fully transparent over ``duration`` ms, ``time_passed`` ms after it
+    started fading.
+    """
+    return max(0, min(1, 1 - time_passed / duration))
+
 
 # not sure why dataclass won't generate a hash method for us automatically,
 # we're not using anything mutable, just ints
@@ -1317,3 +2797,117 @@ class Rect:
 
     def toQRect(self):
         return QRect(self.x, self.y, self.width, self.height)
+
+
+@dataclass(frozen=True)
+class BeatmapStats:
+    """
+    Timings and sizes derived from a beatmap's ar, od, and cs, for whichever
+    mods its hitobjects are currently drawn with.
+    """
+
+    # in ms
+    preempt: float
+    fade_in: float
+    hitwindow_50: float
+    hitwindow_100: float
+    hitwindow_300: float
+    # how much to scale our error bar by from its 'standard' size, where each
+    # ms of error is a pixel
+    error_bar_width_factor: float
+    # in osu!pixels
+    hitcircle_radius: float
+
+
+@dataclass(frozen=True)
+class PlayerFrame:
+    """
+    A player, which of their frames are visible in a ``FrameSnapshot``, and
+    the frames and analysis of theirs the snapshot is drawn from.
+    """
+
+    player: Player
+    start_pos: int
+    end_pos: int
+    disabled: bool
+    t: np.ndarray
+    xy: np.ndarray
+    k: np.ndarray
+    keydowns: np.ndarray
+    snap_frames: np.ndarray
+    trail_lods: list
+    key_presses: KeyPresses
+    hitobject_judgments: list
+
+
+@dataclass(frozen=True)
+class FrameSnapshot:
+    """
+    The state needed to draw a single frame, captured once per frame in
+    ``Renderer.snapshot``. Every draw call in a frame reads from the same
+    snapshot instead of the (constantly advancing) clock and the renderer's
+    attributes, so everything in the frame is drawn at the same instant, and
+    the frame can be drawn on another thread while the renderer changes.
+    """
+
+    time: float
+    # whether this frame is a quick preview drawn while scrubbing, which
+    # leaves out expensive details
+    preview: bool
+    # how far (in osu!pixels) cursor trails may stray from the real path, or
+    # ``None`` to draw every frame. See ``Renderer.trail_tolerance``.
+    trail_tolerance: float
+    style: "RenderStyle"
+    # the size of the widget the frame is drawn for
+    width: int
+    height: int
+    scale: float
+    x_offset: float
+    y_offset: float
+    players: tuple
+    hitobjs_to_draw: tuple
+    hitobjs_to_draw_hits_for: tuple
+    hitobjs_to_draw_judgment_indicators_for: tuple
+    # ``None`` if we don't have a beatmap
+    beatmap_stats: BeatmapStats
+    # the ``PlayerFrame``s of the players whose error bars we draw, in order,
+    # and of the player whose judgments we tint hitobjects by
+    judged_players: tuple
+    judgment_player: PlayerFrame
+
+    # our settings
+    raw_view: bool
+    only_color_keydowns: bool
+    num_frames_on_screen: int
+    events: frozenset
+    draw_hitobjects: bool
+    draw_approach_circles: bool
+    draw_hit_error_bar: bool
+    draw_judgment_indicators: bool
+    draw_key_timeline: bool
+    paint_frametime: bool
+    # ``(image, width, height)`` of the heatmap to draw, or ``None``. See
+    # ``Renderer.heatmap_snapshot``.
+    heatmap: tuple
+    # the canvas to draw full paths onto, or ``None`` if they're off. Only
+    # ever drawn onto by whichever thread paints our frames.
+    path_canvas: "PathCanvas"
+
+    # our info, see ``Renderer.paint_info``
+    paint_info: bool
+    text_cache: TextCache
+    player_info_labels: dict
+    # how far apart the cursors of our two players are, if we have two
+    cursor_distance: float
+    # how far our only player is from the closest hitobject, if we have one
+    hitobject_distance: float
+    statistic_lines: tuple
+
+    def scaled_number(self, n):
+        return int(n * self.scale)
+
+    def scaled_point(self, x, y):
+        return QPointF(
+            self.x_offset + GAMEPLAY_PADDING_WIDTH + int(x * self.scale),
+            self.y_offset + GAMEPLAY_PADDING_HEIGHT + int(y * self.scale),
+        )
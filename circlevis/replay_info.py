@@ -37,11 +37,15 @@ class ReplayInfo(QFrame):
         snaps=None,
         judgments=None,
         snaps_args={},
+        similar_windows=None,
     ):
         """
         If passed, the `ur`, `frametime`, `snaps`, and
         `hits` parameters will be used instead of recalculating them from
         scratch.
+
+        `similar_windows` are the `circlevis.SimilarWindow`s to list in the
+        events table, if this replay is being compared against another.
         """
         super().__init__()
         self.replay = replay
@@ -120,6 +124,9 @@ class ReplayInfo(QFrame):
         self.table_filters_popup.hit_50_filter_signal.connect(
             partial(self.toggle_filter_item, Hit50Event)
         )
+        self.table_filters_popup.similar_windows_filter_signal.connect(
+            partial(self.toggle_filter_item, SimilarWindowEvent)
+        )
 
         self.events_filter_button = PushButton("Filter Events")
         self.events_filter_button.clicked.connect(self.show_filters)
@@ -130,10 +137,13 @@ class ReplayInfo(QFrame):
             MissEvent,
             Hit100Event,
             Hit50Event,
+            SimilarWindowEvent,
         ]
 
         self.events = []
-        snaps = snaps or circleguard.snaps(replay, **snaps_args)
+        # an empty list of snaps is a valid result, not a missing one
+        if snaps is None:
+            snaps = circleguard.snaps(replay, **snaps_args)
         snap_events = [SnapEvent(snap) for snap in snaps]
 
         edge_hits = []
@@ -158,6 +168,9 @@ class ReplayInfo(QFrame):
         self.events.extend(misses)
         self.events.extend(hit100s)
         self.events.extend(hit50s)
+        self.events.extend(
+            SimilarWindowEvent(window) for window in similar_windows or []
+        )
 
         self.events_table = EventsTable(self.events)
         self.events_table.jump_button_clicked.connect(self.seek_to)
@@ -229,6 +242,26 @@ class ReplayInfo(QFrame):
         filtered_events = [e for e in self.events if type(e) in self.active_filters]
         self.events_table.set_events(filtered_events)
 
+    def set_snaps(self, snaps):
+        """
+        Replaces the snaps in the events table with ``snaps``, eg after the
+        snap thresholds were changed.
+        """
+        # snaps are listed first, same as when we were created
+        other_events = [e for e in self.events if not isinstance(e, SnapEvent)]
+        self.events = [SnapEvent(snap) for snap in snaps] + other_events
+        filtered_events = [e for e in self.events if type(e) in self.active_filters]
+        self.events_table.set_events(filtered_events)
+
+    def add_similar_windows(self, similar_windows):
+        """
+        Lists `similar_windows` in the events table, for windows which were
+        found after we were created.
+        """
+        self.events.extend(SimilarWindowEvent(window) for window in similar_windows)
+        filtered_events = [e for e in self.events if type(e) in self.active_filters]
+        self.events_table.set_events(filtered_events)
+
     def __eq__(self, other):
         if not isinstance(other, ReplayInfo):
             return False
@@ -266,6 +299,14 @@ class Hit50Event(Event):
         super().__init__("50", judgment.time)
 
 
+class SimilarWindowEvent(Event):
+    def __init__(self, window):
+        # windows where the cursors were only this similar with one of them
+        # flipped vertically, as if hard rock was added or removed
+        label = "similar HR" if window.flipped else "similar"
+        super().__init__(label, int(window.start))
+
+
 class EventsTable(QTableWidget):
     jump_button_clicked = pyqtSignal(int)  # time (ms)
 
@@ -295,7 +336,8 @@ class EventsTable(QTableWidget):
         self.setColumnWidth(2, 90)
 
     def set_events(self, events):
-        self.clear()
+        # leave our header labels alone
+        self.clearContents()
 
         self.setRowCount(len(events))
 
@@ -336,6 +378,7 @@ class EventsTableFilters(QFrame):
     misses_filter_signal = pyqtSignal(bool)
     hit_100_filter_signal = pyqtSignal(bool)
     hit_50_filter_signal = pyqtSignal(bool)
+    similar_windows_filter_signal = pyqtSignal(bool)
 
     def __init__(self, parent):
         super().__init__(parent)
@@ -343,7 +386,7 @@ class EventsTableFilters(QFrame):
         self.setWindowFlags(Qt.WindowType.Popup)
 
         self.setMaximumWidth(300)
-        self.setMaximumHeight(100)
+        self.setMaximumHeight(120)
 
         edge_hit_cb = CheckboxSetting("Edge hits:", True)
         edge_hit_cb.state_changed.connect(self.edge_hit_filter_signal)
@@ -360,10 +403,14 @@ class EventsTableFilters(QFrame):
         hit_50_cb = CheckboxSetting("50s:", True)
         hit_50_cb.state_changed.connect(self.hit_50_filter_signal)
 
+        similar_windows_cb = CheckboxSetting("Similar windows:", True)
+        similar_windows_cb.state_changed.connect(self.similar_windows_filter_signal)
+
         layout = QVBoxLayout()
         layout.addWidget(edge_hit_cb)
         layout.addWidget(snaps_cb)
         layout.addWidget(misses_cb)
         layout.addWidget(hit_100_cb)
         layout.addWidget(hit_50_cb)
+        layout.addWidget(similar_windows_cb)
         self.setLayout(layout)
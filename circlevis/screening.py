@@ -0,0 +1,232 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+# how many replays to keep screening ahead of the review queue, per worker,
+# when survivors are streamed in order
+LOOKAHEAD_PER_WORKER = 2
+
+
+@dataclass
+class ScreeningReport:
+    """
+    How pre-screening a ``Classifier``'s replays went.
+
+    ``elapsed`` only counts the time the pool had replays to screen, not time
+    spent waiting for a replay to be reviewed before screening further ahead,
+    so ``throughput`` is how fast the pool actually screens replays.
+    """
+
+    # replays which were screened
+    screened: int = 0
+    # screened replays which the skip function decided to skip
+    skipped: int = 0
+    # replays which failed to load, and so were never screened
+    failed: int = 0
+    # replays whose skip or score function raised, and so were skipped
+    errored: int = 0
+    # seconds the pool spent with replays to screen
+    elapsed: float = 0
+    # seconds spent in the screening functions, summed over every worker
+    screening_time: float = 0
+
+    @property
+    def throughput(self):
+        """
+        Replays screened per second.
+        """
+        if self.elapsed == 0:
+            return 0
+        return self.screened / self.elapsed
+
+    def __str__(self):
+        s = (
+            f"screened {self.screened} replays in {self.elapsed:.2f}s "
+            f"({self.throughput:.1f} replays/s), skipped {self.skipped}"
+        )
+        if self.failed:
+            s += f", {self.failed} failed to load"
+        if self.errored:
+            s += f", {self.errored} errored while screening"
+        return s
+
+
+def screen_replay(skip_function, score_function, frames, mods):
+    """
+    Runs in a worker process. Returns whether the replay with ``frames`` and
+    ``mods`` should be skipped, its score (``None`` if it's skipped or there's
+    no ``score_function``), and how many seconds screening it took.
+    """
+    start = time.perf_counter()
+    skip = skip_function is not None and bool(skip_function(frames, mods))
+    score = None
+    if not skip and score_function is not None:
+        score = score_function(frames, mods)
+    return skip, score, time.perf_counter() - start
+
+
+class Screener:
+    """
+    Screens a queue of replays in a process pool, and iterates over the ones
+    which survive screening.
+
+    Replays are loaded with ``load`` in this process (loaders and their caches
+    can't be shared with other processes), and their frames are written to
+    ``frame_store``. Workers are only sent the ``ReplayFrames`` and mods of
+    each replay, which pickle to a few bytes no matter how long the replay is,
+    instead of the replay itself (which doesn't pickle). ``skip_function`` and
+    ``score_function`` are called with those, and are pickled to the workers
+    too, so both have to be defined at the top level of a module, not lambdas
+    or closures. If either raises for a replay, the error is logged and that
+    replay is skipped.
+
+    Without a ``score_function``, survivors are streamed in queue order, and
+    only a few replays per worker are screened ahead of the one being
+    iterated, so reviewing can start as soon as the first survivor is screened
+    and replays aren't loaded long before they're needed. With a
+    ``score_function``, the whole queue has to be screened before the highest
+    scoring survivor is known, so the first iteration waits for all of it.
+
+    Parameters
+    ----------
+    replays: iterable of circleguard.Replay
+        The replays to screen.
+    load: Callable[[circleguard.Replay], bool]
+        Loads a replay, returning whether the load succeeded. Replays which
+        fail to load aren't screened, and are skipped.
+    frame_store: FrameStore
+        The store to write the frames of each replay to, for the workers to
+        read.
+    skip_function: Callable[[ReplayFrames, circleguard.ModCombination], bool]
+        Whether a replay should be skipped. Optional.
+    score_function: Callable[[ReplayFrames, circleguard.ModCombination], float]
+        A score for each replay which isn't skipped. Survivors are iterated
+        over in order of highest score first. Optional.
+    max_workers: int or None
+        How many worker processes to screen with. Defaults to the number of
+        cpus.
+    """
+
+    def __init__(
+        self,
+        replays,
+        load,
+        frame_store,
+        skip_function=None,
+        score_function=None,
+        max_workers=None,
+    ):
+        self.replays = replays
+        self.load = load
+        self.frame_store = frame_store
+        self.skip_function = skip_function
+        self.score_function = score_function
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.report = ScreeningReport()
+        # created when the first replay is submitted
+        self.pool = None
+
+        # the number of replays submitted to the pool which haven't finished
+        # screening yet, and when the pool last went from having nothing to
+        # screen to having something to screen. Updated from the pool's
+        # management thread as replays finish, hence the lock.
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._busy_since = None
+
+    def _submit(self, replay):
+        if self.pool is None:
+            # spawn instead of fork, so workers don't inherit qt's state (and
+            # threads) from this process, and behave the same on every os
+            self.pool = ProcessPoolExecutor(
+                self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        # the same frames a visualizer of this replay reads, so showing it
+        # later doesn't have to store them again
+        frames = self.frame_store.add(replay)
+        with self._lock:
+            if self._in_flight == 0:
+                self._busy_since = time.perf_counter()
+            self._in_flight += 1
+        future = self.pool.submit(
+            screen_replay, self.skip_function, self.score_function, frames, replay.mods
+        )
+        future.add_done_callback(self._screened)
+        return future
+
+    def _screened(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self.report.elapsed += time.perf_counter() - self._busy_since
+
+    def __iter__(self):
+        rank = self.score_function is not None
+        lookahead = float("inf") if rank else self.max_workers * LOOKAHEAD_PER_WORKER
+        replays = iter(self.replays)
+        # ``(replay, future)`` for each replay being screened, in queue order
+        pending = deque()
+        # ``(score, replay)`` for each survivor, if we're ranking them
+        survivors = []
+        exhausted = False
+
+        try:
+            while True:
+                while not exhausted and len(pending) < lookahead:
+                    try:
+                        replay = next(replays)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if not self.load(replay):
+                        self.report.failed += 1
+                        continue
+                    pending.append((replay, self._submit(replay)))
+
+                if not pending:
+                    break
+                replay, future = pending.popleft()
+                try:
+                    skip, score, seconds = future.result()
+                except Exception:
+                    # one bad replay shouldn't end the review of the rest
+                    log.exception("error screening %r, skipping it", replay)
+                    self.report.errored += 1
+                    continue
+                self.report.screened += 1
+                self.report.screening_time += seconds
+                if skip:
+                    self.report.skipped += 1
+                    continue
+                if rank:
+                    survivors.append((score, replay))
+                    continue
+                yield replay
+        finally:
+            # also when we're abandoned partway through (or something other
+            # than a screening function raises), so the workers don't outlive
+            # us
+            self.close()
+
+        # sort by score alone, since replays can't be compared. The sort is
+        # stable, so equal scores stay in queue order.
+        survivors.sort(key=lambda survivor: survivor[0], reverse=True)
+        for _score, replay in survivors:
+            yield replay
+
+    def close(self):
+        """
+        Shuts down the pool, abandoning any replays which are still waiting to
+        be screened.
+        """
+        if self.pool is None:
+            return
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = None
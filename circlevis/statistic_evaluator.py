@@ -0,0 +1,229 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum, auto
+
+from circlevis.trace import NULL_TRACER
+
+
+class StatisticLevel(Enum):
+    # evaluated on the gui thread every frame
+    EVERY_FRAME = auto()
+    # evaluated on the gui thread once every
+    # ``StatisticBudget.throttled_interval`` frames. The last result is shown
+    # in between.
+    THROTTLED = auto()
+    # evaluated on a background thread as often as it can keep up. The latest
+    # finished result is shown.
+    BACKGROUND = auto()
+
+
+@dataclass
+class StatisticBudget:
+    """
+    How much time statistic functions may take each frame, and what happens to
+    functions which take longer.
+
+    A function's cost for a frame is the time it took in that frame, summed
+    over all players for ``StatisticMode.EACH`` functions. A function whose
+    average cost over the last ``window`` frames exceeds ``budget_ms`` is
+    demoted from ``StatisticLevel.EVERY_FRAME`` to
+    ``StatisticLevel.THROTTLED``. A throttled function's cost is amortized
+    over ``throttled_interval`` frames, and if it is still over budget it is
+    demoted to ``StatisticLevel.BACKGROUND`` (if ``allow_background`` is
+    ``True``).
+    """
+
+    # in ms. ``None`` to time functions but never demote them.
+    budget_ms: float = 4
+    window: int = 30
+    throttled_interval: int = 10
+    allow_background: bool = True
+    # whether to draw each function's average time next to its result
+    show_timings: bool = False
+
+
+class StatisticTiming:
+    """
+    Rolling timing information about a single statistic function.
+    """
+
+    def __init__(self, window):
+        # the most recent durations (in ms) of each time the function ran
+        self.durations = deque(maxlen=window)
+        # how many times the function has run in total
+        self.calls = 0
+        self.level = StatisticLevel.EVERY_FRAME
+
+    def record(self, duration):
+        self.durations.append(duration)
+        self.calls += 1
+
+    @property
+    def last(self):
+        # functions in the background record their durations from another
+        # thread, so take a copy (which is atomic) before using them
+        durations = list(self.durations)
+        return durations[-1] if durations else 0
+
+    @property
+    def mean(self):
+        durations = list(self.durations)
+        if not durations:
+            return 0
+        return sum(durations) / len(durations)
+
+    @property
+    def max(self):
+        return max(list(self.durations), default=0)
+
+    def __repr__(self):
+        return (
+            f"StatisticTiming(level={self.level.name}, calls={self.calls}, "
+            f"last={self.last:.3f}ms, mean={self.mean:.3f}ms, "
+            f"max={self.max:.3f}ms)"
+        )
+
+
+class StatisticEvaluator:
+    """
+    Evaluates statistic functions for a renderer, timing every evaluation and
+    demoting functions which go over their ``StatisticBudget``.
+
+    Results are stored per ``(function, key)``, where ``key`` distinguishes
+    between multiple evaluations of the same function in a single frame (eg
+    the player for ``StatisticMode.EACH`` functions).
+    """
+
+    def __init__(self, budget, tracer=NULL_TRACER):
+        self.budget = budget
+        # records a span for every evaluation, see ``circlevis.trace``
+        self.tracer = tracer
+        # maps function to ``StatisticTiming``
+        self.timings = {}
+        self.results = {}
+        self.frame = 0
+        # the frame each throttled function was last evaluated in
+        self.last_evaluated = {}
+        # each function's cost in the current frame
+        self.frame_costs = {}
+        # each function's (amortized) cost in recent frames
+        self.recent_costs = {}
+
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = None
+
+    def timing(self, function):
+        if function not in self.timings:
+            self.timings[function] = StatisticTiming(self.budget.window)
+        return self.timings[function]
+
+    def time(self, function, *args):
+        """
+        Calls ``function`` with ``args``, recording how long it took. Returns
+        the result of the call and its duration in ms.
+        """
+        name = getattr(function, "__name__", repr(function))
+        with self.tracer.span(name, "statistic"):
+            start = time.perf_counter_ns()
+            result = function(*args)
+        duration = (time.perf_counter_ns() - start) / 10**6
+        self.timing(function).record(duration)
+        return result, duration
+
+    def evaluate(self, function, key, *args):
+        """
+        The result of ``function`` for this frame, or ``None`` if there is no
+        result yet (because it is being evaluated in the background).
+        """
+        level = self.timing(function).level
+        result_key = (function, key)
+
+        if level is StatisticLevel.BACKGROUND:
+            with self.condition:
+                self.pending[result_key] = args
+                self.condition.notify()
+            return self.results.get(result_key)
+
+        if level is StatisticLevel.THROTTLED and result_key in self.results:
+            last_evaluated = self.last_evaluated.get(function, self.frame)
+            # evaluate every key of this function in the same frame, so they
+            # stay in sync with each other
+            if (
+                last_evaluated != self.frame
+                and self.frame - last_evaluated < self.budget.throttled_interval
+            ):
+                return self.results[result_key]
+
+        result, duration = self.time(function, *args)
+        self.results[result_key] = result
+        self.last_evaluated[function] = self.frame
+        self.frame_costs[function] = self.frame_costs.get(function, 0) + duration
+        return result
+
+    def end_frame(self):
+        """
+        Called once all statistic functions have been evaluated for a frame.
+        Demotes any functions which have gone over budget.
+        """
+        for function, cost in self.frame_costs.items():
+            timing = self.timing(function)
+            if timing.level is StatisticLevel.THROTTLED:
+                cost /= self.budget.throttled_interval
+            if function not in self.recent_costs:
+                self.recent_costs[function] = deque(maxlen=self.budget.window)
+            recent_costs = self.recent_costs[function]
+            recent_costs.append(cost)
+
+            if (
+                self.budget.budget_ms is None
+                or len(recent_costs) < recent_costs.maxlen
+                or sum(recent_costs) / len(recent_costs) <= self.budget.budget_ms
+            ):
+                continue
+
+            if timing.level is StatisticLevel.EVERY_FRAME:
+                timing.level = StatisticLevel.THROTTLED
+            elif self.budget.allow_background:
+                timing.level = StatisticLevel.BACKGROUND
+                self.start_background_thread()
+            # judge the function anew at its new level
+            recent_costs.clear()
+
+        self.frame_costs = {}
+        self.frame += 1
+
+    def start_background_thread(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.run_background)
+        # allow users to quit while a slow function is running
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run_background(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                # only the latest request for each function and key matters,
+                # so requests which came in while we were busy are coalesced.
+                # Take the oldest key so every key gets its turn.
+                result_key = next(iter(self.pending))
+                args = self.pending.pop(result_key)
+            function = result_key[0]
+            try:
+                result, _ = self.time(function, *args)
+            except Exception as e:
+                result = e
+            self.results[result_key] = result
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
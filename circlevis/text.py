@@ -0,0 +1,71 @@
+from PyQt6.QtGui import QStaticText, QFontMetrics
+from PyQt6.QtCore import Qt, QPointF
+
+
+class TextCache:
+    """
+    Lays out text once as ``QStaticText`` and reuses that layout every time
+    the text is drawn.
+
+    Only text which is drawn repeatedly (labels, usernames, and the individual
+    characters of numbers) should be cached here, since every distinct string
+    is kept around for the lifetime of the cache. Numbers are drawn one
+    (cached) character at a time, with every digit given the same width, so
+    they don't jitter left and right as their digits change.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self.metrics = QFontMetrics(font)
+        # ``QPainter#drawText`` positions text by its baseline, but
+        # ``QPainter#drawStaticText`` by its top left corner
+        self.ascent = self.metrics.ascent()
+        self.height = self.metrics.height()
+        self.digit_width = max(self.metrics.horizontalAdvance(c) for c in "0123456789")
+        self._static_texts = {}
+
+    def static_text(self, text):
+        static_text = self._static_texts.get(text)
+        if static_text is None:
+            static_text = QStaticText(text)
+            static_text.setTextFormat(Qt.TextFormat.PlainText)
+            static_text.prepare(font=self.font)
+            self._static_texts[text] = static_text
+        return static_text
+
+    def text_width(self, text):
+        return self.static_text(text).size().width()
+
+    def number_width(self, text):
+        return sum(self._advance(c) for c in text)
+
+    def draw_text(self, painter, x, y, text):
+        """
+        Draws ``text`` with its baseline at ``y``, and returns the x
+        coordinate just past the end of the drawn text.
+        """
+        static_text = self.static_text(text)
+        painter.drawStaticText(QPointF(x, y - self.ascent), static_text)
+        return x + static_text.size().width()
+
+    def draw_number(self, painter, x, y, text):
+        """
+        Draws ``text``, which should be a formatted number, with its baseline
+        at ``y``. Returns the x coordinate just past the end of the drawn
+        number.
+        """
+        top = y - self.ascent
+        for c in text:
+            advance = self._advance(c)
+            static_text = self.static_text(c)
+            # center each character in its cell, so narrow digits like 1
+            # don't hug the digit before them
+            offset = (advance - static_text.size().width()) / 2
+            painter.drawStaticText(QPointF(x + offset, top), static_text)
+            x += advance
+        return x
+
+    def _advance(self, c):
+        if c.isdigit():
+            return self.digit_width
+        return self.metrics.horizontalAdvance(c)
@@ -0,0 +1,359 @@
+import numpy as np
+from PyQt6.QtWidgets import QFrame, QToolTip
+from PyQt6.QtGui import QPainter, QPixmap, QColor, QPen, QPolygonF
+from PyQt6.QtCore import Qt, pyqtSignal, QRectF, QPointF
+from circleguard import JudgmentType
+
+# how tall the strip is, in pixels
+TIMELINE_HEIGHT = 12
+# how close (in pixels) the mouse has to be to a marker for hovering or
+# clicking to snap to it
+MARKER_SNAP_DISTANCE = 3
+
+# how tall the similarity strip is, in pixels
+SIMILARITY_HEIGHT = 24
+# the similarity (mean distance between cursors, in osu!pixels) which is drawn
+# at the bottom of the similarity strip. Anything less similar is drawn there
+# too. Replays with cursors further apart than this are never steals.
+SIMILARITY_SCALE = 50
+
+COLOR_BACKGROUND = QColor(25, 25, 25)
+COLOR_KEY_DENSITY = QColor(93, 183, 223, 110)
+COLOR_SIMILARITY = QColor(93, 183, 223)
+COLOR_SIMILARITY_FLIPPED = QColor(230, 110, 200)
+COLOR_SIMILAR_WINDOW = QColor(200, 27, 27, 90)
+
+# the kinds of markers we draw, in the order we draw them (so later kinds are
+# drawn on top of earlier ones), with their colors and tooltip labels
+MARKER_KINDS = ["100", "50", "miss", "snap", "event"]
+MARKER_COLORS = {
+    "100": QColor(127, 221, 71),
+    "50": QColor(211, 175, 90),
+    "miss": QColor(200, 27, 27),
+    "snap": QColor(230, 110, 200),
+    "event": QColor(230, 230, 230),
+}
+MARKER_LABELS = {
+    "100": "100",
+    "50": "50",
+    "miss": "Miss",
+    "snap": "Snap",
+    "event": "Event",
+}
+
+
+class TimelineStrip(QFrame):
+    """
+    A mini-map of the entire replay, drawn under the time slider. Shows
+    keypress density along with markers for non-300 judgments, snaps, and
+    events.
+
+    Everything is binned into pixel columns at once and drawn into a cached
+    pixmap, which is only redrawn when we're resized or given new data.
+    Hovering shows the time (and marker, if any) under the mouse, and clicking
+    emits ``seek_to`` with that time.
+    """
+
+    seek_to = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.setFixedHeight(TIMELINE_HEIGHT)
+        self.setMouseTracking(True)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        self.start = 0
+        self.end = 0
+        # maps each kind in ``MARKER_KINDS`` to the (sorted) times of its
+        # markers
+        self.markers = {kind: np.empty(0) for kind in MARKER_KINDS}
+        # the (sorted) times of every keydown, of every replay
+        self.keydown_times = np.empty(0)
+
+        # every marker's time, sorted, and the index into ``MARKER_KINDS`` of
+        # each marker's kind, for finding the marker under the mouse
+        self.marker_times = np.empty(0)
+        self.marker_kinds = np.empty(0, dtype=int)
+
+        self.pixmap = None
+
+    def set_range(self, start, end):
+        self.start = start
+        self.end = end
+        self.invalidate()
+
+    def set_keydowns(self, players):
+        """
+        Sets the keypress density from the keydowns of ``players``.
+        """
+        times = [np.asarray(p.t)[np.asarray(p.keydowns) != 0] for p in players]
+        self.keydown_times = np.sort(np.concatenate([np.empty(0), *times]))
+        self.invalidate()
+
+    def set_judgments(self, judgments):
+        times = {"100": [], "50": [], "miss": []}
+        for judgment in judgments:
+            if judgment.type is JudgmentType.Hit100:
+                times["100"].append(judgment.time)
+            elif judgment.type is JudgmentType.Hit50:
+                times["50"].append(judgment.time)
+            elif judgment.type is JudgmentType.Miss:
+                # misses don't have an intrinsic time, so use their hitobj's
+                times["miss"].append(judgment.hitobject.time)
+        for kind, kind_times in times.items():
+            self.markers[kind] = np.sort(kind_times)
+        self.update_marker_index()
+
+    def set_snaps(self, snaps):
+        self.markers["snap"] = np.sort([snap.time for snap in snaps])
+        self.update_marker_index()
+
+    def set_events(self, events):
+        self.markers["event"] = np.sort(events)
+        self.update_marker_index()
+
+    def update_marker_index(self):
+        times = [self.markers[kind] for kind in MARKER_KINDS]
+        kinds = [np.full(len(t), i) for i, t in enumerate(times)]
+        times = np.concatenate(times)
+        order = np.argsort(times, kind="stable")
+        self.marker_times = times[order]
+        self.marker_kinds = np.concatenate(kinds)[order]
+        self.invalidate()
+
+    def invalidate(self):
+        self.pixmap = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self.invalidate()
+        return super().resizeEvent(event)
+
+    def columns(self, times):
+        """
+        The pixel column of each of ``times``.
+        """
+        duration = max(self.end - self.start, 1)
+        columns = (np.asarray(times) - self.start) / duration * self.width()
+        return np.clip(columns.astype(int), 0, max(self.width() - 1, 0))
+
+    def time_at(self, x):
+        return self.start + x / max(self.width(), 1) * (self.end - self.start)
+
+    def render_pixmap(self):
+        width = self.width()
+        height = self.height()
+        pixmap = QPixmap(max(width, 1), height)
+        pixmap.fill(COLOR_BACKGROUND)
+        painter = QPainter(pixmap)
+
+        # keypress density, as a bar chart along the bottom of the strip
+        density = np.bincount(self.columns(self.keydown_times), minlength=width)
+        if density.max(initial=0) > 0:
+            bar_heights = np.round(density / density.max() * height).astype(int)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(COLOR_KEY_DENSITY)
+            for x in np.flatnonzero(bar_heights):
+                bar_height = int(bar_heights[x])
+                painter.drawRect(QRectF(int(x), height - bar_height, 1, bar_height))
+
+        # markers, as one line per column which has any markers of that kind
+        for kind in MARKER_KINDS:
+            painter.setPen(QPen(MARKER_COLORS[kind]))
+            for x in np.unique(self.columns(self.markers[kind])):
+                painter.drawLine(int(x), 0, int(x), height)
+
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        if self.pixmap is None:
+            self.pixmap = self.render_pixmap()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.pixmap)
+        painter.end()
+
+    def resolve(self, x):
+        """
+        The time at pixel column ``x``, and the index of the marker it
+        snapped to (if any). The time snaps to the nearest marker if there is
+        one within ``MARKER_SNAP_DISTANCE`` pixels.
+        """
+        time = self.time_at(x)
+        if len(self.marker_times) == 0:
+            return time, None
+        # the markers on either side of ``time`` are our two candidates
+        i = np.searchsorted(self.marker_times, time)
+        candidates = [j for j in [i - 1, i] if 0 <= j < len(self.marker_times)]
+        nearest = min(candidates, key=lambda j: abs(self.marker_times[j] - time))
+        max_distance = MARKER_SNAP_DISTANCE / max(self.width(), 1)
+        max_distance *= self.end - self.start
+        if abs(self.marker_times[nearest] - time) > max_distance:
+            return time, None
+        return self.marker_times[nearest], nearest
+
+    def mouseMoveEvent(self, event):
+        x = event.position().x()
+        time, marker = self.resolve(x)
+        minutes, seconds = divmod(int(time) // 1000, 60)
+        text = f"{minutes}:{seconds:02} ({int(time)} ms)"
+        if marker is not None:
+            kind = MARKER_KINDS[self.marker_kinds[marker]]
+            text = f"{MARKER_LABELS[kind]} at {text}"
+        QToolTip.showText(event.globalPosition().toPoint(), text, self)
+        return super().mouseMoveEvent(event)
+
+    def mousePressEvent(self, event):
+        time, _ = self.resolve(event.position().x())
+        self.seek_to.emit(int(time))
+        return super().mousePressEvent(event)
+
+
+class SimilarityStrip(QFrame):
+    """
+    A graph of how similar the cursors of two replays are over time (see
+    ``SimilarityTrack``), drawn under the timeline when exactly two replays
+    are visualized.
+
+    The more similar the cursors are, the taller the graph. Similarity with
+    the second replay as given and with it flipped vertically (as if hard rock
+    had been added or removed) are drawn as separate lines, and the most
+    similar windows are highlighted. Like ``TimelineStrip``, everything is
+    drawn into a cached pixmap, hovering shows the similarity under the mouse,
+    and clicking emits ``seek_to``.
+    """
+
+    seek_to = pyqtSignal(int)
+
+    def __init__(self):
+        super().__init__()
+        self.setFixedHeight(SIMILARITY_HEIGHT)
+        self.setMouseTracking(True)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+
+        self.start = 0
+        self.end = 0
+        self.track = None
+        # the ``SimilarWindow``s to highlight
+        self.windows = []
+        self.pixmap = None
+
+    def set_range(self, start, end):
+        self.start = start
+        self.end = end
+        self.invalidate()
+
+    def set_track(self, track, windows):
+        self.track = track
+        self.windows = windows
+        self.invalidate()
+
+    def invalidate(self):
+        self.pixmap = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self.invalidate()
+        return super().resizeEvent(event)
+
+    # same as ``TimelineStrip``, so the two line up
+    columns = TimelineStrip.columns
+    time_at = TimelineStrip.time_at
+
+    def column_values(self, values):
+        """
+        The most similar of ``values`` (one per window of our track) in each
+        pixel column, interpolated across columns which no window starts in.
+        """
+        width = self.width()
+        column_values = np.full(width, np.inf)
+        np.minimum.at(column_values, self.columns(self.track.times), values)
+        filled = np.isfinite(column_values)
+        if not filled.any():
+            return None
+        x = np.arange(width)
+        return np.interp(x, x[filled], column_values[filled])
+
+    def y(self, values):
+        """
+        The y coordinate to graph each of ``values`` at.
+        """
+        height = self.height()
+        closeness = 1 - np.minimum(values, SIMILARITY_SCALE) / SIMILARITY_SCALE
+        return height - 1 - closeness * (height - 2)
+
+    def render_pixmap(self):
+        width = self.width()
+        height = self.height()
+        pixmap = QPixmap(max(width, 1), height)
+        pixmap.fill(COLOR_BACKGROUND)
+        if self.track is None or len(self.track.times) == 0:
+            return pixmap
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(COLOR_SIMILAR_WINDOW)
+        for window in self.windows:
+            start, end = self.columns([window.start, window.end])
+            painter.drawRect(QRectF(int(start), 0, max(int(end - start), 1), height))
+
+        # draw the flipped line first, so the line for the replays as given is
+        # on top where they overlap
+        lines = [
+            (self.track.flipped_similarity, COLOR_SIMILARITY_FLIPPED),
+            (self.track.similarity, COLOR_SIMILARITY),
+        ]
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        for values, color in lines:
+            values = self.column_values(values)
+            if values is None:
+                continue
+            ys = self.y(values)
+            painter.setPen(QPen(color, 1))
+            painter.drawPolyline(
+                QPolygonF([QPointF(x, y) for x, y in enumerate(ys.tolist())])
+            )
+
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        if self.pixmap is None:
+            self.pixmap = self.render_pixmap()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.pixmap)
+        painter.end()
+
+    def window_at(self, time):
+        for window in self.windows:
+            if window.start <= time <= window.end:
+                return window
+        return None
+
+    def mouseMoveEvent(self, event):
+        time = self.time_at(event.position().x())
+        minutes, seconds = divmod(int(time) // 1000, 60)
+        text = f"{minutes}:{seconds:02} ({int(time)} ms)"
+        if self.track is not None and len(self.track.times) > 0:
+            # the window which starts closest before ``time``
+            i = np.searchsorted(self.track.times, time, side="right") - 1
+            i = min(max(i, 0), len(self.track.times) - 1)
+            similarity = self.track.similarity[i]
+            flipped = self.track.flipped_similarity[i]
+            text += f"\nSimilarity: {similarity:.1f}, with HR flipped: {flipped:.1f}"
+        window = self.window_at(time)
+        if window is not None:
+            text += "\nOne of the most similar windows, click to jump to it"
+        QToolTip.showText(event.globalPosition().toPoint(), text, self)
+        return super().mouseMoveEvent(event)
+
+    def mousePressEvent(self, event):
+        time = self.time_at(event.position().x())
+        window = self.window_at(time)
+        # jump to the start of highlighted windows, so they can be watched in
+        # full
+        if window is not None:
+            time = window.start
+        self.seek_to.emit(int(time))
+        return super().mousePressEvent(event)
@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+from itertools import count
+
+# the environment variable which, if set, enables tracing and is the path to
+# write the trace to. See ``trace_path``.
+TRACE_ENVIRONMENT_VARIABLE = "CIRCLEVIS_TRACE"
+# how many spans a ``Tracer`` keeps by default. A visualizer records a dozen
+# or so spans a frame, so this is around ten minutes of playback. Older spans
+# are dropped to make room for newer ones.
+DEFAULT_MAX_SPANS = 500_000
+# numbers the traces written to paths from ``CIRCLEVIS_TRACE``. ``next`` on a
+# ``count`` is atomic, so visualizers can be created from any thread.
+_trace_counter = count(1)
+
+
+def trace_path(path=None):
+    """
+    Where to write a trace to: ``path`` if it's given, and otherwise the value
+    of the ``CIRCLEVIS_TRACE`` environment variable. ``None`` if neither is
+    set, in which case nothing should be traced.
+
+    Every visualizer in a process (eg each one a ``Classifier`` shows) reads
+    the same environment variable, so paths from it are made unique to each
+    call by inserting this process' id and a counter before the extension:
+    ``trace.json`` becomes ``trace.1234.1.json``, then ``trace.1234.2.json``,
+    and so on.
+    """
+    if path is not None:
+        return str(path)
+    path = os.environ.get(TRACE_ENVIRONMENT_VARIABLE)
+    if not path:
+        return None
+    root, extension = os.path.splitext(path)
+    return f"{root}.{os.getpid()}.{next(_trace_counter)}{extension}"
+
+
+def traced(name, category=""):
+    """
+    Records a span around every call of the decorated method, with the
+    ``tracer`` of the instance it's called on.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(name, category):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class _Span:
+    __slots__ = ["tracer", "name", "category", "args", "start"]
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *_exc_info):
+        end = time.perf_counter_ns()
+        self.tracer._record(self.name, self.category, self.start, end, self.args)
+
+
+class Tracer:
+    """
+    Records how long the visualizer spends on things (painting, loading,
+    seeking, background calculations, ...) as spans, which can be written out
+    as a Chrome trace and viewed in Perfetto (https://ui.perfetto.dev) or
+    ``chrome://tracing``.
+
+    Recording a span only appends a tuple to an in-memory buffer, so tracing
+    is cheap enough to leave on for a whole session. Spans can be recorded
+    from any thread.
+
+    Parameters
+    ----------
+    max_spans: int
+        How many spans to keep. Once full, the oldest spans are dropped to make
+        room for new ones.
+    """
+
+    enabled = True
+
+    def __init__(self, max_spans=DEFAULT_MAX_SPANS):
+        self.spans = deque(maxlen=max_spans)
+        # maps thread id to the name of that thread, so the trace can label
+        # each thread's spans
+        self.thread_names = {}
+        # spans are recorded from any thread, and copying ``spans`` or
+        # ``thread_names`` while another thread adds to them raises, so both
+        # are only touched while holding this
+        self._lock = threading.Lock()
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name, category="", args=None):
+        """
+        A context manager which records a span named ``name`` for as long as it
+        is entered.
+
+        Parameters
+        ----------
+        name: str
+            What this span is doing.
+        category: str
+            The kind of span this is, eg ``"paint"`` or ``"load"``. Perfetto
+            can filter spans by category.
+        args: dict or None
+            Anything else worth knowing about this span, shown alongside it.
+            Must be json serializable.
+        """
+        return _Span(self, name, category, args)
+
+    def _record(self, name, category, start, end, args):
+        thread_id = threading.get_native_id()
+        with self._lock:
+            if thread_id not in self.thread_names:
+                self.thread_names[thread_id] = threading.current_thread().name
+            self.spans.append((name, category, start, end, thread_id, args))
+
+    def trace_events(self):
+        """
+        Our spans as a list of Chrome trace events.
+        """
+        pid = os.getpid()
+        # take copies first, in case other threads are still recording
+        with self._lock:
+            thread_names = list(self.thread_names.items())
+            spans = list(self.spans)
+        events = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": "circlevis"},
+            }
+        ]
+        for thread_id, thread_name in thread_names:
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+            )
+        for name, category, start, end, thread_id, args in spans:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                # chrome traces are in microseconds
+                "ts": (start - self.origin) / 1000,
+                "dur": (end - start) / 1000,
+                "pid": pid,
+                "tid": thread_id,
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return events
+
+    def dump(self, path):
+        """
+        Writes our spans to ``path`` in the Chrome trace event format.
+        """
+        trace = {"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}
+        with open(path, "w") as f:
+            json.dump(trace, f)
+
+
+class NullTracer:
+    """
+    A tracer which records nothing, used when tracing is disabled.
+    """
+
+    enabled = False
+
+    def span(self, name, category="", args=None):
+        return _NULL_SPAN
+
+    def dump(self, path):
+        pass
+
+
+# ``nullcontext`` instances can be entered any number of times, so share one
+# instead of creating a new one for every span
+_NULL_SPAN = nullcontext()
+NULL_TRACER = NullTracer()
@@ -1,8 +1,14 @@
 from pathlib import Path
 import sys
+import weakref
+from collections import OrderedDict
 from enum import Enum, auto
+from functools import wraps
 
 ROOT_PATH = Path(__file__).parent.absolute()
+# how many results of a memoized statistic function to keep per player, see
+# ``statistic_function``. Enough for every frame of a replay a few minutes long.
+MEMOIZE_MAX_RESULTS = 20_000
 
 
 def resource_path(path):
@@ -38,11 +44,71 @@ class StatisticMode(Enum):
     # run once for all players.
     # signature: (players: list[Player], indices: list[int])
     ONCE = auto()
+    # run once for each player over their entire replay, in the background,
+    # instead of every frame. Should return an array with one value for each
+    # frame of the replay, which is indexed into every frame.
+    # signature: (player: Player) -> ndarray
+    VECTORIZED = auto()
 
 
-def statistic_function(mode):
+def statistic_function(mode, cache=False):
+    """
+    Marks ``f`` as a statistic function of the given mode.
+
+    If ``cache`` is ``True``, results of ``EACH`` and ``ONCE`` functions are
+    memoized by the player (or players) and frame indices they were called
+    with, so the function is not called again for the same frame (eg while
+    paused). Only use this for functions which always return the same result
+    for the same frames. ``VECTORIZED`` functions are only ever called once
+    per player, so ``cache`` has no effect on them.
+    """
+
     def decorator(f):
+        if cache and mode is StatisticMode.EACH:
+            f = _memoize(f, lambda player, i: (player, i))
+        if cache and mode is StatisticMode.ONCE:
+            # key by the ids of the other players, so the cache of the first
+            # player doesn't keep them alive. They belong to the same renderer
+            # as the first player, so they live exactly as long as it does.
+            f = _memoize(
+                f,
+                lambda players, indices: (
+                    players[0] if players else None,
+                    (tuple(id(player) for player in players), tuple(indices)),
+                ),
+            )
         f.__circlevis_statistic_mode = mode
         return f
 
     return decorator
+
+
+def _memoize(f, key_function):
+    """
+    Memoizes ``f``. ``key_function`` returns the player which a call's result
+    belongs to, and a key for the call within that player's results.
+
+    Results are held weakly by player, so they (and the player's frames) go
+    away with the visualizer the player belongs to instead of living for as
+    long as the process does. Each player keeps at most
+    ``MEMOIZE_MAX_RESULTS`` results, dropping the least recently used first.
+    """
+    results = weakref.WeakKeyDictionary()
+
+    @wraps(f)
+    def wrapper(*args):
+        owner, key = key_function(*args)
+        # ``ONCE`` functions can be called without any players
+        if owner is None:
+            return f(*args)
+        owner_results = results.setdefault(owner, OrderedDict())
+        if key in owner_results:
+            owner_results.move_to_end(key)
+            return owner_results[key]
+        result = f(*args)
+        owner_results[key] = result
+        if len(owner_results) > MEMOIZE_MAX_RESULTS:
+            owner_results.popitem(last=False)
+        return result
+
+    return wrapper
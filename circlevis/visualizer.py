@@ -5,8 +5,7 @@ from PyQt6.QtCore import Qt, QKeyCombination
 
 from circlevis.interface import Interface
 from circlevis.palette import get_dark_palette
-
-PREVIOUS_ERRSTATE = np.seterr("raise")
+from circlevis.trace import Tracer, NULL_TRACER, trace_path
 
 
 class Visualizer(QMainWindow):
@@ -25,8 +24,18 @@ class Visualizer(QMainWindow):
         paint_info=True,
         statistic_functions=[],
         snaps_args={},
+        statistic_budget=None,
+        frame_store=None,
+        trace=None,
+        threaded_rendering=False,
+        playback_group=None,
     ):
         super().__init__()
+        # we want numpy to raise on floating point errors while we're
+        # visualizing, but only for as long as we're open. Setting this at
+        # import time would change numpy's behavior for anyone who merely
+        # imports circlevis.
+        self.previous_errstate = np.seterr("raise")
 
         self.beatmap_info = beatmap_info
         self.replays = replays
@@ -37,6 +46,15 @@ class Visualizer(QMainWindow):
         self.paint_info = paint_info
         self.statistic_functions = statistic_functions
         self.snaps_args = snaps_args
+        self.statistic_budget = statistic_budget
+        self.frame_store = frame_store
+        # where to write a trace of this session to when we're closed, if
+        # tracing is enabled (by ``trace`` or the ``CIRCLEVIS_TRACE``
+        # environment variable)
+        self.trace_path = trace_path(trace)
+        self.tracer = Tracer() if self.trace_path else NULL_TRACER
+        self.threaded_rendering = threaded_rendering
+        self.playback_group = playback_group
 
         self.setAutoFillBackground(True)
         self.setWindowTitle("Visualizer")
@@ -50,6 +68,11 @@ class Visualizer(QMainWindow):
             paint_info,
             statistic_functions,
             snaps_args,
+            statistic_budget,
+            frame_store,
+            self.tracer,
+            threaded_rendering,
+            playback_group,
         )
         self.interface.renderer.loaded_signal.connect(self.on_load)
         self.setCentralWidget(self.interface)
@@ -135,8 +158,16 @@ class Visualizer(QMainWindow):
 
     def closeEvent(self, event):
         super().closeEvent(event)
+        if self.playback_group is not None:
+            self.playback_group.remove(self.interface)
         self.interface.renderer.timer.stop()
-        np.seterr(**PREVIOUS_ERRSTATE)
+        self.interface.renderer.statistic_evaluator.stop()
+        self.interface.renderer.stop_judgments()
+        if self.interface.renderer.render_worker is not None:
+            self.interface.renderer.render_worker.stop()
+        np.seterr(**self.previous_errstate)
+        if self.trace_path:
+            self.tracer.dump(self.trace_path)
 
     def toggle_fullscreen(self):
         if self.windowState() == Qt.WindowState.WindowFullScreen:
@@ -174,6 +205,13 @@ class Visualizer(QMainWindow):
     def save_as_image(self):
         return self.grab().toImage()
 
+    def statistic_timings(self):
+        """
+        A dict of each statistic function to a ``StatisticTiming`` with
+        rolling information about how long it has taken to run.
+        """
+        return self.interface.renderer.statistic_timings()
+
     def on_load(self):
         """
         Will be called when the visualizer has completely loaded (including
@@ -203,6 +241,10 @@ class VisualizerApp(QApplication):
         paint_info=True,
         statistic_functions=[],
         snaps_args={},
+        statistic_budget=None,
+        frame_store=None,
+        trace=None,
+        threaded_rendering=False,
     ):
         super().__init__([])
         self.setStyle("Fusion")
@@ -217,6 +259,10 @@ class VisualizerApp(QApplication):
         self.paint_info = paint_info
         self.statistic_functions = statistic_functions
         self.snaps_args = snaps_args
+        self.statistic_budget = statistic_budget
+        self.frame_store = frame_store
+        self.trace = trace
+        self.threaded_rendering = threaded_rendering
 
         # set in exec
         self.visualizer = None
@@ -241,6 +287,10 @@ class VisualizerApp(QApplication):
             self.paint_info,
             self.statistic_functions,
             self.snaps_args,
+            self.statistic_budget,
+            self.frame_store,
+            self.trace,
+            self.threaded_rendering,
         )
         self.visualizer.interface.renderer.loaded_signal.connect(self.on_load)
         self.visualizer.show()
@@ -261,6 +311,9 @@ class VisualizerApp(QApplication):
     def save_as_image(self):
         return self.visualizer.grab().toImage()
 
+    def statistic_timings(self):
+        return self.visualizer.statistic_timings()
+
     def on_load(self):
         """
         Will be called when the visualizer has completely loaded (including
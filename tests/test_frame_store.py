@@ -0,0 +1,48 @@
+import gc
+import sys
+from pathlib import Path
+
+# the synthetic beatmaps and replays the benchmarks use
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import numpy as np
+
+from synthetic import synthetic_beatmap, SyntheticReplay
+from circlevis.frame_store import FrameStore
+
+
+class UnhashableReplay(SyntheticReplay):
+    """
+    Like circleguard's ``Replay`` and ``ReplayDataOSR``, which are unhashable,
+    and like ``ReplayMap`` and ``ReplayPath``, which compare equal to distinct
+    replays.
+    """
+
+    def __eq__(self, other):
+        return isinstance(other, UnhashableReplay)
+
+    __hash__ = None
+
+
+def test_unhashable_replays():
+    beatmap = synthetic_beatmap(10, 0.3)
+    replay1 = UnhashableReplay(beatmap, seed=0)
+    replay2 = UnhashableReplay(beatmap, seed=1)
+    assert replay1 == replay2
+
+    with FrameStore() as store:
+        frames1 = store.add(replay1)
+        frames2 = store.add(replay2)
+        # equal replays are still stored separately
+        assert frames1.offset != frames2.offset
+        assert np.array_equal(frames1.t, replay1.t)
+        assert np.array_equal(frames2.t, replay2.t)
+        # and the same replay is only stored once
+        assert store.add(replay1) is frames1
+        nbytes = store.nbytes
+
+        del replay1
+        gc.collect()
+        assert len(store._frames[False]) == 1
+        store.add(replay2)
+        assert store.nbytes == nbytes
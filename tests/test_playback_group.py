@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+# must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# the synthetic beatmaps and replays the benchmarks use
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import pytest
+from PyQt6.QtWidgets import QApplication
+
+from synthetic import synthetic_beatmap, SyntheticReplay
+from circlevis import BeatmapInfo, PlaybackGroup, Visualizer
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def process_events(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_group_pauses_at_end(app):
+    beatmap = synthetic_beatmap(10, 0.3)
+    group = PlaybackGroup()
+    visualizers = [
+        Visualizer(
+            BeatmapInfo(beatmap=beatmap),
+            [SyntheticReplay(beatmap, seed=seed)],
+            playback_group=group,
+        )
+        for seed in range(2)
+    ]
+    for visualizer in visualizers:
+        visualizer.show()
+    renderers = [visualizer.interface.renderer for visualizer in visualizers]
+    for renderer in renderers:
+        renderer.thread.join()
+    process_events(app, 0.5)
+    assert not any(renderer.is_loading for renderer in renderers)
+
+    _playback_start, playback_end = group.playback_range()
+    interface = visualizers[0].interface
+    interface.pause()
+    renderers[0].seek_to(playback_end - 200)
+    interface.unpause()
+    process_events(app, 1)
+    assert all(renderer.paused for renderer in renderers)
+
+    # and stays paused, instead of being toggled back on
+    time_counter = group.clock.time_counter
+    process_events(app, 0.5)
+    assert all(renderer.paused for renderer in renderers)
+    assert group.clock.time_counter == time_counter
+
+    for visualizer in visualizers:
+        visualizer.close()